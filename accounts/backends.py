@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from core.query_cache import bump
+
+USER_CACHE_KEY = "accounts:user:{}"
+
+
+def user_cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+def forget_cached_users(user_ids):
+    """
+    Drop these users' cached copies. Saves and deletes do this through
+    signals; writes that skip them (User.objects.filter(...).update(...))
+    have to call it themselves.
+    """
+    cache.delete_many([user_cache_key(user_id) for user_id in user_ids])
+    bump(User)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that loads the logged-in user from the cache instead of
+    querying auth_user on every request. Entries are dropped whenever the
+    user is saved or deleted (see accounts/signals.py), so password and
+    profile changes take effect on the next request. Bulk updates send no
+    signals: call forget_cached_users() after them, or the old copy is used
+    for up to USER_CACHE_TIMEOUT seconds.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, getattr(settings, 'USER_CACHE_TIMEOUT', 300))
+        return user
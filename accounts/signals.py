@@ -0,0 +1,20 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.query_cache import bump
+
+from .backends import user_cache_key
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the cached copy so password/profile changes are seen on the next request"""
+    cache.delete(user_cache_key(instance.pk))
+    # And query cache results showing user data (the news feed's author names),
+    # except on login, which only saves last_login
+    update_fields = kwargs.get('update_fields')
+    if not update_fields or set(update_fields) - {'last_login'}:
+        bump(User)
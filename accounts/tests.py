@@ -1,3 +1,65 @@
-from django.test import TestCase
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
 
-# Create your tests here.
+from .backends import CachedModelBackend, forget_cached_users
+
+
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('fan', password='pw')
+        self.backend = CachedModelBackend()
+
+    def test_second_lookup_is_served_from_the_cache(self):
+        self.backend.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk).username, 'fan')
+
+    def test_save_drops_the_cached_copy(self):
+        self.backend.get_user(self.user.pk)
+        self.user.first_name = 'Buzz'
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, 'Buzz')
+
+    def test_delete_drops_the_cached_copy(self):
+        self.backend.get_user(self.user.pk)
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_bulk_update_needs_forget_cached_users(self):
+        self.backend.get_user(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        # Signals aren't sent for update(), so the cached copy is still there...
+        self.assertTrue(self.backend.get_user(self.user.pk).is_active)
+        forget_cached_users([self.user.pk])
+        # ...until it's dropped explicitly; inactive users can't log in
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_unknown_user(self):
+        self.assertIsNone(self.backend.get_user(12345))
+
+
+class SessionBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('fan', password='pw')
+
+    def _logged_in(self):
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+        return get_user(request).is_authenticated
+
+    def test_new_logins_use_the_cached_backend(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], 'accounts.backends.CachedModelBackend')
+        self.assertTrue(self._logged_in())
+
+    def test_sessions_from_before_the_cache_stay_logged_in(self):
+        session = self.client.session
+        session[SESSION_KEY] = str(self.user.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = self.user.get_session_auth_hash()
+        session.save()
+        self.assertTrue(self._logged_in())
@@ -5,12 +5,14 @@ from .forms import CustomUserCreationForm, CustomErrorList
 from django.shortcuts import redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from core.ratelimit import rate_limit
 
 @login_required
 def logout(request):
     auth_logout(request)
     return redirect('home.index')
 
+@rate_limit('login')
 def login(request):
     template_data = {}
     template_data['title'] = 'Login'
@@ -25,6 +27,7 @@ def login(request):
             auth_login(request, user)
             return redirect('home.index')
 
+@rate_limit('signup')
 def signup(request):
     template_data = {}
     template_data['title'] = 'Sign Up'
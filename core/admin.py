@@ -0,0 +1,33 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import IngestRun, Task
+
+
+@admin.register(IngestRun)
+class IngestRunAdmin(admin.ModelAdmin):
+    list_display = ['source', 'status', 'started_at', 'duration', 'events_seen', 'rows_written', 'quota_remaining']
+    list_filter = ['source', 'status']
+    readonly_fields = [field.name for field in IngestRun._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'run_at', 'attempts', 'max_attempts', 'locked_by', 'finished_at']
+    list_filter = ['status', 'name']
+    readonly_fields = [field.name for field in Task._meta.fields]
+    actions = ['retry']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Retry selected failed tasks now')
+    def retry(self, request, queryset):
+        # Without their keys, so they can't clash with the same work queued since
+        retried = queryset.filter(status=Task.FAILED).update(
+            status=Task.QUEUED, key=None, run_at=timezone.now(), attempts=0, finished_at=None,
+        )
+        self.message_user(request, f"Queued {retried} task(s) to run again.")
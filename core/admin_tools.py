@@ -0,0 +1,190 @@
+"""
+Admin building blocks for tables too big for the stock changelist
+(comments, with millions of rows).
+
+- AutocompleteFilter: filter by a foreign key with a search-as-you-type box,
+  instead of a sidebar listing every related row.
+- EstimatedCountPaginator: no full COUNT(*) of the unfiltered table per page
+  load.
+- ModerationAdmin: both of the above, full-text search through core.fulltext
+  instead of icontains (plus exact matches on '='-prefixed search fields),
+  and a bulk delete that works in keyset-paginated chunks without loading the
+  rows it deletes.
+"""
+
+import string
+
+from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Q
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+
+from .fulltext import matching
+from .page_cache import bump_pages
+
+# Unfiltered tables smaller than this are still counted exactly
+ESTIMATE_ABOVE_ROWS = 10_000
+DELETE_CHUNK_SIZE = 1000
+
+
+def estimated_row_count(model, using='default'):
+    """The table's approximate row count without scanning it, or None if the database can't say"""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Kept up to date by autovacuum/ANALYZE; -1 if the table has never been analyzed
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor == 'sqlite':
+            # The highest rowid is one lookup at the end of the table's b-tree; deleted rows make it an overestimate
+            cursor.execute(f'SELECT MAX("{model._meta.pk.column}") FROM "{table}"')
+            return cursor.fetchone()[0] or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts the unfiltered table from database statistics. Filtered results
+    (a search, a list filter) are counted exactly, so every page of them can
+    be reached.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > ESTIMATE_ABOVE_ROWS:
+                return estimate
+        return queryset.order_by().count()
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    list_filter = [('game', AutocompleteFilter)]. The related model's admin
+    needs search_fields, like for autocomplete_fields.
+    """
+    template = 'admin/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f"{field_path}__{field.target_field.name}__exact"
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        # Through a form field, which gives the widget the queryset to look the selected value up in
+        self.widget = field.formfield(required=False, widget=AutocompleteSelect(
+            field, model_admin.admin_site, attrs={'class': 'admin-autocomplete-filter', 'style': 'width: 100%'},
+        )).widget
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        # Only "All"; the selected value is shown in the search box
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg]),
+            'display': 'All',
+        }
+
+    def rendered_widget(self):
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return self.widget.render(self.lookup_kwarg, value)
+
+
+class ModerationAdmin(admin.ModelAdmin):
+    """
+    Set `fulltext_field` to the column searched through its core.fulltext
+    index, and `page_cache_groups` (e.g. ['odds.game.{game_id}']) to the page
+    groups to invalidate for deleted rows. Search fields prefixed with '='
+    (e.g. '=author__username') also match the whole search term exactly,
+    case-insensitively.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Newest first, straight off the primary key
+    ordering = ['-pk']
+    fulltext_field = None
+    page_cache_groups = []
+    actions = ['delete_in_chunks']
+
+    class Media:
+        css = {'all': ['admin/css/vendor/select2/select2.css', 'admin/css/autocomplete.css']}
+        js = [
+            'admin/js/vendor/jquery/jquery.js',
+            'admin/js/vendor/select2/select2.full.js',
+            'admin/js/jquery.init.js',
+            'admin/js/autocomplete.js',
+            'js/admin-autocomplete-filter.js',
+        ]
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # The stock action loads every selected row to list it before deleting
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_search_results(self, request, queryset, search_term):
+        if self.fulltext_field and search_term:
+            results = matching(queryset, self.fulltext_field, search_term)
+            exact = Q()
+            for field in self.get_search_fields(request):
+                if field.startswith('='):
+                    exact |= Q(**{f"{field[1:]}__iexact": search_term.strip()})
+            if exact:
+                # Forward foreign keys only, so no duplicate rows
+                results = results | queryset.filter(exact)
+            return results, False
+        return super().get_search_results(request, queryset, search_term)
+
+    def _groups(self, queryset):
+        fields = sorted({
+            name for group in self.page_cache_groups
+            for _, name, _, _ in string.Formatter().parse(group) if name
+        })
+        if not fields:
+            return set()
+        return {
+            group.format(**row)
+            for row in queryset.values(*fields).distinct()
+            for group in self.page_cache_groups
+        }
+
+    @admin.action(description='Delete selected %(verbose_name_plural)s', permissions=['delete'])
+    def delete_in_chunks(self, request, queryset):
+        opts = self.model._meta
+        if request.POST.get('post') != 'yes':
+            return TemplateResponse(request, 'admin/chunked_delete_confirmation.html', {
+                **self.admin_site.each_context(request),
+                'title': f'Delete {opts.verbose_name_plural}?',
+                'opts': opts,
+                'count': EstimatedCountPaginator(queryset, 1).count,
+                'select_across': request.POST.get('select_across') == '1',
+                'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            })
+
+        deleted = 0
+        groups = set()
+        ids = queryset.order_by('pk').values_list('pk', flat=True)
+        last = None
+        while True:
+            chunk = list((ids if last is None else ids.filter(pk__gt=last))[:DELETE_CHUNK_SIZE])
+            if not chunk:
+                break
+            # One short transaction per chunk, so the table isn't locked for the whole delete
+            with transaction.atomic():
+                rows = self.model._base_manager.filter(pk__in=chunk)
+                groups |= self._groups(rows)
+                _, per_model = rows.delete()
+            deleted += per_model.get(opts.label, 0)
+            last = chunk[-1]
+
+        if groups:
+            # Every chunk has committed by now
+            bump_pages(*sorted(groups))
+        self.message_user(request, f"Deleted {deleted} {opts.verbose_name_plural}.")
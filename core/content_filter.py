@@ -0,0 +1,220 @@
+"""
+Automatic checks on comments, applied when they're posted (see the comment
+forms in odds/forms.py and news/forms.py).
+
+Blocked terms: every term in the blocklist file (settings.COMMENT_BLOCKLIST_PATH,
+one word or phrase per line) is compiled into one Aho-Corasick automaton, so
+checking a comment is a single pass over its words however many terms there
+are. Matching is on whole words after case-folding and undoing common
+character swaps ("fr33" -> "free"), so "class" doesn't trip a blocked "ass".
+The automaton is rebuilt when the file changes, checked with one stat() per
+comment the same way odds/board.py picks up a new board.
+
+Duplicates and floods: a bounded LRU of recently active users, each with the
+hashes and times of their last few comments, rejects a comment the user
+already posted in the last ten minutes, and more than COMMENT_FLOOD_LIMIT
+comments a minute. It's per process, which is enough to stop a script
+hammering one worker.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+
+from django import forms
+from django.conf import settings
+
+# Tokens are runs of letters/digits; everything else separates words
+_WORD = re.compile(r'\w+')
+# Common look-alike swaps, undone before matching
+_LOOKALIKES = str.maketrans({'0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '@': 'a', '$': 's'})
+
+# Users tracked by the duplicate/flood detector, and comments remembered per user
+RECENT_USERS = 10_000
+RECENT_COMMENTS = 10
+DUPLICATE_WINDOW_SECONDS = 10 * 60
+FLOOD_WINDOW_SECONDS = 60
+
+
+def words(text):
+    """The normalized words matching runs over"""
+    return _WORD.findall(text.casefold().translate(_LOOKALIKES))
+
+
+class Automaton:
+    """Aho-Corasick over words: each state is a dict of next word -> state"""
+
+    def __init__(self, terms):
+        self.goto = [{}]
+        # The blocked term matched on reaching each state (via the longest suffix that matches one)
+        self.output = [None]
+        self.fail = [0]
+        for term in terms:
+            self._add(term)
+        self._link()
+
+    def __len__(self):
+        return len(self.goto)
+
+    def _add(self, term):
+        state = 0
+        term_words = words(term)
+        if not term_words:
+            return
+        for word in term_words:
+            next_state = self.goto[state].get(word)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][word] = next_state
+                self.goto.append({})
+                self.output.append(None)
+                self.fail.append(0)
+            state = next_state
+        self.output[state] = self.output[state] or term
+
+    def _link(self):
+        # Breadth first, so a state's fail link is resolved before its children's
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self.goto[state].items():
+                queue.append(child)
+                if state:
+                    fallback = self.fail[state]
+                    while fallback and word not in self.goto[fallback]:
+                        fallback = self.fail[fallback]
+                    self.fail[child] = self.goto[fallback].get(word, 0)
+                self.output[child] = self.output[child] or self.output[self.fail[child]]
+
+    def search(self, text):
+        """The first blocked term in `text`, or None"""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for word in words(text):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if output[state]:
+                return output[state]
+        return None
+
+
+def read_blocklist(path):
+    """Terms from a blocklist file: one per line, # starts a comment"""
+    with open(path, encoding='utf-8') as blocklist:
+        terms = (line.split('#', 1)[0].strip() for line in blocklist)
+        return [term for term in terms if term]
+
+
+_lock = threading.Lock()
+_current = None  # (file identity, Automaton) for this process
+
+
+def _blocklist_path():
+    return Path(getattr(settings, 'COMMENT_BLOCKLIST_PATH', settings.BASE_DIR / 'gtsportsline' / 'blocklist.txt'))
+
+
+def current_automaton():
+    """This process's automaton, rebuilt if the blocklist file has changed since"""
+    global _current
+    path = _blocklist_path()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        identity = None
+    else:
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    current = _current
+    if current is not None and current[0] == identity:
+        return current[1]
+    with _lock:
+        if _current is None or _current[0] != identity:
+            _current = (identity, Automaton(read_blocklist(path) if identity else []))
+        return _current[1]
+
+
+def blocked_term(text):
+    """The first blocklisted term in `text`, or None"""
+    return current_automaton().search(text)
+
+
+class RecentComments:
+    """
+    Hashes and times of each user's last few comments, for the most recently
+    active RECENT_USERS users.
+    """
+
+    def __init__(self, max_users=RECENT_USERS, per_user=RECENT_COMMENTS):
+        self.max_users = max_users
+        self.per_user = per_user
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, user_id, text, now=None):
+        """
+        Record a comment, or return why it's rejected (without recording it):
+        'duplicate' or 'flood'. Returns None if it's fine.
+        """
+        now = time.monotonic() if now is None else now
+        digest = hashlib.blake2b(' '.join(words(text)).encode(), digest_size=16).digest()
+        flood_limit = getattr(settings, 'COMMENT_FLOOD_LIMIT', 5)
+        with self._lock:
+            recent = self._users.get(user_id)
+            if recent is None:
+                recent = self._users[user_id] = deque(maxlen=self.per_user)
+                if len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            else:
+                self._users.move_to_end(user_id)
+
+            if any(seen == digest and now - at < DUPLICATE_WINDOW_SECONDS for seen, at in recent):
+                return 'duplicate'
+            if sum(1 for _, at in recent if now - at < FLOOD_WINDOW_SECONDS) >= flood_limit:
+                return 'flood'
+            recent.append((digest, now))
+        return None
+
+
+recent_comments = RecentComments()
+
+
+def check_comment(user_id, text):
+    """
+    Why this comment can't be posted, as a message for the form, or None.
+    Call it once per comment about to be saved: allowed comments are recorded.
+    """
+    term = blocked_term(text)
+    if term is not None:
+        return "Your comment contains language that isn't allowed here."
+    if user_id is None:
+        return None
+    reason = recent_comments.check(user_id, text)
+    if reason == 'duplicate':
+        return "You've already posted that comment."
+    if reason == 'flood':
+        return "You're commenting too quickly. Please wait a minute and try again."
+    return None
+
+
+class ContentFilterMixin:
+    """
+    For comment ModelForms with a `content` field: runs check_comment() on
+    it. Pass the commenting user as author= so duplicates and floods are
+    caught too.
+    """
+
+    def __init__(self, *args, author=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.author = author
+
+    def clean_content(self):
+        content = self.cleaned_data['content']
+        problem = check_comment(self.author.pk if self.author else None, content)
+        if problem:
+            raise forms.ValidationError(problem)
+        return content
@@ -0,0 +1,6 @@
+from .teams import current_team, followed_teams
+
+
+def teams(request):
+    """The team switcher's choices and the team this page is for"""
+    return {'teams': followed_teams(), 'current_team': current_team(request)}
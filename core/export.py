@@ -0,0 +1,178 @@
+"""
+Bulk data exports (odds, line history, schedule, comments) for analysts.
+
+Each app describes what it exports in its exports.py with register(Export(...)):
+a queryset, the columns to export as (header, lookup) pairs, and the fields
+the date-range and season filters apply to. The CSV endpoints
+(csv_response()) and the export_data command (CSV or Parquet) stream rows
+straight from a server-side .iterator(chunk_size=EXPORT_CHUNK_SIZE) as
+values_list tuples, so memory stays flat however many rows there are.
+Under ASGI the response gets an async iterator, since Django reads a sync one
+into memory whole before sending any of it there.
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import router
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.module_loading import autodiscover_modules
+
+EXPORT_CHUNK_SIZE = 2000
+# College football seasons run from late summer into January; season N is July 1 of N to July 1 of N+1
+SEASON_START_MONTH = 7
+
+registry = {}
+
+
+@dataclass
+class Export:
+    name: str
+    # A callable returning the base queryset, so it's built per export
+    queryset: object
+    columns: list
+    # DateTimeField the start/end filters apply to
+    date_field: str
+    # Integer season column, if there is one; otherwise season filters on the season window of date_field
+    season_field: str = None
+
+    @property
+    def headers(self):
+        return [header for header, _ in self.columns]
+
+    def fields(self):
+        """The model field behind each column, following relations"""
+        model = self.queryset().model
+        fields = []
+        for _, lookup in self.columns:
+            current = model
+            for part in lookup.split('__'):
+                field = current._meta.get_field(part)
+                current = field.related_model
+            fields.append(field)
+        return fields
+
+
+def register(export):
+    registry[export.name] = export
+    return export
+
+
+def exports():
+    """Every registered export, by name"""
+    autodiscover_modules('exports')
+    return registry
+
+
+def _local_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def season_window(season):
+    """The [start, end) datetimes of a season, for data without a season column"""
+    return (
+        _local_midnight(datetime(season, SEASON_START_MONTH, 1).date()),
+        _local_midnight(datetime(season + 1, SEASON_START_MONTH, 1).date()),
+    )
+
+
+def parse_filters(params):
+    """
+    start/end (YYYY-MM-DD, both inclusive) and season from request
+    parameters, as keyword arguments for rows(). Raises ValueError with a
+    message for bad values.
+    """
+    filters = {}
+    for name in ('start', 'end'):
+        if params.get(name):
+            try:
+                filters[name] = parse_date(params[name])
+            except ValueError:
+                filters[name] = None
+            if filters[name] is None:
+                raise ValueError(f"{name} must be a date (YYYY-MM-DD).")
+    if params.get('season'):
+        try:
+            filters['season'] = int(params['season'])
+        except ValueError:
+            raise ValueError("season must be a year.") from None
+    return filters
+
+
+def filtered(export, start=None, end=None, season=None, using=None, **lookups):
+    """
+    The export's rows as a values_list queryset, in primary key order, from
+    the `using` database if given. Extra keyword arguments are passed on to
+    filter().
+    """
+    queryset = export.queryset().filter(**lookups)
+    if using:
+        queryset = queryset.using(using)
+    if start:
+        queryset = queryset.filter(**{f"{export.date_field}__gte": _local_midnight(start)})
+    if end:
+        queryset = queryset.filter(**{f"{export.date_field}__lt": _local_midnight(end + timedelta(days=1))})
+    if season:
+        if export.season_field:
+            queryset = queryset.filter(**{export.season_field: season})
+        else:
+            window_start, window_end = season_window(season)
+            queryset = queryset.filter(**{
+                f"{export.date_field}__gte": window_start, f"{export.date_field}__lt": window_end,
+            })
+    return queryset.order_by('pk').values_list(*(lookup for _, lookup in export.columns))
+
+
+def rows(export, **filters):
+    """Tuples of column values, streamed from the database a chunk at a time (filters as for filtered())"""
+    return filtered(export, **filters).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _cell(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def csv_chunks(export, **filters):
+    """The export as CSV text, one piece per EXPORT_CHUNK_SIZE rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export.headers)
+    for count, row in enumerate(rows(export, **filters), 1):
+        writer.writerow([_cell(value) for value in row])
+        if count % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def _async_chunks(chunks):
+    # Each chunk is read in the request's sync thread, where the cursor's connection lives
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while (chunk := await next_chunk(chunks, done)) is not done:
+        yield chunk
+
+
+def csv_response(request, export):
+    """Stream `export` as a CSV download, filtered by the request's start/end/season parameters"""
+    try:
+        filters = parse_filters(request.GET)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    filename = '-'.join([export.name, *(str(value) for value in filters.values())])
+    # The rows are read as the response streams, after the view has returned;
+    # pick the database (a replica, for @read_from_replica views) now
+    using = router.db_for_read(export.queryset().model)
+    chunks = csv_chunks(export, using=using, **filters)
+    if isinstance(request, ASGIRequest):
+        chunks = _async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
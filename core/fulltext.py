@@ -0,0 +1,102 @@
+"""
+Indexed full-text search over a text column, for admin search on tables too
+big to scan with icontains.
+
+A migration adds the index with fulltext_index(app_label, model_name, column):
+on SQLite that's an FTS5 table kept in sync with the model's table by
+triggers, on PostgreSQL a GIN index over to_tsvector('english', column).
+matching(queryset, column, terms) then filters through that index.
+"""
+
+import re
+
+from django.db import connections, migrations
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+
+def _fts_table(table):
+    return f"{table}_fts"
+
+
+def _create_sqlite(schema_editor, table, column):
+    fts = _fts_table(table)
+    statements = [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({column}, content='{table}', content_rowid='id')",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        f"""CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});
+        END""",
+        f"""CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column});
+        END""",
+        f"""CREATE TRIGGER {fts}_update AFTER UPDATE OF {column} ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column});
+            INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});
+        END""",
+    ]
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def _drop_sqlite(schema_editor, table, column):
+    fts = _fts_table(table)
+    for trigger in ('insert', 'delete', 'update'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{trigger}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def fulltext_index(app_label, model_name, column):
+    """A migration operation adding (and, reversed, dropping) the full-text index"""
+    def table(apps):
+        return apps.get_model(app_label, model_name)._meta.db_table
+
+    def forwards(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'sqlite':
+            _create_sqlite(schema_editor, table(apps), column)
+        elif vendor == 'postgresql':
+            schema_editor.execute(
+                f"CREATE INDEX {table(apps)}_{column}_fts ON {table(apps)} "
+                f"USING GIN (to_tsvector('english', {column}))"
+            )
+
+    def backwards(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'sqlite':
+            _drop_sqlite(schema_editor, table(apps), column)
+        elif vendor == 'postgresql':
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table(apps)}_{column}_fts")
+
+    return migrations.RunPython(forwards, backwards)
+
+
+def matching(queryset, column, terms):
+    """
+    Filter `queryset` to rows whose `column` contains every word in `terms`
+    (the last one as a prefix, so partly typed words match). Other databases
+    fall back to icontains.
+    """
+    # Words only, so nothing in `terms` is taken as query syntax
+    words = re.findall(r'\w+', terms)
+    if not words:
+        return queryset
+    table = queryset.model._meta.db_table
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'sqlite':
+        fts = _fts_table(table)
+        query = ' '.join(f'"{word}"' for word in words) + '*'
+        return queryset.filter(RawSQL(
+            f'"{table}"."id" IN (SELECT rowid FROM {fts} WHERE {fts} MATCH %s)', [query],
+            output_field=BooleanField(),
+        ))
+    if vendor == 'postgresql':
+        query = ' & '.join(words) + ':*'
+        return queryset.filter(RawSQL(
+            f"""to_tsvector('english', "{table}"."{column}") @@ to_tsquery('english', %s)""", [query],
+            output_field=BooleanField(),
+        ))
+    for word in words:
+        queryset = queryset.filter(**{f'{column}__icontains': word})
+    return queryset
@@ -0,0 +1,114 @@
+"""
+Registry of ingest runs.
+
+Wrapping an ingest in `with ingest_run('odds:americanfootball_ncaaf') as run:`
+makes sure only one run per source proceeds at a time (overlapping cron
+invocations raise IngestLocked and are recorded as skipped) and records the
+run's duration, counts, remaining API quota and errors in IngestRun.
+
+last_successful_run() answers "how fresh is this data?" from the cache,
+without a query.
+"""
+
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import IngestLease, IngestRun
+
+# Longer than any run should take; a run that crashed without releasing the
+# lease blocks its source for at most this long
+LEASE_SECONDS = 15 * 60
+LAST_SUCCESS_KEY = "ingest:last_success:{}"
+
+
+class IngestLocked(Exception):
+    """Another run of the same source holds the lock"""
+
+
+def _advisory_key(source):
+    # pg advisory locks take a signed 64-bit key; crc32 keeps it stable across processes
+    return zlib.crc32(f"ingest:{source}".encode())
+
+
+def _acquire(source, holder, lease_seconds):
+    if connection.vendor == 'postgresql':
+        # Released by Postgres itself if the process dies, so no expiry needed
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [_advisory_key(source)])
+            return cursor.fetchone()[0]
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            IngestLease.objects.get_or_create(source=source, defaults={'expires_at': now})
+    except IntegrityError:
+        pass  # Another run created it first
+    # Compare-and-swap: only one UPDATE can match while the lease is free
+    return IngestLease.objects.filter(source=source, expires_at__lte=now).update(
+        holder=holder, acquired_at=now, expires_at=now + timedelta(seconds=lease_seconds),
+    ) == 1
+
+
+def _release(source, holder):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [_advisory_key(source)])
+        return
+    IngestLease.objects.filter(source=source, holder=holder).update(holder='', expires_at=timezone.now())
+
+
+@contextmanager
+def ingest_run(source, lease_seconds=LEASE_SECONDS, redact=()):
+    """
+    Hold `source`'s lock for the duration of the block and yield its IngestRun
+    for the caller to fill in (events_seen, rows_written, quota_remaining,
+    errors). The run is marked failed if the block raises. Strings in
+    `redact` (API keys that end up in request URLs) are masked in the
+    recorded errors.
+    """
+    holder = uuid.uuid4().hex
+    if not _acquire(source, holder, lease_seconds):
+        now = timezone.now()
+        IngestRun.objects.create(source=source, status=IngestRun.SKIPPED, finished_at=now, duration=timedelta(0))
+        raise IngestLocked(f"another {source} run is in progress")
+
+    run = IngestRun.objects.create(source=source)
+    started = time.monotonic()
+    try:
+        yield run
+    except BaseException as error:
+        run.status = IngestRun.FAILED
+        run.errors.append(str(error) or type(error).__name__)
+        raise
+    else:
+        run.status = IngestRun.SUCCEEDED
+    finally:
+        for secret in filter(None, redact):
+            run.errors = [message.replace(secret, '***') for message in run.errors]
+        run.finished_at = timezone.now()
+        run.duration = timedelta(seconds=time.monotonic() - started)
+        run.save()
+        _release(source, holder)
+        if run.status == IngestRun.SUCCEEDED:
+            cache.set(LAST_SUCCESS_KEY.format(source), run, None)
+
+
+def last_successful_run(source):
+    """The most recent successful IngestRun for `source`, or None"""
+    # False caches "never succeeded", so that doesn't cost a query per request either
+    run = cache.get(LAST_SUCCESS_KEY.format(source))
+    if run is None:
+        run = (
+            IngestRun.objects.filter(source=source, status=IngestRun.SUCCEEDED)
+            .order_by('-finished_at')
+            .first()
+        ) or False
+        cache.set(LAST_SUCCESS_KEY.format(source), run, None)
+    return run or None
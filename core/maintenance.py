@@ -0,0 +1,54 @@
+"""
+Database housekeeping after large deletes (see odds/retention.py).
+
+Deleting rows doesn't shrink anything by itself: SQLite keeps the freed pages
+in the file, and Postgres leaves dead tuples for VACUUM. compact() reclaims
+the space and refreshes the planner statistics the deletes made stale, and
+storage_size() measures it before and after.
+"""
+
+from django.db import connections
+
+
+def storage_size(models, using='default'):
+    """
+    Bytes used: the whole database file for SQLite (it's one file, and
+    VACUUM rebuilds all of it), the tables with their indexes and TOAST for
+    Postgres, or None for other databases.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("PRAGMA page_count")
+            pages = cursor.fetchone()[0]
+            cursor.execute("PRAGMA page_size")
+            return pages * cursor.fetchone()[0]
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT SUM(pg_total_relation_size(table_name::regclass)) FROM unnest(%s) AS table_name",
+                [[model._meta.db_table for model in models]],
+            )
+            return int(cursor.fetchone()[0] or 0)
+    return None
+
+
+def compact(models, using='default'):
+    """
+    VACUUM and ANALYZE after big deletes. On SQLite, VACUUM rewrites the whole
+    file and blocks writers while it runs; on Postgres, plain VACUUM (no
+    exclusive lock) marks the space reusable and returns the empty tail of
+    each table to the OS.
+    """
+    connection = connections[using]
+    tables = [model._meta.db_table for model in models]
+    # VACUUM can't run inside a transaction
+    if not connection.get_autocommit():
+        raise RuntimeError("compact() must run outside a transaction")
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("VACUUM")
+            for table in tables:
+                cursor.execute(f'ANALYZE "{table}"')
+        elif connection.vendor == 'postgresql':
+            for table in tables:
+                cursor.execute(f'VACUUM (ANALYZE) "{table}"')
@@ -0,0 +1,176 @@
+# In core/management/commands/benchmark_decoding.py
+
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+
+from core.payloads import decode_odds_events, decode_schedule, odds_event_fields
+
+BOOKMAKERS = ['draftkings', 'fanduel', 'betmgm', 'caesars', 'pointsbetus', 'bovada']
+
+
+def _timestamp(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _odds_payload(events, seed=0, team=None):
+    """
+    A full-slate /odds response: every event priced by several bookmakers.
+    If `team` is given it plays at home in every 100th event.
+    """
+    rng = random.Random(seed)
+    kickoff = datetime(2025, 9, 6, 16, tzinfo=timezone.utc)
+    payload = []
+    for index in range(events):
+        home, away = f"Home Team {index}", f"Away Team {index}"
+        if team and index % 100 == 0:
+            home = team
+        spread = rng.choice([-14.5, -7, -3.5, -1, 2.5, 6.5, 10])
+        total = rng.choice([44.5, 51, 55.5, 61])
+        payload.append({
+            'id': f"{index:032x}",
+            'sport_key': 'americanfootball_ncaaf',
+            'commence_time': _timestamp(kickoff + timedelta(hours=index % 48)),
+            'home_team': home,
+            'away_team': away,
+            'bookmakers': [{
+                'key': key,
+                'title': key.title(),
+                'last_update': _timestamp(kickoff - timedelta(minutes=rng.randint(1, 600))),
+                'markets': [
+                    {'key': 'h2h', 'outcomes': [
+                        {'name': home, 'price': rng.randint(-400, -105)},
+                        {'name': away, 'price': rng.randint(100, 350)},
+                    ]},
+                    {'key': 'spreads', 'outcomes': [
+                        {'name': home, 'price': -110, 'point': spread},
+                        {'name': away, 'price': -110, 'point': -spread},
+                    ]},
+                    {'key': 'totals', 'outcomes': [
+                        {'name': 'Over', 'price': -110, 'point': total},
+                        {'name': 'Under', 'price': -110, 'point': total},
+                    ]},
+                ],
+            } for key in BOOKMAKERS],
+        })
+    return json.dumps(payload).encode()
+
+
+def _schedule_payload(games):
+    start = datetime(2025, 8, 30, 16, tzinfo=timezone.utc)
+    return json.dumps([{
+        'id': index, 'season': 2025, 'week': index % 15 + 1, 'seasonType': 'regular',
+        'startDate': (start + timedelta(days=index % 100)).isoformat(timespec='milliseconds'),
+        'startTimeTbd': index % 7 == 0, 'completed': index % 2 == 0, 'neutralSite': False,
+        'conferenceGame': index % 3 == 0, 'homeTeam': f"Home Team {index}", 'awayTeam': f"Away Team {index}",
+        'venue': f"Stadium {index}", 'homePoints': 24, 'awayPoints': 17,
+    } for index in range(games)]).encode()
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _legacy_odds(content):
+    """The previous fetch_odds path: json.loads, then a scan of the markets per market type"""
+    rows = []
+    for game_data in json.loads(content):
+        for bookmaker in game_data.get('bookmakers', []):
+            fields = {
+                'home_team': game_data['home_team'],
+                'away_team': game_data['away_team'],
+                'game_time': _parse_time(game_data['commence_time']),
+                'bookmaker_name': bookmaker.get('title', bookmaker['key']),
+                'last_updated': _parse_time(bookmaker['last_update']),
+            }
+            for market_key in ('h2h', 'spreads', 'totals'):
+                for market in bookmaker.get('markets', []):
+                    if market['key'] != market_key:
+                        continue
+                    for outcome in market.get('outcomes', []):
+                        if market_key == 'totals':
+                            side = outcome['name'].lower()
+                            fields[f'total_{side}'] = outcome['point']
+                            fields[f'total_{side}_price'] = outcome['price']
+                        elif outcome['name'] == fields['home_team']:
+                            fields['home_team_moneyline' if market_key == 'h2h' else 'home_team_spread'] = (
+                                outcome['price'] if market_key == 'h2h' else outcome['point']
+                            )
+                        elif outcome['name'] == fields['away_team']:
+                            fields['away_team_moneyline' if market_key == 'h2h' else 'away_team_spread'] = (
+                                outcome['price'] if market_key == 'h2h' else outcome['point']
+                            )
+                    break
+            rows.append(fields)
+    return rows
+
+
+def _typed_odds(content):
+    decoded = decode_odds_events(content)
+    return [
+        odds_event_fields(event, bookmaker)
+        for event in decoded.records
+        for bookmaker in event.bookmakers
+    ]
+
+
+def _legacy_schedule(content):
+    rows = []
+    for game in json.loads(content):
+        start_date = game.get('startDate') or game.get('start_date')
+        rows.append({
+            'home_team': game.get('homeTeam') or game.get('home_team') or '',
+            'away_team': game.get('awayTeam') or game.get('away_team') or '',
+            'game_date': _parse_time(start_date) if start_date else None,
+            'venue': game.get('venue') or '',
+            'completed': game.get('completed', False),
+        })
+    return rows
+
+
+def _typed_schedule(content):
+    return decode_schedule(content).records
+
+
+class Command(BaseCommand):
+    help = "Compares the typed payload decoders with plain json + dict walking on a large synthetic payload"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=5000, help='Odds events in the payload (default: 5000)')
+        parser.add_argument('--games', type=int, default=20000, help='Schedule games in the payload (default: 20000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per decoder; the best is kept (default: 5)')
+
+    def best(self, decode, content, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = decode(content)
+            timings.append(time.perf_counter() - started)
+        return min(timings), len(rows)
+
+    def compare(self, label, content, legacy, typed, repeat):
+        legacy_seconds, legacy_rows = self.best(legacy, content, repeat)
+        typed_seconds, typed_rows = self.best(typed, content, repeat)
+        megabytes = len(content) / 1024 / 1024
+        self.stdout.write(f"{label}: {megabytes:.1f} MB")
+        self.stdout.write(
+            f"  json + dicts:  {legacy_seconds * 1000:8.1f} ms  {megabytes / legacy_seconds:7.1f} MB/s  ({legacy_rows} rows)"
+        )
+        self.stdout.write(
+            f"  typed structs: {typed_seconds * 1000:8.1f} ms  {megabytes / typed_seconds:7.1f} MB/s  ({typed_rows} rows)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"  speedup:       {legacy_seconds / typed_seconds:8.1f}x"))
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        self.compare(
+            f"/odds, {options['events']} events x {len(BOOKMAKERS)} bookmakers",
+            _odds_payload(options['events']), _legacy_odds, _typed_odds, repeat,
+        )
+        self.compare(
+            f"/games, {options['games']} games",
+            _schedule_payload(options['games']), _legacy_schedule, _typed_schedule, repeat,
+        )
@@ -0,0 +1,37 @@
+# In core/management/commands/benchmark_page_cache.py
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+
+class Command(BaseCommand):
+    help = "Measures anonymous requests/sec for a page with the page cache off and on"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/odds/', help='Page to request (default: /odds/)')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per run (default: 500)')
+
+    def run(self, path, count):
+        client = Client()
+        client.get(path)  # Warm up imports, templates and (when enabled) the cache
+        started = time.perf_counter()
+        for _ in range(count):
+            response = client.get(path)
+            assert response.status_code == 200, response.status_code
+        return count / (time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        path, count = options['path'], options['requests']
+        # ALLOWED_HOSTS may not include the test client's "testserver"
+        with override_settings(ALLOWED_HOSTS=['*']):
+            with override_settings(PAGE_CACHE_ENABLED=False):
+                uncached = self.run(path, count)
+            with override_settings(PAGE_CACHE_ENABLED=True):
+                cached = self.run(path, count)
+
+        self.stdout.write(f"{path} over {count} anonymous requests:")
+        self.stdout.write(f"  page cache off: {uncached:8.1f} req/s")
+        self.stdout.write(f"  page cache on:  {cached:8.1f} req/s")
+        self.stdout.write(self.style.SUCCESS(f"  speedup:        {cached / uncached:8.1f}x"))
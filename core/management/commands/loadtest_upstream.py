@@ -0,0 +1,103 @@
+# In core/management/commands/loadtest_upstream.py
+
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+
+import news.views
+import schedule.views
+from home import dashboard
+
+
+def _stub_server(delay):
+    """A local stand-in for NewsAPI/CFBD that takes `delay` seconds to answer"""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            time.sleep(delay)
+            if self.path.startswith('/games'):
+                payload = [{
+                    'id': 1, 'season': 2025, 'week': 1, 'seasonType': 'regular',
+                    'homeTeam': 'Georgia Tech', 'awayTeam': 'Stub State',
+                    'startDate': '2025-09-01T23:30:00.000Z', 'completed': False,
+                }]
+            else:
+                payload = {'status': 'ok', 'articles': [{
+                    'title': 'Stub headline', 'url': 'https://example.com',
+                    'source': {'name': 'Stub'}, 'publishedAt': '2025-09-01T12:00:00Z',
+                }]}
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hits
+
+
+class Command(BaseCommand):
+    help = "Fires concurrent page loads at the async home/news/schedule views with a deliberately slow upstream stub"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/news/', help='/, /news/ or /schedule/ (default: /news/)')
+        parser.add_argument('--concurrency', type=int, default=200, help='Simultaneous page loads (default: 200)')
+        parser.add_argument('--delay', type=float, default=2.0, help='Upstream response time in seconds (default: 2)')
+
+    async def load(self, path, concurrency):
+        client = AsyncClient()
+
+        async def one():
+            started = time.perf_counter()
+            response = await client.get(path)
+            return response.status_code, time.perf_counter() - started
+
+        return await asyncio.gather(*(one() for _ in range(concurrency)))
+
+    def handle(self, *args, **options):
+        server, hits = _stub_server(options['delay'])
+        stub_url = f"http://127.0.0.1:{server.server_port}"
+        news.views.NEWS_API_URL = f"{stub_url}/everything"
+        schedule.views.SCHEDULE_API_URL = stub_url
+        # Start the home page's widgets cold, so their loaders (and timeouts) are measured
+        for widget in dashboard.WIDGETS:
+            if not widget.per_user:
+                dashboard.invalidate(widget.name)
+
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=['*'],
+                PAGE_CACHE_ENABLED=False,  # Measure the views, not the page cache
+                MAX_IN_FLIGHT_REQUESTS=0,  # Every page load gets through, rather than being shed
+                NEWS_API_KEY='stub',
+                SCHEDULE_API_KEY='stub',
+            ):
+                started = time.perf_counter()
+                results = asyncio.run(self.load(options['path'], options['concurrency']))
+                elapsed = time.perf_counter() - started
+        finally:
+            server.shutdown()
+
+        latencies = sorted(latency for _, latency in results)
+        ok = sum(1 for status, _ in results if status == 200)
+        self.stdout.write(f"{options['concurrency']} concurrent GET {options['path']}, upstream delay {options['delay']}s")
+        self.stdout.write(f"  succeeded:        {ok}/{len(results)}")
+        self.stdout.write(f"  wall time:        {elapsed:.2f}s")
+        self.stdout.write(f"  latency p50/p99:  {statistics.median(latencies):.2f}s / {latencies[int(len(latencies) * 0.99) - 1]:.2f}s")
+        self.stdout.write(f"  upstream calls:   {len(hits)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"  throughput:       {len(results) / elapsed:.1f} pages/s"
+        ))
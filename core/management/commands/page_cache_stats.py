@@ -0,0 +1,28 @@
+# In core/management/commands/page_cache_stats.py
+
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+from core import page_cache
+
+
+class Command(BaseCommand):
+    help = "Shows hit/miss counts and hit ratio for each page in the anonymous page cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Clear the counters after printing')
+
+    def handle(self, *args, **options):
+        # Importing the URLconf imports every view, which registers the cached pages
+        get_resolver().url_patterns
+
+        for page in page_cache.registered_pages:
+            stats = page_cache.page_stats(page)
+            ratio = 'n/a' if stats['hit_ratio'] is None else f"{stats['hit_ratio']:.1%}"
+            self.stdout.write(
+                f"{page:<24} hits={stats['hits']:<8} misses={stats['misses']:<8} hit ratio={ratio}"
+            )
+
+        if options['reset']:
+            page_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,76 @@
+# In core/management/commands/run_worker.py
+
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connections
+from django.utils.module_loading import autodiscover_modules
+
+from core import queue
+
+
+class Command(BaseCommand):
+    help = "Runs queued background tasks (core.queue) with N concurrent workers until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent workers (default: 4)')
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds an idle worker waits before looking for due tasks again (default: 1)',
+        )
+        parser.add_argument('--once', action='store_true', help='Run every task that is due, then exit')
+
+    def handle(self, *args, **options):
+        # Importing each app's tasks module registers its tasks
+        autodiscover_modules('tasks')
+        if not options['once']:
+            queue.schedule_periodic()
+
+        stopping = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write("Stopping once the running tasks finish...")
+            stopping.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        threads = [
+            threading.Thread(
+                target=self.work, args=(f"{prefix}:{number}", stopping, options), daemon=True,
+            )
+            for number in range(options['workers'])
+        ]
+        self.stdout.write(f"Started {len(threads)} worker(s); tasks: {', '.join(sorted(queue.registry))}")
+        for thread in threads:
+            thread.start()
+        # join() with a timeout so signals are still handled while waiting
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(0.5)
+
+    def work(self, worker, stopping, options):
+        try:
+            while not stopping.is_set():
+                close_old_connections()
+                try:
+                    task = queue.claim(worker)
+                    if task is not None:
+                        self.stdout.write(f"{worker}: running {task.name} #{task.id} (attempt {task.attempts})")
+                        queue.run(task)
+                        continue
+                except DatabaseError as e:
+                    # e.g. SQLite "database is locked" while another worker writes; a
+                    # task whose outcome couldn't be recorded is picked up again when
+                    # its lease runs out
+                    self.stderr.write(f"{worker}: {e}, retrying")
+
+                if options['once']:
+                    return
+                stopping.wait(options['poll_interval'])
+        finally:
+            connections.close_all()
@@ -0,0 +1,56 @@
+# In core/management/commands/smtp_stub.py
+
+import socketserver
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Runs a local SMTP server that prints every message it receives (for alert digests in development)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--port', type=int, default=1025, help='Port to listen on (default: 1025, EMAIL_PORT)')
+
+    def handle(self, *args, **options):
+        stdout = self.stdout
+
+        class Handler(socketserver.StreamRequestHandler):
+            """Just enough SMTP for Django's backend: accept everything, print each message"""
+
+            def reply(self, line):
+                self.wfile.write(f"{line}\r\n".encode())
+
+            def handle(self):
+                self.reply("220 smtp_stub ready")
+                sender, recipients = None, []
+                while line := self.rfile.readline():
+                    command = line.decode(errors='replace').strip()
+                    verb = command[:4].upper()
+                    if verb == 'EHLO':
+                        self.reply("250 smtp_stub")
+                    elif verb == 'MAIL':
+                        sender, recipients = command[10:], []
+                        self.reply("250 OK")
+                    elif verb == 'RCPT':
+                        recipients.append(command[8:])
+                        self.reply("250 OK")
+                    elif verb == 'DATA':
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        body = []
+                        while (data := self.rfile.readline()) not in (b'.\r\n', b''):
+                            body.append(data.decode(errors='replace'))
+                        stdout.write(f"---------- from {sender} to {', '.join(recipients)}")
+                        stdout.write(''.join(body))
+                        self.reply("250 OK")
+                    elif verb == 'QUIT':
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        # HELO, RSET, NOOP
+                        self.reply("250 OK")
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        with socketserver.ThreadingTCPServer((options['host'], options['port']), Handler) as server:
+            self.stdout.write(f"SMTP stub listening on {options['host']}:{options['port']}")
+            server.serve_forever()
@@ -0,0 +1,41 @@
+# In core/management/commands/static_size_report.py
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Reports raw, gzip and brotli sizes of the collected (hashed) static files"
+
+    def handle(self, *args, **options):
+        static_root = Path(settings.STATIC_ROOT)
+        manifest_path = static_root / 'staticfiles.json'
+        if not manifest_path.exists():
+            raise CommandError("No staticfiles manifest found. Run `python3 manage.py collectstatic` first.")
+
+        manifest = json.loads(manifest_path.read_text())['paths']
+        totals = {'raw': 0, 'gzip': 0, 'brotli': 0}
+
+        self.stdout.write(f"{'file':<48} {'raw':>9} {'gzip':>9} {'brotli':>9}")
+        for hashed in sorted(manifest.values()):
+            path = static_root / hashed
+            raw = path.stat().st_size
+            # WhiteNoise skips variants for files that don't shrink (e.g. images),
+            # and only builds .br files when the brotli package is installed
+            gz = self._variant_size(path, '.gz')
+            br = self._variant_size(path, '.br')
+            totals['raw'] += raw
+            totals['gzip'] += gz or raw
+            totals['brotli'] += br or gz or raw
+            self.stdout.write(f"{hashed:<48} {raw:>9} {gz or '-':>9} {br or '-':>9}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'total (smallest served variant)':<48} {totals['raw']:>9} {totals['gzip']:>9} {totals['brotli']:>9}"
+        ))
+
+    def _variant_size(self, path, suffix):
+        variant = path.with_name(path.name + suffix)
+        return variant.stat().st_size if variant.exists() else None
@@ -0,0 +1,40 @@
+# In core/management/commands/sync_replicas.py
+
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.replicas import replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the primary SQLite database into every DATABASE_REPLICAS file, "
+        "standing in for replication when running with SQLite replicas locally"
+    )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError(
+                f"The primary is {primary.vendor}; its own replication keeps the replicas in sync."
+            )
+        replicas = replica_aliases()
+        if not replicas:
+            raise CommandError("No replicas configured; set DATABASE_REPLICAS.")
+
+        # The backup API takes a consistent copy even while the primary is being written to
+        source = sqlite3.connect(settings.DATABASES[DEFAULT_DB_ALIAS]['NAME'])
+        try:
+            for alias in replicas:
+                connections[alias].close()
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(self.style.SUCCESS(f"Copied the primary to {alias}."))
+        finally:
+            source.close()
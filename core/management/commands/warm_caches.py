@@ -0,0 +1,29 @@
+# In core/management/commands/warm_caches.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.warming import warm_caches, warm_paths
+
+
+class Command(BaseCommand):
+    help = "Renders the list pages and upcoming game pages so the first visitors hit a warm cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Pages rendered concurrently (default: 4)')
+        parser.add_argument('paths', nargs='*', help='Paths to warm instead of the default pages')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or warm_paths()
+        started = time.perf_counter()
+        results = warm_caches(paths, workers=options['workers'])
+        elapsed = time.perf_counter() - started
+
+        for warmed in results:
+            style = self.style.SUCCESS if warmed.status == 200 else self.style.WARNING
+            self.stdout.write(style(f"{warmed.status}  {warmed.seconds * 1000:7.0f} ms  {warmed.path} ({warmed.team})"))
+        self.stdout.write(
+            f"Warmed {len(results)} page(s) in {elapsed:.2f}s "
+            f"({sum(warmed.seconds for warmed in results):.2f}s of rendering)."
+        )
@@ -0,0 +1,97 @@
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, but usable in an async middleware chain.
+
+    WhiteNoiseMiddleware is sync-only, and a single sync-only middleware makes
+    Django run every request under ASGI through one thread, which would undo
+    the async views. Static hits are served in a worker thread; everything
+    else goes straight to the next handler.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Sheds load instead of queueing it. Once MAX_IN_FLIGHT_REQUESTS requests
+    are already being handled in this process, further ones get an immediate
+    503 with Retry-After rather than waiting behind them until they time out.
+    0 turns the limit off.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limit = getattr(settings, 'MAX_IN_FLIGHT_REQUESTS', 0)
+        self.in_flight = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _enter(self):
+        with self._lock:
+            if self.limit and self.in_flight >= self.limit:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _overloaded(self):
+        response = HttpResponse("The site is busy right now. Please try again in a moment.", status=503)
+        response['Retry-After'] = '1'
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self._enter():
+            return self._overloaded()
+        try:
+            return self.get_response(request)
+        finally:
+            self._exit()
+
+    async def __acall__(self, request):
+        if not self._enter():
+            return self._overloaded()
+        try:
+            return await self.get_response(request)
+        finally:
+            self._exit()
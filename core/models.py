@@ -0,0 +1,97 @@
+from django.db import models
+
+
+class IngestLease(models.Model):
+    """
+    Who is allowed to run an ingest source right now. A run takes the lease
+    by moving `expires_at` forward, so a crashed run only blocks the source
+    until its lease runs out. (On PostgreSQL an advisory lock is used instead.)
+    """
+    source = models.CharField(max_length=100, unique=True)
+    holder = models.CharField(max_length=64, blank=True)
+    acquired_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.source} ({self.holder or 'free'})"
+
+
+class IngestRun(models.Model):
+    """One run of an ingest command (fetch_odds, ...), for history and data freshness"""
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+    STATUS_CHOICES = [
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+        (SKIPPED, 'Skipped (another run held the lock)'),
+    ]
+
+    source = models.CharField(max_length=100)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=RUNNING)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.DurationField(null=True, blank=True)
+    events_seen = models.IntegerField(default=0)
+    rows_written = models.IntegerField(default=0)
+    # From the upstream's quota headers (The Odds API: x-requests-remaining)
+    quota_remaining = models.IntegerField(null=True, blank=True)
+    errors = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['source', 'status', '-finished_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.status} at {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class Task(models.Model):
+    """
+    A unit of background work for run_worker (see core.queue). `name` is the
+    registered task and `kwargs` its JSON arguments. A queued task with a `key`
+    is unique, so enqueueing the same keyed work again while it's still
+    waiting does nothing.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    key = models.CharField(max_length=200, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_at = models.DateTimeField()
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    # Which worker has it, and until when; a task whose worker died is picked up again after this
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'], condition=models.Q(status='queued'), name='core_task_unique_queued_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
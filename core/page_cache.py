@@ -0,0 +1,176 @@
+"""
+Full-page cache for anonymous visitors.
+
+Views opt in with @cache_page_for_anonymous(*groups). A cached page is stored
+under a key that includes the current version of each of its groups, so
+bumping a group (bump_pages('odds')) makes every page that depends on it miss
+on the next request without having to find and delete the old entries.
+
+Groups can use the view's URL kwargs, e.g. 'news.article.{article_id}'.
+Pages are cached per followed team (core/teams.py), since they show the
+visitor's current one.
+Both sync and async views are supported.
+
+Inside `with refreshing():` cached pages aren't read, only rendered and
+stored again (cache warming, see core/warming.py).
+"""
+
+import contextlib
+import contextvars
+import functools
+import hashlib
+import time
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .teams import current_team
+
+VERSION_KEY = "page_cache:version:{}"
+PAGE_KEY = "page_cache:page:{}:{}"
+STATS_KEY = "page_cache:stats:{}:{}"
+
+# Names of every page using the cache, for the stats command
+registered_pages = []
+
+# A context variable rather than a request header, so visitors can't force re-renders
+_refreshing = contextvars.ContextVar('page_cache_refreshing', default=False)
+
+
+@contextlib.contextmanager
+def refreshing():
+    """Re-render and re-store pages requested in this block instead of serving them from the cache"""
+    token = _refreshing.set(True)
+    try:
+        yield
+    finally:
+        _refreshing.reset(token)
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def _group_version(group):
+    return cache.get_or_set(VERSION_KEY.format(group), _new_version, None)
+
+
+def bump_pages(*groups):
+    """Invalidate every cached page that depends on any of these groups"""
+    # A fresh timestamp rather than incr() so an evicted version can never come back
+    cache.set_many({VERSION_KEY.format(group): _new_version() for group in groups}, None)
+
+
+def _record(page, outcome):
+    key = STATS_KEY.format(page, outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, None)
+
+
+def page_stats(page):
+    """Hit/miss counts and hit ratio for a registered page"""
+    hits = cache.get(STATS_KEY.format(page, 'hits'), 0)
+    misses = cache.get(STATS_KEY.format(page, 'misses'), 0)
+    total = hits + misses
+    return {
+        'page': page,
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else None,
+    }
+
+
+def reset_stats():
+    cache.delete_many(
+        [STATS_KEY.format(page, outcome) for page in registered_pages for outcome in ('hits', 'misses')]
+    )
+
+
+def _is_cacheable(request, user):
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    return not user.is_authenticated
+
+
+def _page_key(request, groups, kwargs):
+    versions = ':'.join(str(_group_version(group.format(**kwargs))) for group in groups)
+    # Pages show the visitor's team, which can come from a cookie rather than the URL
+    path_hash = hashlib.md5(f"{current_team(request).slug}:{request.get_full_path()}".encode()).hexdigest()
+    return PAGE_KEY.format(path_hash, versions)
+
+
+def _cached_response(page, key):
+    """The cached response for `key`, or None; records the hit/miss either way"""
+    if _refreshing.get():
+        return None
+    cached = cache.get(key)
+    if cached is None:
+        _record(page, 'misses')
+        return None
+    _record(page, 'hits')
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def _store(key, response):
+    # Anything that sets a cookie (CSRF, session) is specific to this visitor,
+    # and views mark degraded pages (stale or missing sections) no-store
+    if (
+        response.status_code == 200 and not response.cookies and not response.streaming
+        and 'no-store' not in response.get('Cache-Control', '')
+    ):
+        cache.set(
+            key,
+            (response.content, response['Content-Type']),
+            getattr(settings, 'PAGE_CACHE_TIMEOUT', 300),
+        )
+    response['X-Page-Cache'] = 'MISS'
+
+
+def cache_page_for_anonymous(*groups):
+    """Cache a view's rendered response for anonymous GETs, versioned by `groups`"""
+    def decorator(view):
+        page = view.__name__
+        registered_pages.append(page)
+
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # Resolve the user without lazy (sync-only) ORM access from the event loop
+                request.user = await request.auser()
+                if not _is_cacheable(request, request.user):
+                    return await view(request, *args, **kwargs)
+
+                key = await sync_to_async(_page_key)(request, groups, kwargs)
+                response = await sync_to_async(_cached_response)(page, key)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    await sync_to_async(_store)(key, response)
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable(request, request.user):
+                return view(request, *args, **kwargs)
+
+            key = _page_key(request, groups, kwargs)
+            response = _cached_response(page, key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                _store(key, response)
+            return response
+
+        return wrapper
+    return decorator
@@ -0,0 +1,297 @@
+"""
+Typed decoders for the three upstream payloads: The Odds API events, NewsAPI
+articles and College Football Data games.
+
+Response bodies are decoded straight from bytes with msgspec. The envelope is
+split into raw records first and each record is decoded on its own, so one
+malformed record is rejected with a structured error instead of failing the
+whole payload. Timestamps are parsed by msgspec as part of decoding.
+
+Odds payloads can also be streamed: iter_odds_events() splits records out of
+the body as chunks arrive, so memory is bounded by the largest single event
+rather than the whole response.
+"""
+
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+import msgspec
+import numpy as np
+
+
+class PayloadError(ValueError):
+    """The payload as a whole is unusable (bad JSON, wrong envelope, error status)"""
+
+
+class RejectedRecord(NamedTuple):
+    index: int
+    message: str
+
+    def __str__(self):
+        return f"record {self.index}: {self.message}"
+
+
+class Decoded(NamedTuple):
+    records: list
+    rejected: list
+
+
+def aware(value):
+    """Treat naive upstream timestamps as UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _iter_records(raw_records, decoder, rejected):
+    for index, raw in enumerate(raw_records):
+        try:
+            yield decoder.decode(raw)
+        except msgspec.DecodeError as error:
+            # Includes ValidationError (wrong shape) as well as bad JSON inside a streamed record
+            rejected.append(RejectedRecord(index, str(error)))
+
+
+def _decode_records(raw_records, decoder):
+    rejected = []
+    return Decoded(list(_iter_records(raw_records, decoder, rejected)), rejected)
+
+
+_QUOTE, _BACKSLASH = 0x22, 0x5c
+_OPENERS, _CLOSERS = (0x7b, 0x5b), (0x7d, 0x5d)  # {[ and }]
+
+
+def _scan(buffer, pos, depth):
+    """
+    Find where the top-level array's items open and close in buffer[pos:],
+    vectorized with numpy so a 50 MB body isn't walked byte by byte in Python.
+
+    Returns the item boundaries as (index, is_open) pairs, the depth and
+    position to resume from, and whether the array closed. Scanning stops
+    before a string that runs off the end of the buffer, so a scan never
+    resumes inside a string.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)[pos:]
+    is_quote = data == _QUOTE
+    for index in np.flatnonzero(is_quote & (np.roll(data, 1) == _BACKSLASH)):
+        # Escaped if preceded by an odd number of backslashes (rare, so a plain loop)
+        run = 0
+        while index - run > 0 and data[index - run - 1] == _BACKSLASH:
+            run += 1
+        is_quote[index] = run % 2 == 0
+    quotes = np.flatnonzero(is_quote)
+    if len(quotes) % 2:
+        data, is_quote = data[:quotes[-1]], is_quote[:quotes[-1]]
+
+    outside = np.cumsum(is_quote) % 2 == 0
+    opens = np.isin(data, _OPENERS) & outside
+    closes = np.isin(data, _CLOSERS) & outside
+    depths = depth + np.cumsum(opens.astype(np.int64) - closes)
+
+    if depth == 0:
+        structural = np.flatnonzero(opens | closes)
+        if len(structural) and data[structural[0]] != 0x5b:
+            raise PayloadError("expected a JSON array")
+
+    ends = np.flatnonzero(closes & (depths == 0))
+    limit = ends[0] if len(ends) else len(data)
+    boundaries = sorted(
+        [(pos + int(i), True) for i in np.flatnonzero(opens[:limit] & (depths[:limit] == 2))]
+        + [(pos + int(i), False) for i in np.flatnonzero(closes[:limit] & (depths[:limit] == 1))]
+    )
+    new_depth = int(depths[len(data) - 1]) if len(data) else depth
+    return boundaries, pos + len(data), new_depth, bool(len(ends))
+
+
+def iter_array_items(chunks):
+    """
+    Yield the raw bytes of each object (or array) in a top-level JSON array,
+    reading `chunks` (an iterable of bytes) incrementally. Only the item being
+    scanned is kept in memory. Raises PayloadError if the body isn't an array
+    or ends early.
+    """
+    buffer = b''
+    pos = 0  # Where scanning resumes in buffer
+    start = None  # Where the current item begins in buffer
+    depth = 0
+    for chunk in chunks:
+        buffer += chunk
+        boundaries, pos, depth, finished = _scan(buffer, pos, depth)
+        for index, is_open in boundaries:
+            if is_open:
+                start = index
+            else:
+                yield buffer[start:index + 1]
+                start = None
+        if finished:
+            return
+
+        # Drop everything before the current item (or the scan position, between items)
+        keep = pos if start is None else start
+        buffer, pos = buffer[keep:], pos - keep
+        if start is not None:
+            start = 0
+    raise PayloadError("truncated JSON array")
+
+
+def _decode_envelope(content, envelope_type):
+    try:
+        return msgspec.json.decode(content, type=envelope_type)
+    except msgspec.DecodeError as error:
+        # ValidationError is a DecodeError too, so this covers bad JSON and a bad envelope
+        raise PayloadError(str(error)) from error
+
+
+# --- The Odds API ---
+# gc=False: a full slate is tens of thousands of these and they never form
+# cycles, so there's no point in the garbage collector tracking them
+
+class Outcome(msgspec.Struct, gc=False):
+    name: str
+    price: int
+    point: float | None = None
+
+
+class Market(msgspec.Struct, gc=False):
+    key: str
+    outcomes: list[Outcome] = []
+
+
+class Bookmaker(msgspec.Struct, gc=False):
+    key: str
+    last_update: datetime
+    title: str = ''
+    markets: list[Market] = []
+
+
+class OddsEvent(msgspec.Struct, gc=False):
+    id: str
+    commence_time: datetime
+    home_team: str
+    away_team: str
+    bookmakers: list[Bookmaker] = []
+
+
+_odds_event_decoder = msgspec.json.Decoder(OddsEvent)
+
+
+def decode_odds_events(content):
+    """Decode an /odds response body into OddsEvent records"""
+    return _decode_records(_decode_envelope(content, list[msgspec.Raw]), _odds_event_decoder)
+
+
+def iter_odds_events(chunks, rejected):
+    """
+    Stream OddsEvent records out of an /odds response body arriving as
+    `chunks`; malformed events are appended to `rejected` as they're skipped.
+    """
+    return _iter_records(iter_array_items(chunks), _odds_event_decoder, rejected)
+
+
+def odds_event_fields(event, bookmaker):
+    """
+    The odds.Game fields for one event from one bookmaker, reading every
+    market in a single pass.
+    """
+    fields = {
+        'home_team': event.home_team,
+        'away_team': event.away_team,
+        'game_time': aware(event.commence_time),
+        'bookmaker_name': bookmaker.title or bookmaker.key,
+        'last_updated': aware(bookmaker.last_update),
+    }
+    sides = {event.home_team: 'home_team', event.away_team: 'away_team'}
+
+    for market in bookmaker.markets:
+        if market.key == 'h2h':
+            for outcome in market.outcomes:
+                side = sides.get(outcome.name)
+                if side:
+                    fields.setdefault(f'{side}_moneyline', outcome.price)
+        elif market.key == 'spreads':
+            for outcome in market.outcomes:
+                side = sides.get(outcome.name)
+                if side:
+                    fields.setdefault(f'{side}_spread', outcome.point)
+                    fields.setdefault(f'{side}_spread_price', outcome.price)
+        elif market.key == 'totals':
+            for outcome in market.outcomes:
+                if outcome.name in ('Over', 'Under'):
+                    side = outcome.name.lower()
+                    fields.setdefault(f'total_{side}', outcome.point)
+                    fields.setdefault(f'total_{side}_price', outcome.price)
+    return fields
+
+
+# --- NewsAPI ---
+
+class ArticleSource(msgspec.Struct):
+    name: str | None = None
+
+
+class Article(msgspec.Struct, rename='camel'):
+    title: str | None = None
+    description: str | None = None
+    url: str | None = None
+    url_to_image: str | None = None
+    source: ArticleSource | None = None
+    author: str | None = None
+    published_at: datetime | None = None
+
+
+class _NewsEnvelope(msgspec.Struct):
+    status: str
+    articles: list[msgspec.Raw] = []
+
+
+_article_decoder = msgspec.json.Decoder(Article)
+
+
+def decode_news(content):
+    """Decode a NewsAPI /everything response body into Article records"""
+    envelope = _decode_envelope(content, _NewsEnvelope)
+    if envelope.status != 'ok':
+        raise PayloadError(f"status {envelope.status!r}")
+    return _decode_records(envelope.articles, _article_decoder)
+
+
+# --- College Football Data ---
+
+_SCHEDULE_GAME_FIELDS = [
+    ('id', int | None, None),
+    ('season', int | None, None),
+    ('week', int | None, None),
+    ('season_type', str | None, None),
+    ('home_team', str, ''),
+    ('away_team', str, ''),
+    ('start_date', datetime | None, None),
+    ('start_time', str | None, None),
+    ('start_time_tbd', bool, False),
+    ('venue', str | None, None),
+    ('home_points', int | None, None),
+    ('away_points', int | None, None),
+    ('completed', bool, False),
+    ('neutral_site', bool, False),
+    ('conference_game', bool, False),
+]
+
+# CFBD uses camelCase, but older responses and some mirrors use snake_case
+ScheduleGame = msgspec.defstruct(
+    'ScheduleGame', _SCHEDULE_GAME_FIELDS, rename='camel', module=__name__,
+)
+SnakeCaseScheduleGame = msgspec.defstruct(
+    'SnakeCaseScheduleGame', _SCHEDULE_GAME_FIELDS, module=__name__,
+)
+
+
+_camel_game_decoder = msgspec.json.Decoder(ScheduleGame)
+_snake_game_decoder = msgspec.json.Decoder(SnakeCaseScheduleGame)
+
+
+def decode_schedule(content):
+    """Decode a CFBD /games response body into ScheduleGame records"""
+    raw_records = _decode_envelope(content, list[msgspec.Raw])
+    # A response uses one naming style throughout, so check once instead of
+    # trying every spelling of every field on every record
+    decoder = _snake_game_decoder if b'"home_team"' in content[:4096] else _camel_game_decoder
+    return _decode_records(raw_records, decoder)
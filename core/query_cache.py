@@ -0,0 +1,196 @@
+"""
+Cached ORM results for the small lookups every request repeats.
+
+Models opt in with `objects = CachingManager()`, which adds:
+
+- get_cached(pk): one instance, cached under that instance's version;
+- cached_query(key, build, depends): whatever build() returns (a list, a set
+  of ids...), cached under the versions of `depends`, models or instances.
+
+As with the page cache (core/page_cache.py), nothing is deleted on writes.
+Results are stored under keys that include the current versions of what they
+depend on, and a write bumps those versions: the model's, the instance's and
+those of the `parents` the manager names (SavedBet bumps its user's, so a
+user's saved ids are only rebuilt when *they* save or unsave). post_save and
+post_delete bump automatically; bulk writes that skip signals (bulk_create,
+bulk_update, update()) call bump() themselves, as odds/ingest.py does.
+
+Versions live in the default cache, so every process sees a bump. Results
+are kept in a size-bounded in-process LRU (QUERY_CACHE_SIZE entries) and, if
+QUERY_CACHE_BACKEND names a cache, there too, shared between processes.
+Cached instances are shared by every caller in the process, so treat them as
+read-only. Anything cached may be pickled into that shared cache: cache
+plain values of other models rather than their rows (the news feed keeps
+author usernames, not User rows with their password hashes), and depend on
+those models so their changes are seen.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+
+from .replicas import primary_reads
+
+VERSION_KEY = "query_cache:version:{}"
+RESULT_KEY = "query_cache:result:{}"
+
+
+class _LRU:
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return default
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > getattr(settings, 'QUERY_CACHE_SIZE', 1000):
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local = _LRU()
+
+
+def _scope(target, pk=None):
+    """A version scope: 'app.model' for a model, 'app.model:pk' for an instance (or a model and pk)"""
+    if isinstance(target, models.Model):
+        return f"{target._meta.label_lower}:{target.pk}"
+    if pk is not None:
+        return f"{target._meta.label_lower}:{pk}"
+    return target._meta.label_lower
+
+
+def _versions(scopes):
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def _bump_scopes(scopes):
+    # A fresh timestamp rather than incr() so an evicted version can never come back
+    cache.set_many({VERSION_KEY.format(scope): time.time_ns() for scope in scopes}, None)
+
+
+def _bump(scopes):
+    _bump_scopes(scopes)
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        transaction.on_commit(lambda: _bump_scopes(scopes))
+
+
+def bump(*targets):
+    """
+    Invalidate cached results that depend on any of these models or
+    instances. Inside a transaction the versions are bumped again when it
+    commits, so results read while it was open aren't kept.
+    """
+    _bump({_scope(target) for target in targets})
+
+
+def _shared():
+    alias = getattr(settings, 'QUERY_CACHE_BACKEND', '')
+    return caches[alias] if alias else None
+
+
+def _cached(name, build, scopes):
+    key = f"{name}:{':'.join(map(str, _versions(scopes)))}"
+    # Wrapped in a tuple so an empty or None result is still a hit
+    hit = _local.get(key)
+    if hit is not None:
+        return hit[0]
+
+    shared = _shared()
+    shared_key = RESULT_KEY.format(hashlib.md5(key.encode()).hexdigest())
+    if shared is not None:
+        hit = shared.get(shared_key)
+        if hit is not None:
+            _local.set(key, hit)
+            return hit[0]
+
+    # From the primary: a lagging replica could otherwise store old rows under the new version
+    with primary_reads():
+        value = build()
+    _local.set(key, (value,))
+    if shared is not None:
+        shared.set(shared_key, (value,), getattr(settings, 'QUERY_CACHE_TIMEOUT', 3600))
+    return value
+
+
+class CachingManager(models.Manager):
+    """
+    A manager whose models' writes bump their query cache versions.
+    `parents` are foreign keys whose instances are bumped too.
+    """
+
+    def __init__(self, parents=()):
+        super().__init__()
+        self.parents = parents
+
+    def contribute_to_class(self, cls, name):
+        super().contribute_to_class(cls, name)
+        if cls._meta.abstract:
+            return
+        post_save.connect(self._changed, sender=cls, weak=False, dispatch_uid=f"query_cache:{cls._meta.label}")
+        post_delete.connect(self._changed, sender=cls, weak=False, dispatch_uid=f"query_cache:{cls._meta.label}")
+
+    def _changed(self, sender, instance, **kwargs):
+        scopes = {_scope(sender), _scope(instance)}
+        for name in self.parents:
+            # By id, without loading the parent
+            field = sender._meta.get_field(name)
+            parent_id = getattr(instance, field.attname)
+            if parent_id is not None:
+                scopes.add(_scope(field.related_model, parent_id))
+        _bump(scopes)
+
+    def get_cached(self, pk):
+        """The instance with this pk; raises DoesNotExist like get()"""
+        pk = self.model._meta.pk.to_python(pk)
+
+        def build():
+            return self.filter(pk=pk).first()
+
+        instance_scope = _scope(self.model, pk)
+        instance = _cached(f"{instance_scope}:get", build, [instance_scope])
+        if instance is None:
+            raise self.model.DoesNotExist(f"{self.model._meta.object_name} matching query does not exist.")
+        return instance
+
+    def cached_query(self, key, build, depends=None):
+        """
+        build()'s result, cached until anything in `depends` (models or
+        instances; default this manager's model) changes. build() should
+        return something picklable and fully evaluated, not a lazy queryset.
+        """
+        scopes = [_scope(target) for target in (depends or [self.model])]
+        return _cached(f"{self.model._meta.label_lower}:{key}", build, scopes)
+
+
+def get_cached_or_404(model, pk):
+    """get_object_or_404() for the query cache"""
+    try:
+        return model._default_manager.get_cached(pk)
+    except model.DoesNotExist:
+        raise Http404(f"No {model._meta.object_name} matches the given query.") from None
@@ -0,0 +1,207 @@
+"""
+Background tasks, queued in the database and run by `manage.py run_worker`.
+
+Register a function with @task and queue it with .enqueue():
+
+    @task(max_attempts=5)
+    def evaluate_alerts(game_ids): ...
+
+    evaluate_alerts.enqueue(game_ids=[1, 2])
+
+Arguments are passed as keyword arguments and stored as JSON. The task row is
+written in the caller's transaction, so work queued by a request that rolls
+back never runs. A failed task is retried with exponential backoff until it
+has used up max_attempts. So is one whose worker died while running it: it's
+claimed again once its lease runs out, and marked failed instead if that
+was its last attempt.
+
+Workers claim tasks with SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL, so
+concurrent workers never wait on each other's rows. SQLite has no row locks;
+there a worker claims a task with a compare-and-swap UPDATE that only one
+worker can win, the same way core.ingest takes its leases.
+
+Periodic tasks are listed in settings.TASK_SCHEDULE ({task name: seconds}).
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed task is reserved for its worker; if the worker dies, the
+# task is claimed again after this
+LEASE_SECONDS = 10 * 60
+PERIODIC_KEY = "periodic:{}"
+
+# Task name -> registered task, filled in as each app's tasks module is imported
+registry = {}
+
+
+class RegisteredTask:
+    def __init__(self, func, name, max_attempts, retry_delay):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.__doc__ = func.__doc__
+
+    def __call__(self, **kwargs):
+        """Run the task right here, without queueing it"""
+        return self.func(**kwargs)
+
+    def enqueue(self, *, delay=0, key=None, **kwargs):
+        """
+        Queue the task to run after `delay` seconds. If `key` is given and a
+        task with that key is already queued, nothing new is queued (the
+        queued one will do the same work) and None is returned.
+        """
+        task = Task(
+            name=self.name,
+            kwargs=kwargs,
+            key=key,
+            run_at=timezone.now() + timedelta(seconds=delay),
+            max_attempts=self.max_attempts,
+        )
+        if key is None:
+            task.save()
+            return task
+        try:
+            with transaction.atomic():
+                task.save()
+        except IntegrityError:
+            return None
+        return task
+
+
+def task(name=None, max_attempts=3, retry_delay=30):
+    """
+    Register a function as a task. It's named after its module and function
+    ('odds.tasks.refresh_odds') unless `name` is given. Retries wait
+    retry_delay seconds, doubling each time.
+    """
+    def register(func):
+        registered = RegisteredTask(func, name or f"{func.__module__}.{func.__name__}", max_attempts, retry_delay)
+        registry[registered.name] = registered
+        return registered
+    return register
+
+
+def _abandoned(now):
+    # Claimed by a worker whose lease has run out (it died, or hung, mid-task)
+    return Q(status=Task.RUNNING, locked_until__lt=now)
+
+
+def _claimable(now):
+    # Queued and due, or abandoned with attempts left
+    return Q(status=Task.QUEUED, run_at__lte=now) | (_abandoned(now) & Q(attempts__lt=F('max_attempts')))
+
+
+def fail_abandoned(now=None):
+    """
+    Mark abandoned tasks that have used up their attempts as failed (a task
+    that kills its worker every time isn't retried forever); returns how many
+    """
+    now = now or timezone.now()
+    return Task.objects.filter(_abandoned(now), attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished_at=now, locked_until=None,
+        last_error="The worker running the task stopped before it finished, on its last attempt.",
+    )
+
+
+def claim(worker):
+    """Claim the next due task for `worker`, or return None if there isn't one"""
+    now = timezone.now()
+    fail_abandoned(now)
+    claimed = {
+        'status': Task.RUNNING,
+        'locked_by': worker,
+        'locked_until': now + timedelta(seconds=LEASE_SECONDS),
+        'attempts': F('attempts') + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            task_id = (
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(_claimable(now))
+                .order_by('run_at', 'id')
+                .values_list('id', flat=True)
+                .first()
+            )
+            if task_id is None:
+                return None
+            Task.objects.filter(id=task_id).update(**claimed)
+        return Task.objects.get(id=task_id)
+
+    # A few candidates, so a worker that loses the race for one can try the next
+    candidates = (
+        Task.objects.filter(_claimable(now)).order_by('run_at', 'id').values_list('id', flat=True)[:10]
+    )
+    for task_id in list(candidates):
+        # Compare-and-swap: only one worker's UPDATE still finds the task claimable
+        if Task.objects.filter(_claimable(now), id=task_id).update(**claimed) == 1:
+            return Task.objects.get(id=task_id)
+    return None
+
+
+def run(task):
+    """Run a claimed task and record the outcome (retrying it later if it failed)"""
+    registered = registry.get(task.name)
+    try:
+        if registered is None:
+            raise LookupError(f"no task named {task.name!r} is registered")
+        registered.func(**task.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Task %s (%s) failed on attempt %s", task.id, task.name, task.attempts)
+        _failed(task, registered, error)
+    else:
+        Task.objects.filter(id=task.id, locked_by=task.locked_by).update(
+            status=Task.SUCCEEDED, finished_at=timezone.now(), locked_until=None, last_error='',
+        )
+    _schedule_next(task.name)
+
+
+def _failed(task, registered, error):
+    now = timezone.now()
+    mine = Task.objects.filter(id=task.id, locked_by=task.locked_by)
+    if registered is not None and task.attempts < task.max_attempts:
+        delay = registered.retry_delay * 2 ** (task.attempts - 1)
+        try:
+            with transaction.atomic():
+                mine.update(
+                    status=Task.QUEUED, run_at=now + timedelta(seconds=delay),
+                    locked_until=None, last_error=error,
+                )
+            return
+        except IntegrityError:
+            # The same keyed work was queued again meanwhile, and will run instead
+            pass
+    mine.update(status=Task.FAILED, finished_at=now, locked_until=None, last_error=error)
+
+
+def _schedule_next(name):
+    interval = settings.TASK_SCHEDULE.get(name)
+    if interval:
+        registry[name].enqueue(delay=interval, key=PERIODIC_KEY.format(name))
+
+
+def schedule_periodic():
+    """Make sure every periodic task in TASK_SCHEDULE has a run queued"""
+    for name, interval in settings.TASK_SCHEDULE.items():
+        if not interval:
+            continue
+        if name not in registry:
+            logger.warning("TASK_SCHEDULE names %r, which isn't a registered task", name)
+            continue
+        # Runs now if none is queued yet; each run queues the next
+        if not Task.objects.filter(name=name, status=Task.RUNNING).exists():
+            registry[name].enqueue(key=PERIODIC_KEY.format(name))
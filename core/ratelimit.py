@@ -0,0 +1,132 @@
+"""
+Rate limits on write endpoints (comments, saving bets, logging in).
+
+Views opt in with @rate_limit(endpoint_class): each user (or IP address, for
+anonymous requests) gets a token bucket per class, sized by
+settings.RATE_LIMITS. Behind a proxy the address comes from
+settings.RATE_LIMIT_CLIENT_IP_HEADER. Requests over the limit get a 429 with Retry-After
+before the view runs, so a bot can't keep the database writing or the
+password hasher busy.
+
+Buckets live in the shared cache, so the limit holds across workers. Each is
+a single number, its "theoretical arrival time" (GCRA): a request moves it
+one refill interval into the future with an atomic cache.incr(), and is
+allowed while it stays within capacity * interval of now. (On the file
+cache incr() isn't atomic across processes, so concurrent requests may
+occasionally slip a token or two over the limit.) Every update sets the key's
+timeout to capacity * interval, when a bucket left alone is full again: the
+file cache's incr() would otherwise reset it to the default.
+"""
+
+import functools
+import hashlib
+import math
+import time
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.shortcuts import render
+
+BUCKET_KEY = "ratelimit:{}:{}"
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def client_ip(request):
+    """
+    The client's address: from RATE_LIMIT_CLIENT_IP_HEADER if configured and
+    present, otherwise REMOTE_ADDR
+    """
+    header = getattr(settings, 'RATE_LIMIT_CLIENT_IP_HEADER', '')
+    forwarded = request.headers.get(header, '') if header else ''
+    # A proxy appends the address it saw, so the last entry is the one it vouches
+    # for; anything before it came from the client and could be made up
+    address = forwarded.split(',')[-1].strip()
+    return address or request.META.get('REMOTE_ADDR', '')
+
+
+def client_id(request):
+    """Who a request is limited as: the user if logged in, otherwise the IP address"""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"ip:{client_ip(request)}"
+
+
+def take(endpoint_class, identity, rate=None):
+    """
+    Take a token from `identity`'s bucket for `endpoint_class`. Returns 0 if
+    allowed, otherwise the seconds until a token is available.
+    """
+    capacity, period = rate or settings.RATE_LIMITS[endpoint_class]
+    interval = max(1, period * 1000 // capacity)
+    key = BUCKET_KEY.format(endpoint_class, hashlib.md5(identity.encode()).hexdigest())
+    timeout = math.ceil(capacity * interval / 1000) + 1
+    now = _now_ms()
+
+    try:
+        arrival = cache.incr(key, interval)
+    except ValueError:
+        arrival = None
+    if arrival is None or arrival - interval < now:
+        # New or idle long enough to be full again: count from now
+        cache.set(key, now + interval, timeout)
+        return 0
+
+    retry_after = 0
+    if arrival - now > capacity * interval:
+        # Refused requests don't use up tokens
+        try:
+            cache.decr(key, interval)
+        except ValueError:
+            # Expired or evicted since the incr(), so the bucket is full again
+            cache.set(key, now + interval, timeout)
+            return 0
+        retry_after = (arrival - capacity * interval - now) / 1000
+    cache.touch(key, timeout)
+    return retry_after
+
+
+def _limited(request, retry_after, json):
+    seconds = math.ceil(retry_after)
+    message = f"Too many requests. Please try again in {seconds} second{'s' if seconds != 1 else ''}."
+    if json:
+        response = JsonResponse({'error': message}, status=429)
+    else:
+        response = render(request, '429.html', {'message': message}, status=429)
+    response['Retry-After'] = str(seconds)
+    return response
+
+
+def rate_limit(endpoint_class, methods=('POST',), json=False):
+    """
+    Limit a view's `methods` requests by settings.RATE_LIMITS[endpoint_class].
+    `json=True` answers refused requests with JSON, for views called from
+    JavaScript.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method in methods:
+                    request.user = await request.auser()
+                    retry_after = await sync_to_async(take)(endpoint_class, client_id(request))
+                    if retry_after:
+                        return _limited(request, retry_after, json)
+                return await view(request, *args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                retry_after = take(endpoint_class, client_id(request))
+                if retry_after:
+                    return _limited(request, retry_after, json)
+            return view(request, *args, **kwargs)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,168 @@
+"""
+Read replicas.
+
+The heavy read-only pages (odds, news, schedule, trends) and the CSV/calendar
+feeds are marked with @read_from_replica; while one of them runs,
+ReplicaRouter sends its reads to a random DATABASE_REPLICAS entry. Every write,
+and every read anywhere else (other views, ingest, the task worker, management
+commands), goes to the primary, `default`.
+
+Replicas lag the primary, so a visitor who has just written (saved a bet,
+posted a comment, logged in) would not see their own change on the next page.
+ReplicaPinMiddleware remembers that a request wrote and sets a short-lived
+cookie, and for REPLICA_PIN_SECONDS that visitor's reads all stay on the
+primary. A request that has written reads from the primary for the rest of
+that request too.
+
+With no replicas configured, everything uses the primary as before.
+"""
+
+import contextlib
+import contextvars
+import functools
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# The current request's routing state; None outside a request
+_state = contextvars.ContextVar('replica_state', default=None)
+
+
+class _RequestState:
+    def __init__(self, pinned):
+        # Recent write by this visitor: read from the primary
+        self.pinned = pinned
+        # Inside a @read_from_replica view
+        self.replica = False
+        # This request has written
+        self.wrote = False
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica or state.pinned or state.wrote:
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction on the primary have to see its writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = replica_aliases()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary (replication, or sync_replicas)
+        return db == DEFAULT_DB_ALIAS
+
+
+def read_from_replica(view):
+    """Let a read-only view's queries go to a replica (unless the visitor is pinned to the primary)"""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            state = _state.get()
+            if state is None:
+                return await view(request, *args, **kwargs)
+            state.replica = True
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                state.replica = False
+
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = _state.get()
+        if state is None:
+            return view(request, *args, **kwargs)
+        state.replica = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            state.replica = False
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """Read from the primary inside this block, even in a @read_from_replica view"""
+    state = _state.get()
+    if state is None or not state.replica:
+        yield
+        return
+    state.replica = False
+    try:
+        yield
+    finally:
+        state.replica = True
+
+
+class ReplicaPinMiddleware:
+    """
+    Tracks whether a request wrote to the database, and pins the visitor's
+    reads to the primary for REPLICA_PIN_SECONDS after a write. Only writes
+    made by POST/PUT/PATCH/DELETE requests pin: work a GET does in passing,
+    like queueing a task, isn't something the visitor expects to see, and
+    cookies on GET responses would keep them out of the page cache.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _start(self, request):
+        state = _RequestState(pinned=PIN_COOKIE in request.COOKIES)
+        return state, _state.set(state)
+
+    def _finish(self, request, response, state, token):
+        _state.reset(token)
+        if state.wrote and request.method not in SAFE_METHODS and replica_aliases():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state, token = self._start(request)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            _state.reset(token)
+            raise
+        return self._finish(request, response, state, token)
+
+    async def __acall__(self, request):
+        state, token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            _state.reset(token)
+            raise
+        return self._finish(request, response, state, token)
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Task
+from .queue import task
+
+# How long finished tasks are kept for the admin
+KEEP_SUCCEEDED = timedelta(days=1)
+KEEP_FAILED = timedelta(days=14)
+
+
+@task()
+def prune_tasks():
+    now = timezone.now()
+    Task.objects.filter(status=Task.SUCCEEDED, finished_at__lt=now - KEEP_SUCCEEDED).delete()
+    Task.objects.filter(status=Task.FAILED, finished_at__lt=now - KEEP_FAILED).delete()
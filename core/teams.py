@@ -0,0 +1,77 @@
+"""
+The teams a deployment follows.
+
+settings.FOLLOWED_TEAMS lists them as "School:Mascot" pairs ("Georgia
+Tech:Yellow Jackets"); the first is the default. The school is the name the
+CFBD schedule uses, and "School Mascot" the one The Odds API uses.
+
+Upstream data comes in once for all of them (fetch_odds reads the whole
+slate, fetch_schedule the whole season) and is stored for any followed team;
+pages then show the visitor's current team, picked with ?team=<slug> or the
+team cookie set by the team switcher. The page cache keys on it, so each team
+gets its own cached copy of a page.
+"""
+
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.text import slugify
+
+TEAM_COOKIE = 'team'
+TEAM_COOKIE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class Team:
+    school: str
+    mascot: str
+
+    @cached_property
+    def slug(self):
+        return slugify(self.school)
+
+    @property
+    def odds_name(self):
+        """The team's name in The Odds API feed"""
+        return f"{self.school} {self.mascot}"
+
+    def __str__(self):
+        return self.school
+
+
+def _parse(entry):
+    school, _, mascot = entry.partition(':')
+    return Team(school.strip(), mascot.strip())
+
+
+def followed_teams():
+    """Every followed team, default first"""
+    return [_parse(entry) for entry in settings.FOLLOWED_TEAMS]
+
+
+def default_team():
+    return followed_teams()[0]
+
+
+def get_team(slug):
+    """The followed team with this slug, or None"""
+    return next((team for team in followed_teams() if team.slug == slug), None)
+
+
+def is_same_team(odds_name, school):
+    """
+    Whether The Odds API's `odds_name` ("Georgia Tech Yellow Jackets") is the
+    CFBD `school` ("Georgia Tech"). A followed team matches its odds_name
+    exactly; any other school matches "School Mascot" unless that's a
+    followed team's name, so "Georgia" never matches Georgia Tech.
+    """
+    followed = {team.school: team.odds_name for team in followed_teams()}
+    if school in followed:
+        return odds_name == followed[school]
+    return odds_name.startswith(f"{school} ") and odds_name not in followed.values()
+
+
+def current_team(request):
+    """The team a request is for: ?team=, then the team cookie, then the default"""
+    return get_team(request.GET.get('team') or request.COOKIES.get(TEAM_COOKIE)) or default_team()
@@ -0,0 +1,40 @@
+"""
+Test runner that keeps tests away from the development data outside the
+database: the odds board goes to a temporary directory and the cache to
+local memory, so `manage.py test` never rewrites the real board or serves
+pages cached by the dev server. Static files are collected into the same
+directory (hashed, without the compressed variants), so pages render and
+are served the way they are in production without a prior collectstatic.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._temp_dir = tempfile.mkdtemp(prefix='gtsportsline-tests-')
+        self._overrides = override_settings(
+            ODDS_BOARD_PATH=str(Path(self._temp_dir) / 'odds.npy'),
+            ODDS_ARCHIVE_DIR=str(Path(self._temp_dir) / 'archive'),
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            STATIC_ROOT=str(Path(self._temp_dir) / 'static'),
+            STORAGES={
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+            },
+        )
+        self._overrides.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def teardown_test_environment(self, **kwargs):
+        self._overrides.disable()
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
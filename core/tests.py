@@ -0,0 +1,1072 @@
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from datetime import timedelta, timezone as dt_timezone
+from unittest import mock
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from odds.exports import odds as odds_export
+from odds.ingest import upsert_games
+from odds.models import BetComment, Game as OddsGame, SavedBet
+
+from . import (
+    admin_tools, content_filter, export, ingest, page_cache, payloads, query_cache, queue, ratelimit, replicas, upstream,
+    warming,
+)
+from .middleware import ConcurrencyLimitMiddleware, StaticFilesMiddleware
+from .models import IngestLease, IngestRun, Task
+from .payloads import PayloadError, iter_array_items
+from .queue import task
+from .teams import TEAM_COOKIE, current_team, default_team, followed_teams, get_team, is_same_team
+from .upstream import CircuitBreaker, UpstreamUnavailable
+
+ran = []
+
+
+@task(name='core.tests.record', max_attempts=2, retry_delay=10)
+def record(value, fail=False):
+    ran.append(value)
+    if fail:
+        raise RuntimeError('failed on purpose')
+
+
+rendered = []
+
+
+@page_cache.cache_page_for_anonymous('odds', 'odds.game.{game_id}')
+def cached_view(request, game_id):
+    rendered.append(game_id)
+    return HttpResponse(f'game {game_id} render {len(rendered)}')
+
+
+@page_cache.cache_page_for_anonymous('news')
+async def cached_async_view(request):
+    rendered.append('async')
+    return HttpResponse(f'render {len(rendered)}')
+
+
+class PageCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        rendered.clear()
+
+    def _get(self, path='/odds/1/', user=None, view=cached_view, **kwargs):
+        request = RequestFactory().get(path)
+        request.user = user or AnonymousUser()
+        if view is cached_view:
+            return view(request, game_id=kwargs.get('game_id', 1))
+        request.auser = mock.AsyncMock(return_value=request.user)
+        return asyncio.run(view(request))
+
+    def test_bump_changes_only_that_groups_version(self):
+        odds, news = page_cache._group_version('odds'), page_cache._group_version('news')
+        page_cache.bump_pages('odds')
+        self.assertNotEqual(page_cache._group_version('odds'), odds)
+        self.assertEqual(page_cache._group_version('news'), news)
+
+    def test_anonymous_gets_are_served_from_the_cache(self):
+        self.assertEqual(self._get()['X-Page-Cache'], 'MISS')
+        hit = self._get()
+        self.assertEqual((hit['X-Page-Cache'], hit.content), ('HIT', b'game 1 render 1'))
+        self.assertEqual(page_cache.page_stats('cached_view')['hits'], 1)
+
+    def test_logged_in_users_arent_cached(self):
+        user = mock.Mock(is_authenticated=True)
+        self._get(user=user)
+        self.assertNotIn('X-Page-Cache', self._get(user=user))
+        self.assertEqual(len(rendered), 2)
+
+    def test_bumping_a_group_re_renders_only_its_pages(self):
+        self._get()
+        self._get('/odds/2/', game_id=2)
+        page_cache.bump_pages('odds.game.1')
+        self.assertEqual(self._get()['X-Page-Cache'], 'MISS')
+        self.assertEqual(self._get('/odds/2/', game_id=2)['X-Page-Cache'], 'HIT')
+
+    def test_each_team_gets_its_own_copy(self):
+        with override_settings(FOLLOWED_TEAMS=['Georgia Tech:Yellow Jackets', 'Georgia:Bulldogs']):
+            self._get('/odds/1/?team=georgia-tech')
+            self.assertEqual(self._get('/odds/1/?team=georgia')['X-Page-Cache'], 'MISS')
+
+    def test_refreshing_re_renders_and_stores(self):
+        self._get()
+        with page_cache.refreshing():
+            self.assertEqual(self._get()['X-Page-Cache'], 'MISS')
+        self.assertEqual(self._get().content, b'game 1 render 2')
+
+    def test_responses_setting_cookies_arent_stored(self):
+        @page_cache.cache_page_for_anonymous('odds')
+        def view(request):
+            response = HttpResponse('personal')
+            response.set_cookie('csrftoken', 'x')
+            return response
+
+        request = RequestFactory().get('/personal/')
+        request.user = AnonymousUser()
+        view(request)
+        self.assertEqual(view(request)['X-Page-Cache'], 'MISS')
+
+    def test_async_views(self):
+        self._get('/news/', view=cached_async_view)
+        self.assertEqual(self._get('/news/', view=cached_async_view)['X-Page-Cache'], 'HIT')
+
+
+@mock.patch.object(admin_tools, 'ESTIMATE_ABOVE_ROWS', 5)
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('fan')
+        game = OddsGame.objects.create(
+            api_game_id='g1', home_team='Georgia Tech Yellow Jackets', away_team='Clemson Tigers',
+            game_time=timezone.now(), bookmaker_name='DraftKings', last_updated=timezone.now(),
+        )
+        BetComment.objects.bulk_create(BetComment(game=game, author=author, content=f'Take {i}') for i in range(8))
+
+    def _count(self, queryset):
+        return admin_tools.EstimatedCountPaginator(queryset, 2).count
+
+    def test_small_table_is_counted_exactly(self):
+        with mock.patch.object(admin_tools, 'ESTIMATE_ABOVE_ROWS', 100):
+            self.assertEqual(self._count(BetComment.objects.all()), 8)
+
+    def test_big_table_is_estimated_without_a_count(self):
+        BetComment.objects.filter(content='Take 0').delete()
+        highest = BetComment.objects.latest('pk').pk
+        with self.assertNumQueries(1):
+            # The highest id on SQLite: deleted rows make it an overestimate
+            self.assertEqual(self._count(BetComment.objects.all()), highest)
+        self.assertEqual(BetComment.objects.count(), 7)
+
+    def test_filtered_results_are_counted_exactly(self):
+        self.assertEqual(self._count(BetComment.objects.filter(content__startswith='Take')), 8)
+        self.assertEqual(self._count(BetComment.objects.filter(content='Take 1')), 1)
+
+    def test_every_page_of_a_filtered_list_is_reachable(self):
+        paginator = admin_tools.EstimatedCountPaginator(BetComment.objects.filter(content__startswith='Take'), 2)
+        self.assertEqual(paginator.num_pages, 4)
+        self.assertEqual(len(paginator.page(4)), 2)
+
+
+class BlocklistTests(SimpleTestCase):
+    def test_whole_words_only(self):
+        automaton = content_filter.Automaton(['ass'])
+        self.assertEqual(automaton.search('What an ass'), 'ass')
+        self.assertIsNone(automaton.search('A class act, passing game'))
+
+    def test_lookalikes_and_case_are_undone(self):
+        self.assertEqual(content_filter.Automaton(['free picks']).search('FR33 P1CKS here'), 'free picks')
+
+    def test_phrases_overlapping_other_terms(self):
+        automaton = content_filter.Automaton(['lock of the season', 'of the week'])
+        # The first phrase breaks off partway; the match has to pick up from its fail link
+        self.assertEqual(automaton.search('my lock of the week'), 'of the week')
+        self.assertEqual(automaton.search('lock of the season'), 'lock of the season')
+        self.assertIsNone(automaton.search('lock of the game'))
+
+    def test_blocklist_file_is_reloaded_when_it_changes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'blocklist.txt')
+            with open(path, 'w') as blocklist:
+                blocklist.write('# one per line\nspam  # trailing comment\n\n')
+            with override_settings(COMMENT_BLOCKLIST_PATH=path):
+                self.assertEqual(content_filter.blocked_term('no spam please'), 'spam')
+                with open(path, 'a') as blocklist:
+                    blocklist.write('guaranteed winner\n')
+                os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+                self.assertEqual(content_filter.blocked_term('a guaranteed winner'), 'guaranteed winner')
+                os.remove(path)
+                self.assertIsNone(content_filter.blocked_term('no spam please'))
+
+
+@override_settings(COMMENT_FLOOD_LIMIT=3)
+class RecentCommentsTests(SimpleTestCase):
+    def setUp(self):
+        self.recent = content_filter.RecentComments(max_users=2)
+
+    def test_duplicates_are_rejected_within_the_window(self):
+        self.assertIsNone(self.recent.check(1, 'Great pick', now=0))
+        self.assertEqual(self.recent.check(1, 'great   PICK!', now=60), 'duplicate')
+        # Another user may say the same thing
+        self.assertIsNone(self.recent.check(2, 'Great pick', now=60))
+        self.assertIsNone(self.recent.check(1, 'Great pick', now=content_filter.DUPLICATE_WINDOW_SECONDS + 1))
+
+    def test_flood_limit_per_minute(self):
+        for second in range(3):
+            self.assertIsNone(self.recent.check(1, f'comment {second}', now=second))
+        self.assertEqual(self.recent.check(1, 'one more', now=10), 'flood')
+        self.assertIsNone(self.recent.check(1, 'one more', now=content_filter.FLOOD_WINDOW_SECONDS + 1))
+
+    def test_least_recently_active_users_are_forgotten(self):
+        self.recent.check(1, 'Great pick', now=0)
+        self.recent.check(2, 'Great pick', now=0)
+        self.recent.check(3, 'Great pick', now=0)
+        self.assertIsNone(self.recent.check(1, 'Great pick', now=1))
+
+
+class WarmCachesTests(TransactionTestCase):
+    # Pages are rendered on worker threads, which need to see the test's data
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('news.views.fetch_football_news', new_callable=mock.AsyncMock, return_value=([], None))
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_every_page_is_warmed_for_every_team(self):
+        path = reverse('news.list')
+        results = warming.warm_caches([path], workers=2)
+        self.assertEqual(
+            sorted((warmed.team, warmed.status) for warmed in results),
+            sorted((team.slug, 200) for team in followed_teams()),
+        )
+        self.fetch.reset_mock()
+        # Visitors are served the warmed copies, whichever team they follow
+        for team in followed_teams():
+            self.client.cookies[TEAM_COOKIE] = team.slug
+            self.assertEqual(self.client.get(path).status_code, 200)
+        self.fetch.assert_not_called()
+
+    def test_warming_re_renders_cached_pages(self):
+        path = reverse('news.list')
+        warming.warm_caches([path], workers=1)
+        warming.warm_caches([path], workers=1)
+        self.assertEqual(self.fetch.await_count, 2 * len(followed_teams()))
+
+    def test_default_paths_include_upcoming_games(self):
+        game = OddsGame.objects.create(
+            api_game_id='g1', home_team='Georgia Tech Yellow Jackets', away_team='Clemson Tigers',
+            game_time=timezone.now() + timedelta(days=2), bookmaker_name='DraftKings', last_updated=timezone.now(),
+        )
+        paths = warming.warm_paths()
+        self.assertIn(reverse('news.list'), paths)
+        self.assertIn(reverse('odds:game_detail', args=[game.id]), paths)
+
+
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1_000_000
+        patcher = mock.patch.object(ratelimit, '_now_ms', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_allows_a_burst_then_refuses(self):
+        for _ in range(3):
+            self.assertEqual(ratelimit.take('comment', 'ip:1', rate=(3, 60)), 0)
+        self.assertAlmostEqual(ratelimit.take('comment', 'ip:1', rate=(3, 60)), 20)
+
+    def test_refills_over_time(self):
+        for _ in range(3):
+            ratelimit.take('comment', 'ip:1', rate=(3, 60))
+        self.now += 20_000
+        self.assertEqual(ratelimit.take('comment', 'ip:1', rate=(3, 60)), 0)
+        self.assertGreater(ratelimit.take('comment', 'ip:1', rate=(3, 60)), 0)
+
+    def test_refused_requests_dont_use_up_tokens(self):
+        for _ in range(3):
+            ratelimit.take('comment', 'ip:1', rate=(3, 60))
+        for _ in range(10):
+            ratelimit.take('comment', 'ip:1', rate=(3, 60))
+        self.now += 20_000
+        self.assertEqual(ratelimit.take('comment', 'ip:1', rate=(3, 60)), 0)
+
+    def test_buckets_are_per_identity_and_class(self):
+        ratelimit.take('comment', 'ip:1', rate=(1, 60))
+        self.assertEqual(ratelimit.take('comment', 'ip:2', rate=(1, 60)), 0)
+        self.assertEqual(ratelimit.take('login', 'ip:1', rate=(1, 60)), 0)
+        self.assertGreater(ratelimit.take('comment', 'ip:1', rate=(1, 60)), 0)
+
+    def test_file_cache_keeps_the_buckets_timeout(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        file_cache = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name}}
+        with override_settings(CACHES=file_cache):
+            for _ in range(4):
+                ratelimit.take('comment', 'ip:1', rate=(3, 60))
+            key = ratelimit.BUCKET_KEY.format('comment', hashlib.md5(b'ip:1').hexdigest())
+            with open(cache._key_to_file(key), 'rb') as f:
+                expires = pickle.load(f)
+        # capacity * interval, not the file cache's default of 300s that incr() writes
+        self.assertAlmostEqual(expires - time.time(), 61, delta=2)
+
+    def test_bucket_evicted_before_a_refund_starts_again_full(self):
+        ratelimit.take('comment', 'ip:1', rate=(1, 60))
+        with mock.patch.object(cache, 'decr', side_effect=ValueError):
+            self.assertEqual(ratelimit.take('comment', 'ip:1', rate=(1, 60)), 0)
+        self.assertGreater(ratelimit.take('comment', 'ip:1', rate=(1, 60)), 0)
+
+    @override_settings(RATE_LIMITS={'comment': (1, 60)})
+    def test_decorated_view_answers_429_with_retry_after(self):
+        view = ratelimit.rate_limit('comment', json=True)(lambda request: HttpResponse('ok'))
+        request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1')
+        request.user = AnonymousUser()
+        self.assertEqual(view(request).status_code, 200)
+        refused = view(request)
+        self.assertEqual((refused.status_code, refused['Retry-After']), (429, '60'))
+        # GETs aren't limited
+        request.method = 'GET'
+        self.assertEqual(view(request).status_code, 200)
+
+
+class ClientIpTests(SimpleTestCase):
+    def _request(self, **headers):
+        return RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', headers=headers)
+
+    def test_remote_addr_without_a_configured_header(self):
+        request = self._request(x_forwarded_for='203.0.113.9')
+        self.assertEqual(ratelimit.client_ip(request), '10.0.0.1')
+
+    @override_settings(RATE_LIMIT_CLIENT_IP_HEADER='X-Forwarded-For')
+    def test_last_address_the_proxy_appended(self):
+        request = self._request(x_forwarded_for='198.51.100.7, 203.0.113.9')
+        self.assertEqual(ratelimit.client_ip(request), '203.0.113.9')
+
+    @override_settings(RATE_LIMIT_CLIENT_IP_HEADER='X-Real-IP')
+    def test_falls_back_when_the_header_is_missing(self):
+        self.assertEqual(ratelimit.client_ip(self._request()), '10.0.0.1')
+
+
+class ConcurrencyLimitTests(SimpleTestCase):
+    def test_off_by_default(self):
+        self.assertEqual(ConcurrencyLimitMiddleware(lambda request: HttpResponse()).limit, 0)
+
+    @override_settings(MAX_IN_FLIGHT_REQUESTS=1)
+    def test_sheds_requests_over_the_limit(self):
+        responses = []
+
+        def view(request):
+            # A second request arriving while this one is still being handled
+            responses.append(middleware(request))
+            return HttpResponse('ok')
+
+        middleware = ConcurrencyLimitMiddleware(view)
+        outer = middleware(RequestFactory().get('/'))
+        self.assertEqual(outer.status_code, 200)
+        self.assertEqual((responses[0].status_code, responses[0]['Retry-After']), (503, '1'))
+        self.assertEqual((middleware.in_flight, middleware.shed), (0, 1))
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for number in range(5):
+            OddsGame.objects.create(
+                api_game_id=f'g{number}', home_team='Georgia Tech Yellow Jackets', away_team=f'Team {number}',
+                game_time=now + timedelta(days=number), bookmaker_name='DraftKings', last_updated=now,
+            )
+
+    def test_parse_filters(self):
+        self.assertEqual(export.parse_filters({'season': '2025', 'start': '2025-09-01'}), {
+            'start': timezone.datetime(2025, 9, 1).date(), 'season': 2025,
+        })
+        with self.assertRaisesMessage(ValueError, 'start must be a date'):
+            export.parse_filters({'start': '2025-13-01'})
+        with self.assertRaisesMessage(ValueError, 'season must be a year'):
+            export.parse_filters({'season': 'last'})
+
+    def test_bad_filter_is_a_400(self):
+        response = export.csv_response(RequestFactory().get('/', {'end': 'soon'}), odds_export)
+        self.assertEqual(response.status_code, 400)
+
+    def test_csv_has_a_header_and_every_row(self):
+        response = export.csv_response(RequestFactory().get('/'), odds_export)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'api_game_id', 'home_team'])
+        self.assertEqual(len(lines), 6)
+        self.assertIn('attachment; filename="odds.csv"', response['Content-Disposition'])
+
+    def test_date_filters_are_inclusive(self):
+        today = timezone.localdate()
+        chunks = export.csv_chunks(odds_export, start=today, end=today + timedelta(days=1))
+        self.assertEqual(len(''.join(chunks).splitlines()), 3)
+
+    @mock.patch.object(export, 'EXPORT_CHUNK_SIZE', 2)
+    async def test_streams_incrementally_under_asgi(self):
+        read = []
+        original_rows = export.rows
+
+        def counting_rows(*args, **kwargs):
+            for row in original_rows(*args, **kwargs):
+                read.append(row)
+                yield row
+
+        with mock.patch.object(export, 'rows', counting_rows):
+            response = export.csv_response(AsyncRequestFactory().get('/'), odds_export)
+            self.assertTrue(response.is_async)
+            chunks = aiter(response.streaming_content)
+            first = await anext(chunks)
+            # Sent before the rest of the rows have been read
+            self.assertEqual(len(first.decode().splitlines()), 3)
+            self.assertLess(len(read), 5)
+            rest = [chunk async for chunk in chunks]
+        self.assertEqual(len(read), 5)
+        self.assertEqual(len(b''.join([first, *rest]).decode().splitlines()), 6)
+
+
+def _status_error(status):
+    request = httpx.Request('GET', 'https://api.example.com/')
+    return httpx.HTTPStatusError('error', request=request, response=httpx.Response(status, request=request))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        upstream._breakers.clear()
+        # No backoff sleeps between retries
+        patcher = mock.patch.object(upstream, 'BACKOFF_BASE_SECONDS', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _open(self, breaker):
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def _cool_down(self, breaker):
+        breaker.opened_at -= breaker.reset_timeout
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        request = mock.Mock(side_effect=httpx.ConnectError('down'))
+        with self.assertRaises(UpstreamUnavailable):
+            upstream.call('svc', request, timeout=1, retry_on=httpx.HTTPError)
+        self.assertEqual(request.call_count, upstream.MAX_ATTEMPTS)
+        self.assertEqual(upstream.get_breaker('svc').state, CircuitBreaker.OPEN)
+
+        with self.assertRaisesMessage(UpstreamUnavailable, 'circuit open'):
+            upstream.call('svc', request, timeout=1, retry_on=httpx.HTTPError)
+        self.assertEqual(request.call_count, upstream.MAX_ATTEMPTS)
+
+    def test_retries_then_succeeds(self):
+        request = mock.Mock(side_effect=[httpx.ReadTimeout('slow'), 'payload'])
+        self.assertEqual(upstream.call('svc', request, timeout=1, retry_on=httpx.HTTPError), 'payload')
+        breaker = upstream.get_breaker('svc')
+        self.assertEqual((breaker.state, breaker.failures), (CircuitBreaker.CLOSED, 0))
+
+    def test_4xx_isnt_retried_or_counted(self):
+        request = mock.Mock(side_effect=_status_error(404))
+        with self.assertRaises(httpx.HTTPStatusError):
+            upstream.call('svc', request, timeout=1, retry_on=httpx.HTTPError)
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(upstream.get_breaker('svc').failures, 0)
+
+    def test_half_open_trial_success_closes(self):
+        breaker = upstream.get_breaker('svc')
+        self._open(breaker)
+        self._cool_down(breaker)
+        self.assertEqual(upstream.call('svc', lambda timeout: 'ok', timeout=1, retry_on=httpx.HTTPError), 'ok')
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_trial_4xx_closes(self):
+        breaker = upstream.get_breaker('svc')
+        self._open(breaker)
+        self._cool_down(breaker)
+        with self.assertRaises(httpx.HTTPStatusError):
+            upstream.call('svc', mock.Mock(side_effect=_status_error(400)), timeout=1, retry_on=httpx.HTTPError)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_half_open_trial_unexpected_error_reopens(self):
+        breaker = upstream.get_breaker('svc')
+        self._open(breaker)
+        self._cool_down(breaker)
+        with self.assertRaises(KeyError):
+            upstream.call('svc', mock.Mock(side_effect=KeyError('bug')), timeout=1, retry_on=httpx.HTTPError)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_only_one_trial_while_half_open(self):
+        breaker = upstream.get_breaker('svc')
+        self._open(breaker)
+        self._cool_down(breaker)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+    def test_trips_are_counted_across_workers(self):
+        self._open(upstream.get_breaker('svc'))
+        self.assertEqual(upstream.get_breaker('svc').snapshot()['trips_all_workers'], 1)
+
+    def test_trip_count_evicted_before_incr(self):
+        breaker = upstream.get_breaker('svc')
+        with mock.patch.object(upstream.cache, 'add', side_effect=[False, True]), \
+                mock.patch.object(upstream.cache, 'incr', side_effect=ValueError):
+            self._open(breaker)
+        self.assertEqual(breaker.trips, 1)
+
+    def test_budget_limits_attempts(self):
+        def slow_failure(timeout):
+            time.sleep(0.05)
+            raise httpx.ConnectError('down')
+
+        request = mock.Mock(side_effect=slow_failure)
+        with self.assertRaises(UpstreamUnavailable):
+            upstream.call('svc', request, timeout=1, retry_on=httpx.HTTPError, budget=0.05)
+        self.assertEqual(request.call_count, 1)
+        self.assertLessEqual(request.call_args.args[0], 0.05)
+
+
+class GetJsonTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        upstream._breakers.clear()
+
+    def _get(self, handler, **kwargs):
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with mock.patch.object(upstream, '_client', return_value=client):
+                try:
+                    return await upstream.get_json('svc', 'https://api.example.com/games', timeout=1, **kwargs)
+                finally:
+                    await client.aclose()
+        return asyncio.run(run())
+
+    def test_returns_payload(self):
+        self.assertEqual(self._get(lambda request: httpx.Response(200, json={'games': [1]})), {'games': [1]})
+
+    def test_fallback_is_last_good_payload(self):
+        self._get(lambda request: httpx.Response(200, json=[1, 2]))
+        with self.assertRaises(UpstreamUnavailable) as raised:
+            self._get(lambda request: httpx.Response(503), budget=0.01)
+        self.assertEqual(raised.exception.fallback, [1, 2])
+
+    def test_half_open_trial_4xx_closes(self):
+        breaker = upstream.get_breaker('svc')
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        breaker.opened_at -= breaker.reset_timeout
+        with self.assertRaises(httpx.HTTPStatusError):
+            self._get(lambda request: httpx.Response(401))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_concurrent_requests_are_coalesced(self):
+        calls = []
+
+        async def run():
+            async def fetch():
+                calls.append(1)
+                await asyncio.sleep(0.01)
+                return 'shared'
+            return await asyncio.gather(*(upstream.coalesced('key', fetch) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(run()), ['shared'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_wsgi_requests_close_their_client(self):
+        used = []
+
+        @upstream.upstream_client
+        async def view(request):
+            used.append(upstream._client())
+            return HttpResponse()
+
+        async_to_sync(view)(RequestFactory().get('/'))
+        self.assertTrue(used[0].is_closed)
+
+    def test_asgi_requests_share_the_loops_client(self):
+        used = []
+
+        @upstream.upstream_client
+        async def view(request):
+            used.append(upstream._client())
+            return HttpResponse()
+
+        async def run():
+            await view(AsyncRequestFactory().get('/'))
+            await view(AsyncRequestFactory().get('/'))
+            await used[0].aclose()
+
+        asyncio.run(run())
+        self.assertIs(used[0], used[1])
+
+
+class StaticFilesMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.calls = []
+
+        async def view(request):
+            self.calls.append(request.path)
+            return HttpResponse('page')
+
+        self.middleware = StaticFilesMiddleware(view)
+
+    def test_async_in_an_async_chain(self):
+        self.assertTrue(asyncio.iscoroutinefunction(self.middleware))
+
+    def test_serves_static_files_without_the_view(self):
+        response = asyncio.run(self.middleware(AsyncRequestFactory().get('/static/css/base.css')))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, [])
+
+    def test_passes_other_requests_through(self):
+        response = asyncio.run(self.middleware(AsyncRequestFactory().get('/news/')))
+        self.assertEqual(response.content, b'page')
+        self.assertEqual(self.calls, ['/news/'])
+
+
+def odds_event(event_id='e1', spread=-3.5, minutes_ago=0, home='Georgia Tech Yellow Jackets', away='Clemson Tigers',
+               **fields):
+    """An event in The Odds API's /odds shape: one bookmaker with moneyline, spread and total markets"""
+    now = timezone.now()
+    event = {
+        'id': event_id, 'commence_time': (now + timedelta(days=2)).isoformat(), 'home_team': home, 'away_team': away,
+        'bookmakers': [{
+            'key': 'draftkings', 'title': 'DraftKings',
+            'last_update': (now - timedelta(minutes=minutes_ago)).isoformat(),
+            'markets': [
+                {'key': 'h2h', 'outcomes': [
+                    {'name': home, 'price': 150},
+                    {'name': away, 'price': -180},
+                ]},
+                {'key': 'spreads', 'outcomes': [
+                    {'name': home, 'price': -110, 'point': spread},
+                    {'name': away, 'price': -110, 'point': -spread},
+                ]},
+                {'key': 'totals', 'outcomes': [
+                    {'name': 'Over', 'price': -105, 'point': 51.5},
+                    {'name': 'Under', 'price': -115, 'point': 51.5},
+                ]},
+            ],
+        }],
+    }
+    return {**event, **fields}
+
+
+class PayloadDecodingTests(SimpleTestCase):
+    def test_odds_events(self):
+        decoded = payloads.decode_odds_events(json.dumps([odds_event()]).encode())
+        [event] = decoded.records
+        self.assertEqual(decoded.rejected, [])
+        self.assertEqual(event.commence_time.tzinfo, dt_timezone.utc)
+        self.assertEqual(event.bookmakers[0].markets[1].outcomes[0].point, -3.5)
+
+    def test_malformed_records_are_rejected_one_by_one(self):
+        body = json.dumps([odds_event('e1'), odds_event('e2', commence_time='soon'), {'id': 'e3'}]).encode()
+        decoded = payloads.decode_odds_events(body)
+        self.assertEqual([event.id for event in decoded.records], ['e1'])
+        self.assertEqual([rejected.index for rejected in decoded.rejected], [1, 2])
+        self.assertTrue(str(decoded.rejected[0]).startswith('record 1: '))
+
+    def test_broken_envelope_raises(self):
+        for body in (b'not json', b'{"message": "quota exceeded"}'):
+            with self.subTest(body=body), self.assertRaises(PayloadError):
+                payloads.decode_odds_events(body)
+
+    def test_odds_event_fields_reads_every_market(self):
+        event = payloads.decode_odds_events(json.dumps([odds_event()]).encode()).records[0]
+        fields = payloads.odds_event_fields(event, event.bookmakers[0])
+        self.assertEqual(fields['bookmaker_name'], 'DraftKings')
+        self.assertEqual((fields['home_team_moneyline'], fields['away_team_moneyline']), (150, -180))
+        self.assertEqual((fields['home_team_spread'], fields['away_team_spread_price']), (-3.5, -110))
+        self.assertEqual((fields['total_over'], fields['total_under_price']), (51.5, -115))
+
+    def test_news(self):
+        body = json.dumps({'status': 'ok', 'articles': [
+            {'title': 'Preview', 'urlToImage': 'https://example.com/a.jpg', 'publishedAt': '2025-09-01T12:00:00',
+             'source': {'name': 'ESPN'}},
+            {'title': ['not', 'a', 'string']},
+        ]}).encode()
+        decoded = payloads.decode_news(body)
+        self.assertEqual(decoded.records[0].url_to_image, 'https://example.com/a.jpg')
+        self.assertEqual(decoded.records[0].source.name, 'ESPN')
+        self.assertEqual(len(decoded.rejected), 1)
+
+    def test_news_error_status_raises(self):
+        with self.assertRaises(PayloadError):
+            payloads.decode_news(b'{"status": "error", "code": "apiKeyInvalid"}')
+
+    def test_schedule_in_either_naming_style(self):
+        camel = {'id': 1, 'homeTeam': 'Georgia Tech', 'awayTeam': 'Clemson', 'homePoints': 24, 'neutralSite': True}
+        snake = {'id': 1, 'home_team': 'Georgia Tech', 'away_team': 'Clemson', 'home_points': 24, 'neutral_site': True}
+        for game in (camel, snake):
+            with self.subTest(game=game):
+                [decoded] = payloads.decode_schedule(json.dumps([game]).encode()).records
+                self.assertEqual((decoded.home_team, decoded.home_points, decoded.neutral_site), ('Georgia Tech', 24, True))
+
+
+class StreamingArrayTests(SimpleTestCase):
+    ITEMS = [
+        {'id': 'e1', 'name': 'brackets ]} and { in a string'},
+        {'id': 'e2', 'name': 'escaped \\" quote\\', 'nested': [[1, 2], {'a': [3]}]},
+        [4, 5],
+    ]
+
+    def _split(self, body, size):
+        return [body[i:i + size] for i in range(0, len(body), size)]
+
+    def test_items_come_out_whole_whatever_the_chunking(self):
+        body = json.dumps(self.ITEMS).encode()
+        for size in (1, 2, 3, 7, 64, len(body)):
+            with self.subTest(size=size):
+                items = [json.loads(item) for item in iter_array_items(self._split(body, size))]
+                self.assertEqual(items, self.ITEMS)
+
+    def test_only_the_current_item_is_buffered(self):
+        chunks = (json.dumps(odds_event(f'e{i}')).encode() + b',' for i in range(200))
+        body = iter([b'[', *chunks, b'{}]'])
+        items = iter_array_items(body)
+        self.assertEqual(json.loads(next(items))['id'], 'e0')
+        # Lazily: the rest of the body hasn't been read yet
+        self.assertEqual(len(list(body)), 200)
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_array_items([b' [ ', b'] '])), [])
+
+    def test_not_an_array(self):
+        with self.assertRaises(PayloadError):
+            list(iter_array_items([b'{"message": "quota exceeded"}']))
+
+    def test_truncated_body(self):
+        with self.assertRaises(PayloadError):
+            list(iter_array_items([b'[{"id": "e1"}, {"id": "e']))
+
+    def test_odds_events_stream_rejects_bad_ones(self):
+        body = json.dumps([odds_event('e1'), {'id': 'e2'}, odds_event('e3')]).encode()
+        rejected = []
+        events = list(payloads.iter_odds_events(self._split(body, 100), rejected))
+        self.assertEqual([event.id for event in events], ['e1', 'e3'])
+        self.assertEqual([record.index for record in rejected], [1])
+
+
+class IngestRunTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_successful_run_is_recorded(self):
+        with ingest.ingest_run('odds:test') as run:
+            run.events_seen, run.rows_written = 10, 4
+        run = IngestRun.objects.get()
+        self.assertEqual((run.status, run.events_seen, run.rows_written), (IngestRun.SUCCEEDED, 10, 4))
+        self.assertIsNotNone(run.finished_at)
+
+    def test_failed_run_records_the_error_without_the_api_key(self):
+        with self.assertRaises(RuntimeError):
+            with ingest.ingest_run('odds:test', redact=['sekrit']):
+                raise RuntimeError('GET /odds?api_key=sekrit failed')
+        run = IngestRun.objects.get()
+        self.assertEqual((run.status, run.errors), (IngestRun.FAILED, ['GET /odds?api_key=*** failed']))
+
+    def test_overlapping_run_is_skipped(self):
+        with ingest.ingest_run('odds:test'):
+            with self.assertRaises(ingest.IngestLocked):
+                with ingest.ingest_run('odds:test'):
+                    self.fail('ran while locked')
+            # Other sources aren't blocked
+            with ingest.ingest_run('schedule:test'):
+                pass
+        self.assertEqual(IngestRun.objects.filter(status=IngestRun.SKIPPED).count(), 1)
+        # Released afterwards
+        with ingest.ingest_run('odds:test'):
+            pass
+
+    def test_lease_of_a_crashed_run_expires(self):
+        self.assertTrue(ingest._acquire('odds:test', 'crashed', lease_seconds=60))
+        self.assertFalse(ingest._acquire('odds:test', 'next', lease_seconds=60))
+        IngestLease.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(ingest._acquire('odds:test', 'next', lease_seconds=60))
+
+    def test_last_successful_run_is_cached(self):
+        self.assertIsNone(ingest.last_successful_run('odds:test'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(ingest.last_successful_run('odds:test'))
+        with ingest.ingest_run('odds:test') as run:
+            pass
+        with self.assertRaises(ValueError):
+            with ingest.ingest_run('odds:test'):
+                raise ValueError
+        with self.assertNumQueries(0):
+            self.assertEqual(ingest.last_successful_run('odds:test').pk, run.pk)
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        ran.clear()
+
+    def test_claim_and_run(self):
+        queued = record.enqueue(value=1)
+        claimed = queue.claim('w1')
+        self.assertEqual((claimed.id, claimed.status, claimed.attempts), (queued.id, Task.RUNNING, 1))
+        self.assertIsNone(queue.claim('w2'))
+        queue.run(claimed)
+        self.assertEqual(ran, [1])
+        self.assertEqual(Task.objects.get(id=queued.id).status, Task.SUCCEEDED)
+
+    def test_not_claimed_before_it_is_due(self):
+        record.enqueue(delay=60, value=1)
+        self.assertIsNone(queue.claim('w1'))
+
+    def test_keyed_task_is_queued_once(self):
+        self.assertIsNotNone(record.enqueue(key='k', value=1))
+        self.assertIsNone(record.enqueue(key='k', value=2))
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_failure_is_retried_then_fails(self):
+        queued = record.enqueue(value=1, fail=True)
+        with self.assertLogs('core.queue', 'ERROR'):
+            queue.run(queue.claim('w1'))
+        retry = Task.objects.get(id=queued.id)
+        self.assertEqual(retry.status, Task.QUEUED)
+        self.assertGreater(retry.run_at, timezone.now() + timedelta(seconds=5))
+        self.assertIn('failed on purpose', retry.last_error)
+
+        Task.objects.filter(id=queued.id).update(run_at=timezone.now())
+        with self.assertLogs('core.queue', 'ERROR'):
+            queue.run(queue.claim('w1'))
+        self.assertEqual(Task.objects.get(id=queued.id).status, Task.FAILED)
+        self.assertEqual(ran, [1, 1])
+
+    def test_unregistered_task_fails(self):
+        Task.objects.create(name='core.tests.missing', run_at=timezone.now(), max_attempts=1)
+        with self.assertLogs('core.queue', 'ERROR'):
+            queue.run(queue.claim('w1'))
+        self.assertIn('no task named', Task.objects.get().last_error)
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_abandoned_task_is_reclaimed(self):
+        queued = record.enqueue(value=1)
+        queue.claim('dead')
+        Task.objects.filter(id=queued.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        claimed = queue.claim('w2')
+        self.assertEqual((claimed.id, claimed.locked_by, claimed.attempts), (queued.id, 'w2', 2))
+
+    def test_abandoned_task_on_its_last_attempt_fails(self):
+        queued = record.enqueue(value=1)
+        Task.objects.filter(id=queued.id).update(
+            status=Task.RUNNING, attempts=2, locked_by='dead',
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertIsNone(queue.claim('w2'))
+        failed = Task.objects.get(id=queued.id)
+        self.assertEqual((failed.status, failed.attempts), (Task.FAILED, 2))
+        self.assertIsNotNone(failed.finished_at)
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = replicas.ReplicaRouter()
+        patcher = mock.patch.object(replicas, 'replica_aliases', return_value=['replica'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _request(self, view, method='get', **cookies):
+        """Run `view` through ReplicaPinMiddleware; returns (response, where each read went)"""
+        reads = []
+
+        def read():
+            reads.append(self.router.db_for_read(OddsGame))
+
+        def write():
+            self.router.db_for_write(OddsGame)
+
+        def handler(request):
+            return view(request, read, write) or HttpResponse()
+
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies)
+        return replicas.ReplicaPinMiddleware(handler)(request), reads
+
+    def test_outside_a_request_reads_go_to_the_primary(self):
+        self.assertEqual(self.router.db_for_read(OddsGame), DEFAULT_DB_ALIAS)
+
+    def test_only_marked_views_read_from_a_replica(self):
+        _, reads = self._request(lambda request, read, write: read())
+        self.assertEqual(reads, [DEFAULT_DB_ALIAS])
+        _, reads = self._request(replicas.read_from_replica(lambda request, read, write: read()))
+        self.assertEqual(reads, ['replica'])
+
+    def test_async_views(self):
+        @replicas.read_from_replica
+        async def view(request, read, write):
+            read()
+            return HttpResponse()
+
+        reads = []
+
+        async def handler(request):
+            return await view(request, lambda: reads.append(self.router.db_for_read(OddsGame)), None)
+
+        asyncio.run(replicas.ReplicaPinMiddleware(handler)(AsyncRequestFactory().get('/')))
+        self.assertEqual(reads, ['replica'])
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        def view(request, read, write):
+            read()
+            write()
+            read()
+
+        _, reads = self._request(replicas.read_from_replica(view))
+        self.assertEqual(reads, ['replica', DEFAULT_DB_ALIAS])
+
+    def test_primary_reads_block(self):
+        def view(request, read, write):
+            with replicas.primary_reads():
+                read()
+            read()
+
+        _, reads = self._request(replicas.read_from_replica(view))
+        self.assertEqual(reads, [DEFAULT_DB_ALIAS, 'replica'])
+
+    def test_reads_in_a_transaction_stay_on_the_primary(self):
+        with mock.patch.object(connections[DEFAULT_DB_ALIAS], 'in_atomic_block', True):
+            _, reads = self._request(replicas.read_from_replica(lambda request, read, write: read()))
+        self.assertEqual(reads, [DEFAULT_DB_ALIAS])
+
+    def test_writing_pins_the_visitor_to_the_primary(self):
+        response, _ = self._request(lambda request, read, write: write(), method='post')
+        self.assertEqual(response.cookies[replicas.PIN_COOKIE]['max-age'], settings.REPLICA_PIN_SECONDS)
+        _, reads = self._request(
+            replicas.read_from_replica(lambda request, read, write: read()), **{replicas.PIN_COOKIE: '1'},
+        )
+        self.assertEqual(reads, [DEFAULT_DB_ALIAS])
+
+    def test_writes_during_a_get_dont_pin(self):
+        response, _ = self._request(lambda request, read, write: write())
+        self.assertNotIn(replicas.PIN_COOKIE, response.cookies)
+
+    def test_no_pinning_without_replicas(self):
+        def view(request, read, write):
+            read()
+            write()
+
+        with mock.patch.object(replicas, 'replica_aliases', return_value=[]):
+            response, reads = self._request(replicas.read_from_replica(view), method='post')
+        self.assertEqual(reads, [DEFAULT_DB_ALIAS])
+        self.assertNotIn(replicas.PIN_COOKIE, response.cookies)
+
+    def test_migrations_only_run_on_the_primary(self):
+        self.assertTrue(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'odds'))
+        self.assertFalse(self.router.allow_migrate('replica', 'odds'))
+
+
+@override_settings(FOLLOWED_TEAMS=['Georgia Tech:Yellow Jackets', 'Georgia: Bulldogs'])
+class CurrentTeamTests(SimpleTestCase):
+    def _team(self, path='/', **cookies):
+        request = RequestFactory().get(path)
+        request.COOKIES.update(cookies)
+        return current_team(request)
+
+    def test_followed_teams_default_first(self):
+        self.assertEqual([team.slug for team in followed_teams()], ['georgia-tech', 'georgia'])
+        self.assertEqual(default_team().odds_name, 'Georgia Tech Yellow Jackets')
+        self.assertEqual(get_team('georgia').odds_name, 'Georgia Bulldogs')
+
+    def test_query_then_cookie_then_default(self):
+        self.assertEqual(self._team().school, 'Georgia Tech')
+        self.assertEqual(self._team(**{TEAM_COOKIE: 'georgia'}).school, 'Georgia')
+        self.assertEqual(self._team('/?team=georgia-tech', **{TEAM_COOKIE: 'georgia'}).school, 'Georgia Tech')
+
+    def test_unknown_team_is_the_default(self):
+        self.assertIsNone(get_team('alabama'))
+        self.assertEqual(self._team('/?team=alabama').school, 'Georgia Tech')
+
+
+@override_settings(FOLLOWED_TEAMS=['Georgia Tech:Yellow Jackets'])
+class TeamMatchingTests(SimpleTestCase):
+    def test_followed_team_matches_its_odds_name_exactly(self):
+        self.assertTrue(is_same_team('Georgia Tech Yellow Jackets', 'Georgia Tech'))
+        self.assertFalse(is_same_team('Georgia Tech Yellow Jacket', 'Georgia Tech'))
+
+    def test_prefix_of_a_followed_team_isnt_that_team(self):
+        self.assertTrue(is_same_team('Georgia Bulldogs', 'Georgia'))
+        self.assertFalse(is_same_team('Georgia Tech Yellow Jackets', 'Georgia'))
+
+    def test_other_schools_need_a_whole_word_match(self):
+        self.assertTrue(is_same_team('Clemson Tigers', 'Clemson'))
+        self.assertFalse(is_same_team('Clemsonville Tigers', 'Clemson'))
+
+
+class QueryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        query_cache._local.clear()
+        now = timezone.now()
+        self.game = OddsGame.objects.create(
+            api_game_id='g1', home_team='Georgia Tech Yellow Jackets', away_team='Clemson Tigers',
+            game_time=now + timedelta(days=2), bookmaker_name='DraftKings', last_updated=now,
+        )
+        self.user = User.objects.create_user('fan')
+
+    def _saved_ids(self, user):
+        return SavedBet.objects.cached_query(
+            f'saved:{user.pk}', lambda: set(SavedBet.objects.filter(user=user).values_list('game_id', flat=True)),
+            depends=[user],
+        )
+
+    def test_get_cached_hits_until_the_instance_is_saved(self):
+        OddsGame.objects.get_cached(self.game.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(OddsGame.objects.get_cached(str(self.game.pk)).home_team_spread, None)
+        self.game.home_team_spread = -3
+        self.game.save()
+        self.assertEqual(OddsGame.objects.get_cached(self.game.pk).home_team_spread, -3)
+
+    def test_missing_and_deleted_instances(self):
+        with self.assertRaises(Http404):
+            query_cache.get_cached_or_404(OddsGame, 12345)
+        OddsGame.objects.get_cached(self.game.pk)
+        pk = self.game.pk
+        self.game.delete()
+        with self.assertRaises(OddsGame.DoesNotExist):
+            OddsGame.objects.get_cached(pk)
+
+    def test_parent_bump_is_scoped_to_that_parent(self):
+        other = User.objects.create_user('other')
+        self.assertEqual(self._saved_ids(self.user), set())
+        self._saved_ids(other)
+        SavedBet.objects.create(user=self.user, game=self.game)
+        self.assertEqual(self._saved_ids(self.user), {self.game.pk})
+        with self.assertNumQueries(0):
+            self._saved_ids(other)
+
+    def test_bump_is_repeated_when_the_transaction_commits(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                self.game.home_team_spread = -3
+                self.game.save()
+                # Read (and cached) before the write commits
+                OddsGame.objects.get_cached(self.game.pk)
+        self.assertTrue(callbacks)
+        with self.assertNumQueries(1):
+            OddsGame.objects.get_cached(self.game.pk)
+
+    def test_upsert_games_bumps_updated_games(self):
+        OddsGame.objects.get_cached(self.game.pk)
+        upsert_games({'g1': {'home_team_spread': -7.0}})
+        self.assertEqual(OddsGame.objects.get_cached(self.game.pk).home_team_spread, -7.0)
+
+    def test_upsert_games_bumps_a_cached_miss_for_a_new_game(self):
+        self.client.force_login(self.user)
+        url = reverse('odds:save_bet', args=[self.game.pk + 1])
+        self.assertEqual(self.client.post(url).status_code, 404)
+        now = timezone.now()
+        created, _, _ = upsert_games({'g2': {
+            'home_team': 'Georgia Tech Yellow Jackets', 'away_team': 'Duke Blue Devils',
+            'game_time': now + timedelta(days=9), 'bookmaker_name': 'DraftKings', 'last_updated': now,
+        }})
+        self.assertEqual(created[0].pk, self.game.pk + 1)
+        self.assertEqual(self.client.post(url).status_code, 200)
+
+    @override_settings(QUERY_CACHE_SIZE=2)
+    def test_local_entries_are_bounded(self):
+        for key in range(5):
+            OddsGame.objects.cached_query(f'key{key}', lambda: key)
+        self.assertEqual(len(query_cache._local._entries), 2)
+
+    @override_settings(QUERY_CACHE_BACKEND='default')
+    def test_shared_results_are_used_by_other_processes(self):
+        OddsGame.objects.cached_query('count', lambda: OddsGame.objects.count())
+        # Another process: nothing in its own LRU
+        query_cache._local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(OddsGame.objects.cached_query('count', lambda: OddsGame.objects.count()), 1)
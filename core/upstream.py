@@ -0,0 +1,316 @@
+"""
+Client side of every external API (NewsAPI, College Football Data, The Odds API).
+
+Each service gets a circuit breaker: after a run of failures it opens and
+calls fail immediately (falling back to the last good payload) until a
+cool-down passes, then a single trial call decides whether to close it again.
+
+Every call also gets a latency budget: retries back off exponentially, but
+no attempt is allowed to run past the budget, so a page never waits longer
+than that for upstream no matter how many retries are configured.
+
+The async views use get_json(), which shares one httpx.AsyncClient per event
+loop and coalesces identical in-flight requests: if a hundred page loads ask
+for the same URL while the first call is still waiting on upstream, they all
+await that one call. Sync callers (management commands) use call().
+
+Under ASGI the server's loop lives as long as the process, and so does its
+client. Under WSGI every async view runs in a new loop of its own, so views
+that call upstream are wrapped in @upstream_client, which gives the request a
+client of its own and closes it when the view returns.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import hashlib
+import threading
+import time
+import weakref
+
+import httpx
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+
+FAILURE_THRESHOLD = 3  # Consecutive failures before the breaker opens
+RESET_TIMEOUT_SECONDS = 30  # How long an open breaker fails fast before a trial call
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 0.25
+LAST_GOOD_TIMEOUT = 60 * 60 * 24
+
+TRIPS_KEY = "upstream:trips:{}"
+LAST_GOOD_KEY = "upstream:last_good:{}"
+
+# Per event loop, since httpx clients and asyncio tasks are bound to the loop they were created on
+_clients = weakref.WeakKeyDictionary()
+_in_flight = weakref.WeakKeyDictionary()
+# Set by scoped_client(), and used instead of the loop's shared client
+_scoped = contextvars.ContextVar('upstream_client', default=None)
+
+
+class UpstreamUnavailable(Exception):
+    """
+    The service couldn't be used for this request (breaker open, or it kept
+    failing until the budget ran out). `fallback` is the last good payload
+    for the same request, or None if we never had one.
+    """
+
+    def __init__(self, service, reason, fallback=None):
+        super().__init__(f"{service} unavailable: {reason}")
+        self.service = service
+        self.reason = reason
+        self.fallback = fallback
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, service, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT_SECONDS):
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go out now (at most one trial call while half-open)"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.trips += 1
+                tripped = True
+            else:
+                tripped = False
+        if tripped:
+            # Trip counts are shared so monitoring sees every worker, not just this one
+            key = TRIPS_KEY.format(self.service)
+            if not cache.add(key, 1, None):
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    # Evicted between add() and incr()
+                    cache.add(key, 1, None)
+
+    def settle(self, ok):
+        """Record how an attempt went: `ok` is True if upstream answered at all"""
+        if ok:
+            self.record_success()
+        else:
+            self.record_failure()
+
+    def snapshot(self):
+        return {
+            'service': self.service,
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'trips': self.trips,
+            'trips_all_workers': cache.get(TRIPS_KEY.format(self.service), 0),
+        }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(service):
+    with _breakers_lock:
+        if service not in _breakers:
+            _breakers[service] = CircuitBreaker(service)
+        return _breakers[service]
+
+
+def breaker_status():
+    """State of every breaker this process has used, for monitoring"""
+    return [breaker.snapshot() for breaker in list(_breakers.values())]
+
+
+def _is_outage(error):
+    """Timeouts, connection errors and 5xx count against the breaker; 4xx don't"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return response.status_code >= 500
+    return True
+
+
+def _budget():
+    return getattr(settings, 'UPSTREAM_LATENCY_BUDGET_SECONDS', 5.0)
+
+
+def _attempts(timeout, budget):
+    """
+    Yield (per-attempt timeout, backoff before the next attempt) until
+    attempts or the latency budget run out.
+    """
+    deadline = time.monotonic() + budget
+    for attempt in range(MAX_ATTEMPTS):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        backoff = BACKOFF_BASE_SECONDS * 2 ** attempt
+        # Only back off if there'd still be time for another attempt afterwards
+        yield min(timeout, remaining), backoff if remaining - backoff > 0 else None
+
+
+def call(service, request, *, timeout, retry_on, budget=None):
+    """
+    Run `request(timeout)` (a sync callable) through the service's breaker,
+    retrying `retry_on` exceptions with backoff inside the latency budget.
+    """
+    breaker = get_breaker(service)
+    if not breaker.allow():
+        raise UpstreamUnavailable(service, "circuit open")
+
+    last_error = None
+    for attempt_timeout, backoff in _attempts(timeout, budget or _budget()):
+        ok = False
+        try:
+            result = request(attempt_timeout)
+            ok = True
+        except retry_on as error:
+            # A 4xx means upstream answered: it's up, the request was wrong
+            ok = not _is_outage(error)
+            if ok:
+                raise
+            last_error = error
+        finally:
+            # Every attempt settles, whatever it raised, or a half-open breaker
+            # would wait forever on a trial that never reported back
+            breaker.settle(ok)
+        if ok:
+            return result
+        if backoff is None or not breaker.allow():
+            break
+        time.sleep(backoff)
+    raise UpstreamUnavailable(service, str(last_error or "latency budget exhausted")) from last_error
+
+
+def _client():
+    client = _scoped.get()
+    if client is not None:
+        return client
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = httpx.AsyncClient()
+    return client
+
+
+@contextlib.asynccontextmanager
+async def scoped_client():
+    """
+    Calls inside the block use a client of their own, closed when it exits.
+    For short-lived loops (async_to_sync), whose shared client would never be
+    closed and would leak its connections.
+    """
+    async with httpx.AsyncClient() as client:
+        token = _scoped.set(client)
+        try:
+            yield client
+        finally:
+            _scoped.reset(token)
+
+
+def upstream_client(view):
+    """
+    For async views calling upstream: under WSGI (a new loop per request) the
+    call gets a scoped_client(); under ASGI it shares the loop's client.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if isinstance(request, ASGIRequest):
+            return await view(request, *args, **kwargs)
+        async with scoped_client():
+            return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def coalesced(key, fetch):
+    """Run `fetch()` once per key at a time; concurrent callers share its result"""
+    in_flight = _in_flight.setdefault(asyncio.get_running_loop(), {})
+    task = in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        in_flight[key] = task
+        task.add_done_callback(lambda _: in_flight.pop(key, None))
+    # shield() so one caller timing out or disconnecting doesn't cancel everyone else's request
+    return await asyncio.shield(task)
+
+
+async def _fetch_json(service, url, params, headers, timeout, budget, decode, last_good_key):
+    breaker = get_breaker(service)
+    if not breaker.allow():
+        raise UpstreamUnavailable(service, "circuit open")
+
+    last_error = None
+    for attempt_timeout, backoff in _attempts(timeout, budget):
+        ok = False
+        try:
+            response = await _client().get(url, params=params, headers=headers, timeout=attempt_timeout)
+            response.raise_for_status()
+            ok = True
+        except httpx.HTTPError as error:
+            ok = not _is_outage(error)
+            if ok:
+                raise
+            last_error = error
+        finally:
+            # As in call(): 4xx counts as success, anything else unexpected as failure
+            breaker.settle(ok)
+        if ok:
+            payload = decode(response.content) if decode else response.json()
+            await cache.aset(last_good_key, payload, LAST_GOOD_TIMEOUT)
+            return payload
+        if backoff is None or not breaker.allow():
+            break
+        await asyncio.sleep(backoff)
+    raise UpstreamUnavailable(service, str(last_error or "latency budget exhausted")) from last_error
+
+
+async def get_json(service, url, *, params=None, headers=None, timeout, budget=None, decode=None):
+    """
+    GET `url` and decode the JSON body, with `decode(bytes)` if given (see
+    core/payloads.py) or as plain JSON otherwise. Decoding errors propagate.
+
+    Raises httpx.HTTPStatusError for 4xx responses (those are our fault, not an
+    outage) and UpstreamUnavailable, carrying the last good payload for the same
+    request as `fallback`, when the service is down or the breaker is open.
+    """
+    # The decoder is part of the key: callers decoding the same URL differently don't share results
+    key = (
+        url,
+        tuple(sorted((params or {}).items())),
+        tuple(sorted((headers or {}).items())),
+        getattr(decode, '__qualname__', None),
+    )
+    last_good_key = LAST_GOOD_KEY.format(hashlib.md5(repr(key).encode()).hexdigest())
+
+    try:
+        return await coalesced(
+            key,
+            lambda: _fetch_json(service, url, params, headers, timeout, budget or _budget(), decode, last_good_key),
+        )
+    except UpstreamUnavailable as error:
+        error.fallback = await cache.aget(last_good_key)
+        raise
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('upstream/', views.upstream_status, name='core.upstream_status'),
+]
@@ -0,0 +1,10 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .upstream import breaker_status
+
+
+@staff_member_required
+def upstream_status(request):
+    """Circuit breaker state and trip counts for monitoring"""
+    return JsonResponse({'breakers': breaker_status()})
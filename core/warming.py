@@ -0,0 +1,90 @@
+"""
+Cache warming.
+
+After a deploy or restart the page cache is cold, and the first visitors to
+each list page would pay for the NewsAPI/CFBD calls and the render.
+warm_caches() renders those pages itself, concurrently, as an anonymous
+visitor would, which fills the page cache (and the last-good upstream copies
+behind it) before anyone asks.
+
+The page cache keeps a copy of each page per followed team (core/teams.py),
+so every path is warmed once for each team, with that team's cookie.
+
+Warming always re-renders, even over a cached page, so it can also keep pages
+fresh through a traffic spike: schedule/tasks.py re-warms them on a loop
+around each kickoff.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from . import page_cache
+from .teams import TEAM_COOKIE, followed_teams
+
+# Upcoming games whose detail pages are warmed along with the list pages
+DETAIL_PAGES = 10
+
+
+@dataclass
+class Warmed:
+    path: str
+    team: str
+    status: int
+    seconds: float
+
+
+def warm_paths():
+    """The pages worth warming: the list pages, then the next few games' pages"""
+    from odds.board import current_board
+
+    paths = [
+        reverse('home.index'),
+        reverse('odds:odds_list'),
+        reverse('odds:trends'),
+        reverse('news.list'),
+        reverse('schedule.list'),
+    ]
+    # Loading the board also maps it into this process for the requests that follow
+    for game in current_board().upcoming(timezone.now())[:DETAIL_PAGES]:
+        paths.append(reverse('odds:game_detail', args=[game.id]))
+    return paths
+
+
+def warm_caches(paths=None, workers=4):
+    """
+    Render `paths` (default: warm_paths()) concurrently, once per followed
+    team; returns a Warmed per path and team
+    """
+    local = threading.local()
+
+    def warm(team, path):
+        if not hasattr(local, 'client'):
+            # Rendered in-process, so this works before the server takes traffic
+            local.client = Client(SERVER_NAME='localhost')
+        local.client.cookies[TEAM_COOKIE] = team.slug
+        started = time.perf_counter()
+        try:
+            with page_cache.refreshing():
+                response = local.client.get(path)
+        finally:
+            connections.close_all()
+        return Warmed(path, team.slug, response.status_code, time.perf_counter() - started)
+
+    paths = paths or warm_paths()
+    pages = [(team, path) for team in followed_teams() for path in paths]
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(lambda page: warm(*page), pages))
+
+
+def warm_caches_in_background():
+    """For the startup hook: warm without holding up the server starting"""
+    thread = threading.Thread(target=warm_caches, name='warm-caches', daemon=True)
+    thread.start()
+    return thread
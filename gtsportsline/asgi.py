@@ -3,14 +3,27 @@ ASGI config for gtsportsline project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The upstream-bound pages (news_list, schedule_list) are async views, so run
+the site under an ASGI server to let one event loop serve many page loads
+while NewsAPI/CFBD are slow, e.g.:
+
+    uvicorn gtsportsline.asgi:application --workers 2
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "gtsportsline.settings")
 
 application = get_asgi_application()
+
+if settings.WARM_CACHES_ON_STARTUP:
+    # Imported here because it needs the app registry, loaded just above
+    from core.warming import warm_caches_in_background
+
+    warm_caches_in_background()
@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -19,6 +19,23 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 ODDS_API_KEY = config("ODDS_API_KEY", default=None)
 NEWS_API_KEY = config("NEWS_API_KEY", default=None)
 SCHEDULE_API_KEY = config("SCHEDULE_API_KEY", default=None)
+# Teams this deployment follows, as "School:Mascot" (school as CFBD names it,
+# "School Mascot" as The Odds API does); the first is the default (core/teams.py)
+FOLLOWED_TEAMS = config("FOLLOWED_TEAMS", default="Georgia Tech:Yellow Jackets", cast=Csv())
+# Shared secret for pushed odds updates (odds webhook); the endpoint is off without it
+ODDS_WEBHOOK_SECRET = config("ODDS_WEBHOOK_SECRET", default=None)
+# How long pushed updates are coalesced before they're written
+ODDS_WEBHOOK_FLUSH_SECONDS = config("ODDS_WEBHOOK_FLUSH_SECONDS", default=1.0, cast=float)
+# Memory-mapped current odds board shared by all worker processes (odds/board.py)
+ODDS_BOARD_PATH = config("ODDS_BOARD_PATH", default=str(BASE_DIR / ".board" / "odds.npy"))
+# Retention (compact_odds, odds/retention.py): games older than this many days
+# are archived and deleted (0 keeps them forever), and line history is thinned
+# to hourly, then daily, as it ages
+ODDS_RETENTION_DAYS = config("ODDS_RETENTION_DAYS", default=730, cast=int)
+# Gzipped CSVs of pruned games are written here first; empty to prune without archiving
+ODDS_ARCHIVE_DIR = config("ODDS_ARCHIVE_DIR", default=str(BASE_DIR / "archive"))
+LINE_HOURLY_AFTER_DAYS = config("LINE_HOURLY_AFTER_DAYS", default=7, cast=int)
+LINE_DAILY_AFTER_DAYS = config("LINE_DAILY_AFTER_DAYS", default=30, cast=int)
 
 
 # Quick-start development settings - unsuitable for production
@@ -41,16 +58,23 @@ INSTALLED_APPS = [
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
+    # Let WhiteNoise serve static files under runserver too, so dev matches prod
+    "whitenoise.runserver_nostatic",
     "django.contrib.staticfiles",
     "home",
     "accounts",
     "news",
     "odds",
     "schedule",
+    "core",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.StaticFilesMiddleware",
+    # After static files, so pages shed under load still get their CSS/JS
+    "core.middleware.ConcurrencyLimitMiddleware",
+    "core.replicas.ReplicaPinMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -72,6 +96,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "core.context_processors.teams",
             ],
         },
     },
@@ -80,6 +105,11 @@ TEMPLATES = [
 WSGI_APPLICATION = "gtsportsline.wsgi.application"
 
 
+# Tests get a temporary odds board, an in-memory cache and their own collected
+# static files (core/test_runner.py)
+TEST_RUNNER = "core.test_runner.TestRunner"
+
+
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
@@ -90,6 +120,138 @@ DATABASES = {
     }
 }
 
+# Read replicas (core/replicas.py). Each entry is a copy of the primary with
+# the same settings but, for SQLite, another database file (kept in step
+# with `python manage.py sync_replicas`), or for other engines another
+# "host:port". Read-only views read from them; everything else, and every
+# write, uses the primary.
+DATABASE_REPLICAS = config("DATABASE_REPLICAS", default="", cast=Csv())
+
+
+def _replica(entry):
+    replica = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+    if replica["ENGINE"] == "django.db.backends.sqlite3":
+        replica["NAME"] = entry
+    else:
+        replica["HOST"], _, replica["PORT"] = entry.partition(":")
+    return replica
+
+
+DATABASES.update(
+    (f"replica{number}", _replica(entry)) for number, entry in enumerate(DATABASE_REPLICAS, 1)
+)
+DATABASE_ROUTERS = ["core.replicas.ReplicaRouter"]
+# After a visitor writes, their reads stay on the primary this long, so they
+# see their own changes whatever the replicas' lag
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", default=15, cast=int)
+
+
+# Cache
+# The file backend is shared by every worker and by the management commands
+# that invalidate pages. Point CACHE_BACKEND/CACHE_LOCATION at
+# django.core.cache.backends.redis.RedisCache to share it across hosts.
+
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=str(BASE_DIR / ".cache")),
+    }
+}
+
+# Cached ORM lookups (core/query_cache.py): entries kept in each process, and
+# optionally a CACHES alias to share results between processes too
+QUERY_CACHE_SIZE = config("QUERY_CACHE_SIZE", default=1000, cast=int)
+QUERY_CACHE_BACKEND = config("QUERY_CACHE_BACKEND", default="")
+QUERY_CACHE_TIMEOUT = config("QUERY_CACHE_TIMEOUT", default=3600, cast=int)
+
+# Full-page cache for anonymous visitors (see core/page_cache.py)
+PAGE_CACHE_ENABLED = config("PAGE_CACHE_ENABLED", default=True, cast=bool)
+PAGE_CACHE_TIMEOUT = config("PAGE_CACHE_TIMEOUT", default=300, cast=int)
+
+
+# External APIs
+# Longest a page will wait on NewsAPI/CFBD, retries included (see core/upstream.py)
+UPSTREAM_LATENCY_BUDGET_SECONDS = config("UPSTREAM_LATENCY_BUDGET_SECONDS", default=5.0, cast=float)
+
+
+# Sessions and auth
+# cached_db reads sessions from the cache and only falls back to
+# django_session on a miss; use "django.contrib.sessions.backends.signed_cookies"
+# to skip the database entirely. Expired rows are removed by purge_sessions.
+
+SESSION_ENGINE = config("SESSION_ENGINE", default="django.contrib.sessions.backends.cached_db")
+
+# Logged-in users are loaded from the cache rather than auth_user per request.
+# Sessions remember the backend that logged them in; ModelBackend stays listed so
+# sessions from before the cache keep working (uncached) until their next login
+AUTHENTICATION_BACKENDS = [
+    "accounts.backends.CachedModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+USER_CACHE_TIMEOUT = config("USER_CACHE_TIMEOUT", default=300, cast=int)
+
+
+# Email (line-alert digests, see odds/alerts.py)
+# Defaults to a local SMTP server; run `python manage.py smtp_stub` to catch mail in development
+EMAIL_BACKEND = config("EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend")
+EMAIL_HOST = config("EMAIL_HOST", default="localhost")
+EMAIL_PORT = config("EMAIL_PORT", default=1025, cast=int)
+EMAIL_HOST_USER = config("EMAIL_HOST_USER", default="")
+EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD", default="")
+EMAIL_USE_TLS = config("EMAIL_USE_TLS", default=False, cast=bool)
+DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="alerts@gtsportsodds.local")
+# Wait after the first alert of a burst so the rest of it lands in the same digest
+ALERT_DIGEST_DELAY_SECONDS = config("ALERT_DIGEST_DELAY_SECONDS", default=300, cast=int)
+
+
+# Background tasks (core/queue.py), run by `python manage.py run_worker`
+# Periodic tasks and how often they run, in seconds (0 turns one off). The Odds
+# API free tier allows 500 requests a month, so refreshing odds is off by default.
+TASK_SCHEDULE = {
+    "core.tasks.prune_tasks": 60 * 60,
+    "odds.tasks.refresh_odds": config("ODDS_REFRESH_SECONDS", default=0, cast=int),
+    "schedule.tasks.refresh_schedule": config("SCHEDULE_REFRESH_SECONDS", default=0, cast=int),
+    "odds.tasks.compact_odds": config("ODDS_COMPACT_SECONDS", default=0, cast=int),
+    # Picks up schedule changes; fetch_schedule also reschedules straight away
+    "schedule.tasks.schedule_kickoff_warm": 6 * 60 * 60,
+}
+
+# Load shedding and rate limits
+# Requests handled at once per server process before new ones get a fast 503
+# (core.middleware.ConcurrencyLimitMiddleware); 0, the default, turns it off. Size it
+# to the process: its threads under a threaded WSGI server, or what its event loop
+# and database connections can actually serve at once under ASGI
+MAX_IN_FLIGHT_REQUESTS = config("MAX_IN_FLIGHT_REQUESTS", default=0, cast=int)
+# Behind a reverse proxy every request comes from the proxy's address. Name the header
+# it puts the client's address in ("X-Forwarded-For", "X-Real-IP") to rate limit
+# anonymous requests by that instead. Only set this if the proxy always sets (or appends
+# to) the header, or clients can pick their own address
+RATE_LIMIT_CLIENT_IP_HEADER = config("RATE_LIMIT_CLIENT_IP_HEADER", default="")
+# Token buckets per user (or IP) for each class of write, and for bulk exports (core/ratelimit.py):
+# (requests allowed in a burst, seconds to refill them all)
+RATE_LIMITS = {
+    "comment": (5, 60),
+    "save_bet": (30, 60),
+    "login": (10, 5 * 60),
+    "signup": (5, 60 * 60),
+    "export": (10, 60 * 60),
+}
+
+# Comment filter (core/content_filter.py)
+# Blocked words and phrases, one per line; edits are picked up without a restart
+COMMENT_BLOCKLIST_PATH = config("COMMENT_BLOCKLIST_PATH", default=str(BASE_DIR / "gtsportsline" / "blocklist.txt"))
+# Most comments one user may post a minute
+COMMENT_FLOOD_LIMIT = config("COMMENT_FLOOD_LIMIT", default=5, cast=int)
+
+# Cache warming (core/warming.py, `python manage.py warm_caches`)
+# Warm the pages in the background whenever a server process starts
+WARM_CACHES_ON_STARTUP = config("WARM_CACHES_ON_STARTUP", default=False, cast=bool)
+# Around each game, keep the pages warm from this long before kickoff until this long after
+KICKOFF_WARM_LEAD_MINUTES = config("KICKOFF_WARM_LEAD_MINUTES", default=90, cast=int)
+KICKOFF_WARM_UNTIL_MINUTES = config("KICKOFF_WARM_UNTIL_MINUTES", default=240, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -126,6 +288,18 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.0/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic writes content-hashed copies of every asset plus gzip and
+# brotli variants; WhiteNoise serves them with far-future cache headers.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
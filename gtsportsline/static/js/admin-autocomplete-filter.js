@@ -0,0 +1,15 @@
+// Admin list filters with a search box (core.admin_tools.AutocompleteFilter):
+// picking a value reloads the changelist filtered by it.
+'use strict';
+{
+    const $ = django.jQuery;
+
+    $(document).on('change', '.admin-autocomplete-filter', function() {
+        const queryString = this.closest('[data-query-string]').dataset.queryString;
+        const params = new URLSearchParams(queryString);
+        if (this.value) {
+            params.set(this.name, this.value);
+        }
+        window.location.search = params.toString();
+    });
+}
@@ -0,0 +1,61 @@
+// Save/unsave buttons on the odds list, game detail and saved bets pages.
+// Buttons with data-remove-on-unsave drop their card when the bet is unsaved.
+document.addEventListener('DOMContentLoaded', function() {
+    const csrfToken = document.querySelector('meta[name="csrf-token"]')?.getAttribute('content');
+    const saveButtons = document.querySelectorAll('.save-bet-btn');
+
+    saveButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const gameId = this.getAttribute('data-game-id');
+            const span = this.querySelector('.save-text');
+            const card = this.closest('.card');
+            const removeOnUnsave = this.hasAttribute('data-remove-on-unsave');
+
+            fetch(`/odds/${gameId}/save/`, {
+                method: 'POST',
+                headers: {
+                    'X-CSRFToken': csrfToken
+                },
+                credentials: 'same-origin'
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.error) {
+                    // e.g. rate limited; leave the button as it was
+                    alert(data.error);
+                    return;
+                }
+                if (removeOnUnsave) {
+                    if (!data.saved) {
+                        // If unsaved, remove the card from the page
+                        card.style.transition = 'opacity 0.3s ease';
+                        card.style.opacity = '0';
+                        setTimeout(() => {
+                            card.remove();
+                            // Check if there are no more cards, show message
+                            if (document.querySelectorAll('.card').length === 0) {
+                                location.reload();
+                            }
+                        }, 300);
+                    }
+                } else if (data.saved) {
+                    this.classList.remove('btn-outline-warning');
+                    this.classList.add('btn-warning');
+                    this.style.backgroundColor = '#B3A369';
+                    this.style.borderColor = '#B3A369';
+                    if (span) span.textContent = 'Saved';
+                } else {
+                    this.classList.remove('btn-warning');
+                    this.classList.add('btn-outline-warning');
+                    this.style.backgroundColor = '';
+                    this.style.borderColor = '';
+                    if (span) span.textContent = 'Save';
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                alert(removeOnUnsave ? 'Error updating saved bet.' : 'Please log in to save bets.');
+            });
+        });
+    });
+});
@@ -0,0 +1,22 @@
+const toggleButton = document.getElementById('darkModeToggle');
+const htmlElement = document.documentElement;
+
+// Check local storage on load
+if (localStorage.getItem('theme') === 'dark') {
+    htmlElement.setAttribute('data-bs-theme', 'dark');
+    toggleButton.innerHTML = '☀️'; // Change icon to sun
+}
+
+toggleButton.addEventListener('click', () => {
+    const currentTheme = htmlElement.getAttribute('data-bs-theme');
+    
+    if (currentTheme === 'dark') {
+        htmlElement.setAttribute('data-bs-theme', 'light');
+        localStorage.setItem('theme', 'light');
+        toggleButton.innerHTML = '🌙';
+    } else {
+        htmlElement.setAttribute('data-bs-theme', 'dark');
+        localStorage.setItem('theme', 'dark');
+        toggleButton.innerHTML = '☀️';
+    }
+});
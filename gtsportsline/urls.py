@@ -25,4 +25,5 @@ urlpatterns = [
     path('news/', include('news.urls')),
     path('odds/', include('odds.urls')),
     path('schedule/', include('schedule.urls')),
+    path('status/', include('core.urls')),
 ]
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "gtsportsline.settings")
 
 application = get_wsgi_application()
+
+if settings.WARM_CACHES_ON_STARTUP:
+    # Imported here because it needs the app registry, loaded just above
+    from core.warming import warm_caches_in_background
+
+    warm_caches_in_background()
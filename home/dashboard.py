@@ -0,0 +1,213 @@
+"""
+Widgets on the home dashboard.
+
+Each widget loads on its own: they all start at once, each with its own cache
+TTL and timeout, so the page takes as long as the slowest widget's timeout at
+worst rather than the sum of every source. A widget that times out or fails
+shows its last good copy if there is one (marked stale) or an "unavailable"
+note; it never takes the rest of the page down with it.
+
+Loaders take the user and the team the page is for (core.teams.Team), and
+are cached per team, or per user for per-user widgets. They return plain,
+picklable values (dicts and lists), which are what's cached. Database
+loaders run in their own threads, so a slow query only holds up its own
+widget.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+from core.teams import followed_teams
+from core.upstream import coalesced
+from news.views import fetch_football_news
+from odds.board import current_board
+from odds.models import SavedBet
+from schedule.models import Game as ScheduleGame
+
+logger = logging.getLogger(__name__)
+
+WIDGET_KEY = "dashboard:{}:{}"
+# Last good copies are kept this long, to show while a source is down
+STALE_TIMEOUT = 24 * 60 * 60
+HEADLINES = 5
+SAVED_BETS = 5
+
+
+@dataclass
+class Widget:
+    name: str
+    load: object
+    ttl: int
+    timeout: float
+    per_user: bool = False
+
+
+@dataclass
+class Loaded:
+    value: object = None
+    stale: bool = False
+    error: str = None
+
+
+def _in_own_thread(func):
+    """Run a sync loader in its own thread (closing its connection after), as a coroutine"""
+    def run(*args):
+        try:
+            return func(*args)
+        finally:
+            connections.close_all()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def _next_schedule_game(team):
+    # Still "next" until it's over
+    return (
+        ScheduleGame.objects.involving(team)
+        .filter(game_date__gte=timezone.now() - timedelta(hours=4))
+        .order_by('game_date')
+        .first()
+    )
+
+
+@_in_own_thread
+def load_next_game(user, team):
+    game = _next_schedule_game(team)
+    if game is None:
+        return None
+    return {
+        'opponent': game.opponent_of(team),
+        'is_home': game.is_home_for(team),
+        'neutral_site': game.neutral_site,
+        'game_date': game.game_date,
+        'start_time': game.start_time,
+        'venue': game.venue,
+    }
+
+
+@_in_own_thread
+def load_next_line(user, team):
+    game = _next_schedule_game(team)
+    if game is None:
+        return None
+    odds_game = next(
+        (odds_game for odds_game in current_board().upcoming(game.game_date - timedelta(days=1))
+         if game.matches_odds_game(odds_game)),
+        None,
+    )
+    if odds_game is None:
+        return None
+    return {
+        'id': odds_game.id,
+        'matchup': str(odds_game),
+        'home_team': odds_game.home_team,
+        'home_team_spread': odds_game.home_team_spread,
+        'home_team_moneyline': odds_game.home_team_moneyline,
+        'away_team': odds_game.away_team,
+        'away_team_moneyline': odds_game.away_team_moneyline,
+        'total_over': odds_game.total_over,
+        'bookmaker_name': odds_game.bookmaker_name,
+        'last_updated': odds_game.last_updated,
+    }
+
+
+async def load_headlines(user, team):
+    articles, notice = await fetch_football_news(team)
+    if not articles and notice:
+        raise RuntimeError(notice)
+    return [
+        {key: article[key] for key in ('title', 'url', 'source', 'published_at')}
+        for article in articles[:HEADLINES]
+    ]
+
+
+@_in_own_thread
+def load_saved_bets(user, team):
+    saved_bets = (
+        SavedBet.objects.filter(user=user, game__game_time__gte=timezone.now())
+        .select_related('game')
+        .order_by('game__game_time')[:SAVED_BETS]
+    )
+    return [
+        {
+            'id': saved_bet.game.id,
+            'matchup': str(saved_bet.game),
+            'game_time': saved_bet.game.game_time,
+            'home_team': saved_bet.game.home_team,
+            'home_team_spread': saved_bet.game.home_team_spread,
+        }
+        for saved_bet in saved_bets
+    ]
+
+
+WIDGETS = [
+    Widget('next_game', load_next_game, ttl=5 * 60, timeout=1.0),
+    Widget('next_line', load_next_line, ttl=60, timeout=1.0),
+    Widget('headlines', load_headlines, ttl=10 * 60, timeout=1.5),
+    Widget('saved_bets', load_saved_bets, ttl=5 * 60, timeout=1.0, per_user=True),
+]
+
+
+def _key(widget, user, team):
+    return WIDGET_KEY.format(widget.name, f"user{user.pk}" if widget.per_user else team.slug)
+
+
+def invalidate(name, user=None):
+    """
+    Drop a widget's cached value, e.g. after a write: for a per-user widget,
+    that user's; otherwise every followed team's.
+    """
+    widget = next(widget for widget in WIDGETS if widget.name == name)
+    keys = [_key(widget, user, team) for team in ([None] if widget.per_user else followed_teams())]
+    cache.delete_many([*keys, *(f"{key}:stale" for key in keys)])
+
+
+async def _refresh(widget, user, team, key):
+    value = await widget.load(user, team)
+    # Wrapped in a tuple so a widget with nothing to show (None) is still a cache hit
+    await cache.aset(key, (value,), widget.ttl)
+    await cache.aset(f"{key}:stale", (value,), STALE_TIMEOUT)
+    return value
+
+
+async def _load(widget, user, team, key):
+    try:
+        # Concurrent page loads share one load per widget; one that outlasts
+        # the timeout keeps going and fills the cache for the next visitor
+        value = await asyncio.wait_for(coalesced(key, lambda: _refresh(widget, user, team, key)), widget.timeout)
+    except Exception as error:
+        if isinstance(error, asyncio.TimeoutError):
+            logger.warning("Dashboard widget %s timed out after %ss", widget.name, widget.timeout)
+        else:
+            logger.warning("Dashboard widget %s failed: %s", widget.name, error)
+        stale = await cache.aget(f"{key}:stale")
+        if stale is not None:
+            return Loaded(stale[0], stale=True)
+        return Loaded(error=str(error) or "Unavailable right now.")
+    return Loaded(value)
+
+
+async def load_dashboard(user, team):
+    """Every widget for this user and team, loaded concurrently: {name: Loaded}"""
+    keys = {
+        widget.name: _key(widget, user, team)
+        for widget in WIDGETS if user.is_authenticated or not widget.per_user
+    }
+    cached = await cache.aget_many(keys.values())
+    widgets = {}
+    misses = []
+    for widget in WIDGETS:
+        key = keys.get(widget.name)
+        if key in cached:
+            widgets[widget.name] = Loaded(cached[key][0])
+        elif key is not None:
+            misses.append((widget, key))
+    loaded = await asyncio.gather(*(_load(widget, user, team, key) for widget, key in misses))
+    widgets.update((widget.name, result) for (widget, _), result in zip(misses, loaded))
+    return widgets
@@ -1,3 +1,190 @@
-from django.test import TestCase
+import asyncio
+import re
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.teams import TEAM_COOKIE, followed_teams
+from odds.models import Game as OddsGame
+
+from . import dashboard
+from .dashboard import Widget
+
+STATIC_TAG = re.compile(r"{% static '([^']+)' %}")
+
+
+def _templates():
+    for directory in [*settings.TEMPLATES[0]['DIRS'], *Path(settings.BASE_DIR).glob('*/templates')]:
+        yield from Path(directory).rglob('*.html')
+
+
+class StaticAssetTests(SimpleTestCase):
+    def test_every_referenced_asset_exists(self):
+        referenced = {path for template in _templates() for path in STATIC_TAG.findall(template.read_text())}
+        self.assertIn('css/base.css', referenced)
+        missing = sorted(path for path in referenced if not finders.find(path))
+        self.assertEqual(missing, [])
+
+    def test_templates_have_no_inline_styles_or_scripts(self):
+        inline = [
+            str(template) for template in _templates()
+            if '<style' in template.read_text() or re.search(r'<script(?![^>]*\bsrc=)[^>]*>', template.read_text())
+        ]
+        self.assertEqual(inline, [])
+
+
+class HomePageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('home.dashboard.fetch_football_news', new_callable=mock.AsyncMock, return_value=([], None))
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_links_the_hashed_stylesheet(self):
+        response = self.client.get(reverse('home.index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response.content.decode(), r'/static/css/base\.[0-9a-f]{12}\.css')
+
+    def test_degraded_page_isnt_cached(self):
+        self.fetch.return_value = ([], "Unable to reach the news service right now.")
+        with self.assertLogs('home.dashboard', 'WARNING'):
+            response = self.client.get(reverse('home.index'))
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self.assertContains(response, 'Unable to reach the news service right now.')
+
+
+@override_settings(FOLLOWED_TEAMS=['Georgia Tech:Yellow Jackets', 'Georgia:Bulldogs'])
+class ChooseTeamTests(SimpleTestCase):
+    def _choose(self, team, next_url):
+        return self.client.get(reverse('home.choose_team'), {'team': team, 'next': next_url})
+
+    def test_sets_the_cookie_and_goes_back(self):
+        response = self._choose('georgia', '/odds/')
+        self.assertRedirects(response, '/odds/', fetch_redirect_response=False)
+        self.assertEqual(response.cookies[TEAM_COOKIE].value, 'georgia')
+
+    def test_drops_team_from_the_page_it_goes_back_to(self):
+        response = self._choose('georgia', '/schedule/?year=2025&team=georgia-tech')
+        self.assertEqual(response['Location'], '/schedule/?year=2025')
+
+    def test_wont_redirect_off_site(self):
+        for next_url in ('https://evil.example.com/', '//evil.example.com/'):
+            with self.subTest(next_url=next_url):
+                self.assertEqual(self._choose('georgia', next_url)['Location'], '/')
+
+    def test_unknown_team_leaves_the_cookie_alone(self):
+        self.assertNotIn(TEAM_COOKIE, self._choose('alabama', '/').cookies)
+
+
+class FakeUser:
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = pk
+
+
+class DashboardTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.team = followed_teams()[0]
+        self.calls = []
+
+    def _widgets(self, *widgets):
+        patcher = mock.patch.object(dashboard, 'WIDGETS', list(widgets))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _loader(self, value, delay=0, error=None):
+        async def load(user, team):
+            self.calls.append((user.pk, team.slug))
+            await asyncio.sleep(delay)
+            if error:
+                raise RuntimeError(error)
+            return value
+        return load
+
+    async def test_widgets_load_concurrently_then_come_from_the_cache(self):
+        self._widgets(
+            Widget('a', self._loader('A', delay=0.2), ttl=60, timeout=1),
+            Widget('b', self._loader('B', delay=0.2), ttl=60, timeout=1),
+        )
+        started = time.perf_counter()
+        widgets = await dashboard.load_dashboard(AnonymousUser(), self.team)
+        self.assertLess(time.perf_counter() - started, 0.35)
+        self.assertEqual({name: loaded.value for name, loaded in widgets.items()}, {'a': 'A', 'b': 'B'})
+        await dashboard.load_dashboard(AnonymousUser(), self.team)
+        self.assertEqual(len(self.calls), 2)
+
+    async def test_nothing_to_show_is_still_cached(self):
+        self._widgets(Widget('a', self._loader(None), ttl=60, timeout=1))
+        await dashboard.load_dashboard(AnonymousUser(), self.team)
+        widgets = await dashboard.load_dashboard(AnonymousUser(), self.team)
+        self.assertIsNone(widgets['a'].value)
+        self.assertEqual(len(self.calls), 1)
+
+    async def test_per_user_widgets_are_cached_per_user_and_skipped_for_anonymous(self):
+        self._widgets(Widget('mine', self._loader('bets'), ttl=60, timeout=1, per_user=True))
+        self.assertEqual(await dashboard.load_dashboard(AnonymousUser(), self.team), {})
+        await dashboard.load_dashboard(FakeUser(1), self.team)
+        await dashboard.load_dashboard(FakeUser(2), self.team)
+        await dashboard.load_dashboard(FakeUser(1), self.team)
+        self.assertEqual([pk for pk, _ in self.calls], [1, 2])
+
+    async def test_slow_widget_shows_its_last_good_copy(self):
+        self._widgets(Widget('a', self._loader('old'), ttl=60, timeout=0.05))
+        await dashboard.load_dashboard(AnonymousUser(), self.team)
+        await cache.adelete(dashboard._key(dashboard.WIDGETS[0], None, self.team))
+        dashboard.WIDGETS[0].load = self._loader('new', delay=0.2)
+        with self.assertLogs('home.dashboard', 'WARNING'):
+            widgets = await dashboard.load_dashboard(AnonymousUser(), self.team)
+        self.assertEqual((widgets['a'].value, widgets['a'].stale), ('old', True))
+        # The load carries on and fills the cache for the next visitor
+        await asyncio.sleep(0.25)
+        widgets = await dashboard.load_dashboard(AnonymousUser(), self.team)
+        self.assertEqual((widgets['a'].value, widgets['a'].stale), ('new', False))
+
+    async def test_failing_widget_without_a_copy_doesnt_take_down_the_others(self):
+        self._widgets(
+            Widget('broken', self._loader(None, error='source down'), ttl=60, timeout=1),
+            Widget('fine', self._loader('ok'), ttl=60, timeout=1),
+        )
+        with self.assertLogs('home.dashboard', 'WARNING'):
+            widgets = await dashboard.load_dashboard(AnonymousUser(), self.team)
+        self.assertEqual(widgets['broken'].error, 'source down')
+        self.assertEqual(widgets['fine'].value, 'ok')
+
+    async def test_invalidate_drops_every_teams_copy(self):
+        self._widgets(Widget('a', self._loader('A'), ttl=60, timeout=1))
+        for team in followed_teams():
+            await dashboard.load_dashboard(AnonymousUser(), team)
+        dashboard.invalidate('a')
+        for team in followed_teams():
+            await dashboard.load_dashboard(AnonymousUser(), team)
+        self.assertEqual(len(self.calls), 2 * len(followed_teams()))
+
+
+class SavedBetsWidgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('fan')
+        self.client.force_login(self.user)
+        self.game = OddsGame.objects.create(
+            api_game_id='g1', home_team='Georgia Tech Yellow Jackets', away_team='Clemson Tigers',
+            game_time=timezone.now() + timedelta(days=2), bookmaker_name='DraftKings', last_updated=timezone.now(),
+        )
+
+    def test_saving_a_bet_drops_the_users_cached_widget(self):
+        widget = next(widget for widget in dashboard.WIDGETS if widget.name == 'saved_bets')
+        key = dashboard._key(widget, self.user, None)
+        cache.set_many({key: ([],), f'{key}:stale': ([],)})
+        self.client.post(reverse('odds:save_bet', args=[self.game.id]))
+        self.assertEqual(cache.get_many([key, f'{key}:stale']), {})
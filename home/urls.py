@@ -2,4 +2,5 @@ from django.urls import path
 from . import views
 urlpatterns = [
     path('', views.index, name='home.index'),
-]
\ No newline at end of file
+    path('team/', views.choose_team, name='home.choose_team'),
+]
@@ -1,5 +1,38 @@
-from django.shortcuts import render
+from django.http import QueryDict
+from django.shortcuts import redirect, render
+from django.utils.http import url_has_allowed_host_and_scheme
 
-# Create your views here.
-def index(request):
-    return render(request, 'home/index.html')
\ No newline at end of file
+from core.page_cache import cache_page_for_anonymous
+from core.teams import TEAM_COOKIE, TEAM_COOKIE_MAX_AGE, current_team, get_team
+from core.upstream import upstream_client
+
+from .dashboard import load_dashboard
+
+
+@cache_page_for_anonymous('home', 'news', 'schedule', 'odds')
+@upstream_client
+async def index(request):
+    user = await request.auser()
+    widgets = await load_dashboard(user, current_team(request))
+    response = render(request, 'home/index.html', {'widgets': widgets})
+    if any(widget.stale or widget.error for widget in widgets.values()):
+        # Don't keep a degraded page in the page cache once the sources are back
+        response['Cache-Control'] = 'no-store'
+    return response
+
+
+def choose_team(request):
+    """Switch the followed team this visitor sees (the team cookie), then go back"""
+    next_url = request.GET.get('next', '/')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        next_url = '/'
+    # An explicit ?team= in the page's URL would override the new choice
+    path, _, query = next_url.partition('?')
+    params = QueryDict(query, mutable=True)
+    params.pop('team', None)
+    response = redirect(f"{path}?{params.urlencode()}" if params else path)
+
+    team = get_team(request.GET.get('team'))
+    if team is not None:
+        response.set_cookie(TEAM_COOKIE, team.slug, max_age=TEAM_COOKIE_MAX_AGE, samesite='Lax')
+    return response
@@ -1,4 +1,7 @@
 from django.contrib import admin
+
+from core.admin_tools import AutocompleteFilter, ModerationAdmin
+
 from .models import NewsArticle, Comment
 
 @admin.register(NewsArticle)
@@ -8,12 +11,17 @@ class NewsArticleAdmin(admin.ModelAdmin):
     search_fields = ['title', 'content']
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ModerationAdmin):
     """Admin interface for managing comments - allows admins to remove inappropriate comments"""
     list_display = ['content_preview', 'author', 'article', 'created_at']
-    list_filter = ['created_at', 'article']
-    search_fields = ['content', 'author__username', 'article__title']
-    actions = ['delete_selected']
+    list_filter = ['created_at', ('article', AutocompleteFilter), ('author', AutocompleteFilter)]
+    # Content is searched through the full-text index (see core/fulltext.py), not
+    # icontains; the '=' fields match the whole search term
+    search_fields = ['content', '=author__username', '=article__title']
+    fulltext_field = 'content'
+    search_help_text = 'Words in the comment, or an exact author username or article title'
+    page_cache_groups = ['news.article.{article_id}']
+    raw_id_fields = ['article', 'author']
     
     def content_preview(self, obj):
         """Show a preview of the comment content (first 50 characters)"""
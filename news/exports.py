@@ -0,0 +1,17 @@
+from core.export import Export, register
+
+from .models import Comment
+
+comments = register(Export(
+    name='news_comments',
+    queryset=lambda: Comment.objects.all(),
+    columns=[
+        ('id', 'id'),
+        ('article_id', 'article_id'),
+        ('article_title', 'article__title'),
+        ('author', 'author__username'),
+        ('created_at', 'created_at'),
+        ('content', 'content'),
+    ],
+    date_field='created_at',
+))
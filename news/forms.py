@@ -1,7 +1,10 @@
 from django import forms
+
+from core.content_filter import ContentFilterMixin
+
 from .models import Comment
 
-class CommentForm(forms.ModelForm):
+class CommentForm(ContentFilterMixin, forms.ModelForm):
     class Meta:
         model = Comment
         fields = ['content']
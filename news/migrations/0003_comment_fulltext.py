@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from core.fulltext import fulltext_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_comment'),
+    ]
+
+    operations = [
+        # Admin comment search (core.admin_tools.ModerationAdmin)
+        fulltext_index('news', 'Comment', 'content'),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from core.query_cache import CachingManager
+
 class NewsArticle(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
@@ -8,6 +10,8 @@ class NewsArticle(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = CachingManager()
+    
     class Meta:
         ordering = ['-created_at']
     
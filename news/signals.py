@@ -0,0 +1,21 @@
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.page_cache import bump_pages
+
+from .models import NewsArticle
+
+
+@receiver(post_save, sender=NewsArticle)
+@receiver(post_delete, sender=NewsArticle)
+def bump_article_pages(sender, instance, **kwargs):
+    """
+    Any article write (the views, admin edits and deletes, the shell) drops the
+    cached news list and the article's own page. Inside a transaction the pages
+    are bumped again on commit, so one rendered in between isn't kept.
+    """
+    groups = ('news', f'news.article.{instance.pk}')
+    bump_pages(*groups)
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        transaction.on_commit(lambda: bump_pages(*groups))
@@ -1,3 +1,218 @@
-from django.test import TestCase
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import content_filter, page_cache, query_cache
+from core.models import Task
+from core.payloads import Article, ArticleSource, Decoded, PayloadError, RejectedRecord
+from core.teams import default_team
+from core.upstream import UpstreamUnavailable
+
+from .models import Comment, NewsArticle
+from .views import fetch_football_news
+
+
+def decoded_articles(*titles, rejected=()):
+    return Decoded(
+        [
+            Article(title=title, url=f'https://example.com/{index}', source=ArticleSource('ESPN'),
+                    published_at=datetime(2025, 9, 6, 12))
+            for index, title in enumerate(titles)
+        ],
+        list(rejected),
+    )
+
+
+def unavailable(fallback=None):
+    error = UpstreamUnavailable('news', 'circuit open')
+    error.fallback = fallback
+    return error
+
+
+@override_settings(NEWS_API_KEY='test-key')
+class FetchFootballNewsTests(TestCase):
+    def _fetch(self, **get_json):
+        with mock.patch('news.views.get_json', new_callable=mock.AsyncMock, **get_json) as fetch:
+            result = async_to_sync(fetch_football_news)(default_team())
+        return result, fetch
+
+    def test_normalizes_the_articles(self):
+        (articles, error), fetch = self._fetch(return_value=decoded_articles('Week one preview'))
+        self.assertIsNone(error)
+        self.assertEqual(articles[0]['title'], 'Week one preview')
+        self.assertEqual(articles[0]['source'], 'ESPN')
+        self.assertEqual(articles[0]['published_at'].tzinfo, dt_timezone.utc)
+        self.assertIn(default_team().school, fetch.call_args.kwargs['params']['q'])
+
+    def test_rejected_articles_are_logged_and_skipped(self):
+        decoded = decoded_articles('Week one preview', rejected=[RejectedRecord(1, 'Expected `str`')])
+        with self.assertLogs('news.views', 'WARNING') as logs:
+            (articles, error), _ = self._fetch(return_value=decoded)
+        self.assertEqual(len(articles), 1)
+        self.assertIn('record 1', logs.output[0])
+
+    @override_settings(NEWS_API_KEY=None)
+    def test_not_configured(self):
+        (articles, error), fetch = self._fetch()
+        self.assertEqual((articles, error), ([], "News service is not configured yet."))
+        fetch.assert_not_called()
+
+    def test_upstream_down_without_a_last_good_copy(self):
+        (articles, error), _ = self._fetch(side_effect=unavailable())
+        self.assertEqual((articles, error), ([], "Unable to reach the news service right now."))
+
+    def test_upstream_down_serves_the_last_good_copy(self):
+        (articles, error), _ = self._fetch(side_effect=unavailable(decoded_articles('Old news')))
+        self.assertEqual([article['title'] for article in articles], ['Old news'])
+        self.assertIn('may be out of date', error)
+
+    def test_malformed_payload(self):
+        (articles, error), _ = self._fetch(side_effect=PayloadError("status 'error'"))
+        self.assertEqual((articles, error), ([], "Unexpected response from the news service."))
+
+
+class NewsListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user('writer')
+        NewsArticle.objects.create(title='Our preview', content='Week one', author=author)
+
+    def _patch_fetch(self, fetched):
+        return mock.patch('news.views.fetch_football_news', new_callable=mock.AsyncMock, return_value=fetched)
+
+    async def test_lists_our_articles_before_the_api_stories(self):
+        api_articles = [{'title': 'Wire story', 'url': 'https://example.com/1'}]
+        with self._patch_fetch((api_articles, None)):
+            response = await self.async_client.get(reverse('news.list'))
+        titles = [article['title'] for article in response.context['template_data']['articles']]
+        self.assertEqual(titles, ['Our preview', 'Wire story'])
+
+    async def test_shows_the_upstream_error_alongside_our_articles(self):
+        with self._patch_fetch(([], "Unable to reach the news service right now.")):
+            response = await self.async_client.get(reverse('news.list'))
+        self.assertContains(response, 'Unable to reach the news service right now.')
+        self.assertContains(response, 'Our preview')
+
+
+class NewsPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('writer', password='pw')
+        self.client.force_login(self.user)
+
+    def test_creating_an_article_bumps_the_news_pages_right_away(self):
+        before = page_cache._group_version('news')
+        self.client.post(reverse('news.create'), {'title': 'Preview', 'content': 'Week one'})
+        self.assertNotEqual(page_cache._group_version('news'), before)
+        # Not left to a worker
+        self.assertFalse(Task.objects.exists())
+
+    def test_deleting_an_article_bumps_its_page(self):
+        article = NewsArticle.objects.create(title='Preview', content='Week one', author=self.user)
+        group = f'news.article.{article.id}'
+        before = page_cache._group_version(group)
+        self.client.post(reverse('news.delete', args=[article.id]))
+        self.assertNotEqual(page_cache._group_version(group), before)
+
+    def test_admin_edits_bump_the_list_and_the_article_page(self):
+        article = NewsArticle.objects.create(title='Preview', content='Week one', author=self.user)
+        groups = ['news', f'news.article.{article.id}']
+        before = [page_cache._group_version(group) for group in groups]
+        article.title = 'Week one preview'
+        article.save()
+        after = [page_cache._group_version(group) for group in groups]
+        self.assertTrue(all(old != new for old, new in zip(before, after)))
+
+
+class ArticleFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        query_cache._local.clear()
+        self.author = User.objects.create_user('writer', password='pw')
+        NewsArticle.objects.create(title='Preview', content='Week one', author=self.author)
+        # Logged in, so pages come from the view rather than the page cache
+        self.client.force_login(User.objects.create_user('reader'))
+
+    def _feed_authors(self):
+        response = self.client.get(reverse('news.list'))
+        return [article['author'] for article in response.context['template_data']['articles'] if article.get('is_db_article')]
+
+    def test_username_change_shows_up(self):
+        self.assertEqual(self._feed_authors(), ['writer'])
+        self.author.username = 'columnist'
+        self.author.save()
+        self.assertEqual(self._feed_authors(), ['columnist'])
+
+    def test_logging_in_doesnt_invalidate_the_feed(self):
+        self._feed_authors()
+        version = query_cache._versions(['auth.user'])
+        self.assertTrue(self.client.login(username='writer', password='pw'))
+        self.assertEqual(query_cache._versions(['auth.user']), version)
+
+    @override_settings(QUERY_CACHE_BACKEND='default')
+    def test_no_user_rows_in_the_shared_cache(self):
+        self._feed_authors()
+        query_cache._local.clear()
+        feed = NewsArticle.objects.cached_query('feed', lambda: self.fail('not cached'), depends=[NewsArticle, User])
+        self.assertEqual(feed[0]['author__username'], 'writer')
+        self.assertNotIn('password', repr(feed))
+
+
+class CommentFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        blocklist = Path(directory.name) / 'blocklist.txt'
+        blocklist.write_text('free picks\n')
+        overrides = override_settings(COMMENT_BLOCKLIST_PATH=str(blocklist), COMMENT_FLOOD_LIMIT=5)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        patcher = mock.patch.object(content_filter, 'recent_comments', content_filter.RecentComments())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        user = User.objects.create_user('fan')
+        self.client.force_login(user)
+        self.article = NewsArticle.objects.create(title='Preview', content='Week one', author=user)
+        self.url = reverse('news.detail', args=[self.article.id])
+
+    def test_blocked_language_is_refused(self):
+        response = self.client.post(self.url, {'content': 'Get your FR33 picks here'})
+        self.assertContains(response, "contains language that isn&#x27;t allowed")
+        self.assertFalse(Comment.objects.exists())
+
+    def test_the_same_comment_twice_is_refused(self):
+        self.assertEqual(self.client.post(self.url, {'content': 'Great win'}).status_code, 302)
+        response = self.client.post(self.url, {'content': 'Great win!'})
+        self.assertContains(response, "already posted that comment")
+        self.assertEqual(Comment.objects.count(), 1)
+
+
+class ExportCommentsTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('fan')
+        article = NewsArticle.objects.create(title='Preview', content='Week one', author=author)
+        Comment.objects.create(article=article, author=author, content='Go Jackets, "ramblin" wreck')
+        self.url = reverse('news.export_comments')
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.create_user('reader'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/admin/login/', response['Location'])
+
+    def test_csv_of_every_comment(self):
+        self.client.force_login(User.objects.create_user('moderator', is_staff=True))
+        response = self.client.get(self.url)
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(rows[0], 'id,article_id,article_title,author,created_at,content')
+        self.assertIn('Preview,fan,', rows[1])
+        self.assertTrue(rows[1].endswith(',"Go Jackets, ""ramblin"" wreck"'))
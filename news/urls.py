@@ -6,5 +6,6 @@ urlpatterns = [
     path('create/', views.create_news, name='news.create'),
     path('<int:article_id>/', views.news_detail, name='news.detail'),
     path('<int:article_id>/delete/', views.delete_news, name='news.delete'),
+    path('comments/export.csv', views.export_comments, name='news.export_comments'),
 ]
 
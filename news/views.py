@@ -1,109 +1,116 @@
-from datetime import datetime
+import logging
 
-import requests
+import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
 from django.shortcuts import get_object_or_404, redirect, render
-from django.utils.dateparse import parse_datetime
-from django.utils import timezone
 
 from .models import NewsArticle, Comment
 from .forms import CommentForm
-
+from . import exports
+from core.export import csv_response
+from core.page_cache import bump_pages, cache_page_for_anonymous
+from core.query_cache import get_cached_or_404
+from core.ratelimit import rate_limit
+from core.replicas import read_from_replica
+from core.teams import current_team
+from core.payloads import PayloadError, aware, decode_news
+from core.upstream import UpstreamUnavailable, get_json, upstream_client
+
+logger = logging.getLogger(__name__)
 
 NEWS_API_URL = "https://newsapi.org/v2/everything"
 NEWS_API_TIMEOUT_SECONDS = 8
 
 
-def _normalize_published_at(raw_value: str | None) -> datetime | None:
-    if not raw_value:
-        return None
-
-    parsed = parse_datetime(raw_value)
-    if parsed:
-        if timezone.is_naive(parsed):
-            return timezone.make_aware(parsed, timezone.utc)
-        return parsed
-
-    try:
-        # Handle potential non-ISO formats by letting datetime parse after replacing Z
-        raw_value = raw_value.replace("Z", "+00:00")
-        parsed = datetime.fromisoformat(raw_value)
-        if timezone.is_naive(parsed):
-            return timezone.make_aware(parsed, timezone.utc)
-        return parsed
-    except (ValueError, TypeError):
-        return None
-
-
-def _fetch_georgia_tech_football_news():
+async def fetch_football_news(team):
+    """NewsAPI's latest football stories about `team` (a core.teams.Team)"""
     api_key = getattr(settings, "NEWS_API_KEY", None)
     if not api_key:
         return [], "News service is not configured yet."
 
     params = {
-        "q": '"Georgia Tech" AND ("Yellow Jackets" OR football)',
+        "q": f'"{team.school}" AND ("{team.mascot}" OR football)',
         "language": "en",
         "sortBy": "publishedAt",
         "pageSize": 12,
         "apiKey": api_key,
     }
 
+    notice = None
     try:
-        response = requests.get(
-            NEWS_API_URL,
-            params=params,
-            timeout=NEWS_API_TIMEOUT_SECONDS,
+        # Concurrent page loads share one in-flight request, and the circuit
+        # breaker fails fast while NewsAPI is down (see core/upstream.py)
+        decoded = await get_json(
+            'news', NEWS_API_URL, params=params, timeout=NEWS_API_TIMEOUT_SECONDS, decode=decode_news,
         )
-        response.raise_for_status()
-        payload = response.json()
-    except requests.exceptions.RequestException:
+    except UpstreamUnavailable as error:
+        if error.fallback is None:
+            return [], "Unable to reach the news service right now."
+        decoded = error.fallback
+        notice = "The news service is unavailable right now, so these stories may be out of date."
+    except PayloadError:
+        return [], "Unexpected response from the news service."
+    except httpx.HTTPError:
         return [], "Unable to reach the news service right now."
 
-    if payload.get("status") != "ok":
-        return [], "Unexpected response from the news service."
+    for rejected in decoded.rejected:
+        logger.warning("Skipped malformed NewsAPI article, %s", rejected)
 
     normalized_articles = []
-    for article in payload.get("articles", []):
+    for article in decoded.records:
         normalized_articles.append(
             {
-                "title": article.get("title"),
-                "description": article.get("description"),
-                "url": article.get("url"),
-                "image_url": article.get("urlToImage"),
-                "source": (article.get("source") or {}).get("name"),
-                "author": article.get("author"),
-                "published_at": _normalize_published_at(article.get("publishedAt")),
+                "title": article.title,
+                "description": article.description,
+                "url": article.url,
+                "image_url": article.url_to_image,
+                "source": article.source.name if article.source else None,
+                "author": article.author,
+                "published_at": aware(article.published_at),
             }
         )
 
-    return normalized_articles, None
+    return normalized_articles, notice
+
+def _article_feed():
+    """User-written articles for the list, as plain values: no User rows (password hashes) in the cache"""
+    return list(NewsArticle.objects.values('id', 'title', 'content', 'created_at', 'author__username'))
 
-def news_list(request):
+@cache_page_for_anonymous('news')
+@read_from_replica
+@upstream_client
+async def news_list(request):
+    team = current_team(request)
     template_data = {
-        'title': 'Georgia Tech Football News'
+        'title': f'{team.school} Football News'
     }
     
-    # Get user-created articles from database
-    db_articles = NewsArticle.objects.all()
+    # Get user-created articles from database (cached until an article or a user changes)
+    db_articles = await sync_to_async(NewsArticle.objects.cached_query)(
+        'feed', _article_feed, depends=[NewsArticle, User],
+    )
     
     # Convert database articles to same format as API articles
     db_articles_list = []
     for article in db_articles:
         db_articles_list.append({
-            "title": article.title,
-            "description": article.content[:200] + "..." if len(article.content) > 200 else article.content,
-            "url": f"/news/{article.id}/",  # Link to detail page
+            "title": article['title'],
+            "description": article['content'][:200] + "..." if len(article['content']) > 200 else article['content'],
+            "url": f"/news/{article['id']}/",  # Link to detail page
             "image_url": None,
             "source": "GTSportsLine",
-            "author": article.author.username,
-            "published_at": article.created_at,
+            "author": article['author__username'],
+            "published_at": article['created_at'],
             "is_db_article": True,  # Flag to identify database articles
-            "article_id": article.id,
+            "article_id": article['id'],
         })
     
     # Get external news from API
-    api_articles, error_message = _fetch_georgia_tech_football_news()
+    api_articles, error_message = await fetch_football_news(team)
     
     # Add flag to API articles
     for article in api_articles:
@@ -135,11 +142,13 @@ def create_news(request):
     
     return render(request, 'news/create.html', {'template_data': template_data})
 
+@cache_page_for_anonymous('news.article.{article_id}')
+@rate_limit('comment')
 def news_detail(request, article_id):
     template_data = {
         'title': 'News Article'
     }
-    article = get_object_or_404(NewsArticle, id=article_id)
+    article = get_cached_or_404(NewsArticle, article_id)
     template_data['article'] = article
     
     # Get all comments for this article
@@ -148,12 +157,13 @@ def news_detail(request, article_id):
     
     # Handle comment submission
     if request.method == 'POST' and request.user.is_authenticated:
-        form = CommentForm(request.POST)
+        form = CommentForm(request.POST, author=request.user)
         if form.is_valid():
             comment = form.save(commit=False)
             comment.article = article
             comment.author = request.user
             comment.save()
+            bump_pages(f'news.article.{article_id}')
             return redirect('news.detail', article_id=article_id)
     else:
         form = CommentForm()
@@ -175,3 +185,9 @@ def delete_news(request, article_id):
     
     # If GET request, show confirmation page or redirect
     return redirect('news.detail', article_id=article_id)
+
+@staff_member_required
+@read_from_replica
+def export_comments(request):
+    """Article comments as CSV (?start=, ?end=, ?season=)"""
+    return csv_response(request, exports.comments)
@@ -1,19 +1,33 @@
 from django.contrib import admin
-from .models import Game, BetComment, SavedBet
 
-# Register your models here.
-admin.site.register(Game)
+from core.admin_tools import AutocompleteFilter, ModerationAdmin
+
+from .models import Game, BetComment, SavedBet, ClosingLine, TeamSeasonSummary, Notification
+
+@admin.register(Game)
+class GameAdmin(ModerationAdmin):
+    list_display = ['__str__', 'game_time', 'home_team_spread', 'total_over', 'bookmaker_name', 'last_updated']
+    list_filter = ['game_time', 'bookmaker_name']
+    # Also what the comment filter's search box looks games up by
+    search_fields = ['home_team', 'away_team', '=api_game_id']
+    ordering = ['-game_time']
 
 @admin.register(BetComment)
-class BetCommentAdmin(admin.ModelAdmin):
+class BetCommentAdmin(ModerationAdmin):
     """Admin interface for managing bet comments - allows admins to remove inappropriate comments"""
     list_display = ['content_preview', 'author', 'game', 'created_at']
     list_display_links = ['content_preview']
-    list_filter = ['created_at', 'game']
-    search_fields = ['content', 'author__username', 'game__home_team', 'game__away_team']
-    # Note: delete_selected action is available by default in Django admin
+    list_filter = ['created_at', ('game', AutocompleteFilter), ('author', AutocompleteFilter)]
+    # Content is searched through the full-text index (see core/fulltext.py), not
+    # icontains; the '=' fields match the whole search term
+    search_fields = ['content', '=author__username', '=game__home_team', '=game__away_team']
+    fulltext_field = 'content'
+    search_help_text = 'Words in the comment, or an exact author username or team name'
+    page_cache_groups = ['odds.game.{game_id}']
+    raw_id_fields = ['game', 'author']
     # Admins can delete individual comments via the delete button on the detail page
-    # Admins can bulk delete comments by selecting them and using the "Delete selected" action
+    # Admins can bulk delete comments by selecting them and using the "Delete selected" action,
+    # which deletes in chunks so it also works with every comment selected
     
     def content_preview(self, obj):
         """Show a preview of the comment content (first 50 characters)"""
@@ -23,4 +37,21 @@ class BetCommentAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Optimize queryset with select_related for better performance"""
         qs = super().get_queryset(request)
-        return qs.select_related('author', 'game')
\ No newline at end of file
+        return qs.select_related('author', 'game')
+
+@admin.register(ClosingLine)
+class ClosingLineAdmin(admin.ModelAdmin):
+    list_display = ['game', 'home_team_spread', 'total', 'ats_result', 'total_result', 'spread_clv', 'graded_at']
+    list_filter = ['ats_result', 'total_result']
+    raw_id_fields = ['game', 'schedule_game']
+
+@admin.register(TeamSeasonSummary)
+class TeamSeasonSummaryAdmin(admin.ModelAdmin):
+    list_display = ['team', 'season', 'games', 'ats_wins', 'ats_losses', 'ats_pushes', 'overs', 'unders']
+    list_filter = ['season']
+    search_fields = ['team']
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['user', 'message', 'created_at', 'read_at', 'emailed_at']
+    raw_id_fields = ['user', 'rule', 'game']
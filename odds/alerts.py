@@ -0,0 +1,145 @@
+"""
+Line-movement alerts on saved bets.
+
+After an ingest, the evaluate_alerts task (odds/tasks.py) runs
+evaluate_alerts() on only the games whose line changed. It reads every rule
+on those games in one query, with no per-user loop, and evaluates them all at
+once with numpy. A marquee game saved by thousands of users costs the same
+three or four queries as a game saved by one. Triggered rules become
+Notifications, de-duplicated per rule and line update.
+
+Notifications show up in the user's inbox straight away. Emails go out
+separately, a few minutes later: send_alert_digests() sends each user one
+digest of everything that has queued since their last one.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.core.mail import get_connection, EmailMessage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AlertRule, Game, Notification
+
+WRITE_BATCH_SIZE = 1000
+DIGEST_BATCH_SIZE = 500
+
+_KINDS = [AlertRule.SPREAD_MOVE, AlertRule.MONEYLINE_CROSS]
+_SIDES = ['home', 'away']
+_LINE_FIELDS = {
+    (AlertRule.SPREAD_MOVE, 'home'): 'home_team_spread',
+    (AlertRule.SPREAD_MOVE, 'away'): 'away_team_spread',
+    (AlertRule.MONEYLINE_CROSS, 'home'): 'home_team_moneyline',
+    (AlertRule.MONEYLINE_CROSS, 'away'): 'away_team_moneyline',
+}
+
+
+def _line(value):
+    return np.nan if value is None else float(value)
+
+
+def _describe(game, kind, side, previous, current):
+    team = game.home_team if side == 'home' else game.away_team
+    if kind == AlertRule.SPREAD_MOVE:
+        return f"{team} spread moved from {previous:+g} to {current:+g} ({game})"
+    return f"{team} moneyline crossed from {previous:+g} to {current:+g} ({game})"
+
+
+def evaluate_alerts(game_ids):
+    """
+    Evaluate every alert rule on these games against their current lines.
+    Returns the number of rules that triggered.
+    """
+    games = Game.objects.in_bulk(list(game_ids))
+    if not games:
+        return 0
+
+    rules = list(
+        AlertRule.objects.filter(saved_bet__game_id__in=list(games))
+        .values_list('id', 'saved_bet__user_id', 'saved_bet__game_id', 'kind', 'side', 'threshold', 'reference_value')
+    )
+    if not rules:
+        return 0
+    rule_ids, user_ids, rule_game_ids, kinds, sides, thresholds, references = zip(*rules)
+
+    # Current line for each rule, looked up once per (game, kind, side) rather than per rule
+    current_lines = {
+        (game_id, kind, side): _line(getattr(game, _LINE_FIELDS[kind, side]))
+        for game_id, game in games.items() for kind in _KINDS for side in _SIDES
+    }
+    current = np.array([current_lines[key] for key in zip(rule_game_ids, kinds, sides)])
+    reference = np.array([_line(value) for value in references])
+    threshold = np.array(thresholds, dtype=float)
+    is_spread = np.array(kinds) == AlertRule.SPREAD_MOVE
+
+    has_line = ~np.isnan(current)
+    # Rules made before the game had a line start measuring from its first one
+    unset = has_line & np.isnan(reference)
+    with np.errstate(invalid='ignore'):
+        moved = np.abs(current - reference) >= threshold
+        crossed = (reference < threshold) != (current < threshold)
+    triggered = has_line & ~unset & np.where(is_spread, moved, crossed)
+
+    notifications = []
+    updated_rules = []
+    for index in np.flatnonzero(triggered | unset):
+        rule = AlertRule(id=rule_ids[index], reference_value=float(current[index]))
+        updated_rules.append(rule)
+        if not triggered[index]:
+            continue
+        game = games[rule_game_ids[index]]
+        notifications.append(Notification(
+            user_id=user_ids[index],
+            rule_id=rule_ids[index],
+            game=game,
+            message=_describe(game, kinds[index], sides[index], reference[index], current[index]),
+            # The same line update can't alert the same rule twice (e.g. if a run is retried)
+            dedupe_key=f"{rule_ids[index]}:{game.last_updated.isoformat()}",
+        ))
+
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications, batch_size=WRITE_BATCH_SIZE, ignore_conflicts=True)
+        AlertRule.objects.bulk_update(updated_rules, ['reference_value'], batch_size=WRITE_BATCH_SIZE)
+    return len(notifications)
+
+
+def send_alert_digests(now=None):
+    """
+    Email every user with queued notifications one digest over a single SMTP
+    connection. Returns (digests sent, notifications included).
+    """
+    now = now or timezone.now()
+    queued = (
+        Notification.objects.filter(emailed_at__isnull=True)
+        .order_by('user_id', 'created_at')
+        .values_list('id', 'user_id', 'user__email', 'message')
+    )
+    by_user = defaultdict(list)
+    emails = {}
+    for notification_id, user_id, email, message in queued.iterator(chunk_size=DIGEST_BATCH_SIZE):
+        by_user[user_id].append((notification_id, message))
+        emails[user_id] = email
+
+    digests = []
+    for user_id, items in by_user.items():
+        if not emails[user_id]:
+            continue  # Inbox only
+        lines = "\n".join(f"- {message}" for _, message in items)
+        digests.append(EmailMessage(
+            subject=f"GTSportsOdds: {len(items)} line alert{'s' if len(items) != 1 else ''}",
+            body=f"Lines moved on games you saved:\n\n{lines}\n",
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[emails[user_id]],
+        ))
+
+    if digests:
+        with get_connection() as connection:
+            connection.send_messages(digests)
+
+    # Users without an email address are marked too, so they aren't reconsidered every run
+    ids = [notification_id for items in by_user.values() for notification_id, _ in items]
+    for start in range(0, len(ids), DIGEST_BATCH_SIZE):
+        Notification.objects.filter(id__in=ids[start:start + DIGEST_BATCH_SIZE]).update(emailed_at=now)
+    return len(digests), len(ids)
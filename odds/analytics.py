@@ -0,0 +1,187 @@
+"""
+Closing-line and against-the-spread analytics.
+
+fetch_odds records a LineSnapshot whenever a game's line moves before kickoff.
+Once a game kicks off its last snapshot becomes its ClosingLine, and once
+schedule.Game has the final score the closing line is graded (ATS, over/under,
+CLV) and folded into TeamSeasonSummary with a single incremental update per
+team, so trend pages never have to aggregate raw rows.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from core.teams import is_same_team
+from schedule.models import Game as ScheduleGame
+
+from .models import LINE_FIELDS, ClosingLine, Game, LineSnapshot, TeamSeasonSummary
+
+
+def record_line_snapshots(games, captured_at=None):
+    """Store each game's current line if it changed since its last snapshot"""
+    captured_at = captured_at or timezone.now()
+    # Live lines after kickoff must not replace the closing line
+    games = [game for game in games if captured_at < game.game_time]
+    if not games:
+        return []
+
+    # Every game's latest snapshot in one query
+    latest_pk = (
+        LineSnapshot.objects.filter(game=OuterRef('game'))
+        .order_by('-captured_at')
+        .values('pk')[:1]
+    )
+    latest = {
+        row.pop('game_id'): row
+        for row in LineSnapshot.objects.filter(
+            game__in=games, pk=Subquery(latest_pk)
+        ).values('game_id', *LINE_FIELDS)
+    }
+
+    snapshots = []
+    for game in games:
+        current = {field: getattr(game, field) for field in LINE_FIELDS}
+        if latest.get(game.pk) != current:
+            snapshots.append(LineSnapshot(game=game, captured_at=captured_at, **current))
+    return LineSnapshot.objects.bulk_create(snapshots)
+
+
+def close_lines(now=None):
+    """
+    Create a ClosingLine for every game that has kicked off and doesn't have
+    one yet. Games with no line from before kickoff can never close and are
+    left out by the query, rather than loaded and skipped on every run.
+    """
+    now = now or timezone.now()
+    before_kickoff = LineSnapshot.objects.filter(game=OuterRef('pk'), captured_at__lt=OuterRef('game_time'))
+    # Each game's first and last pre-kickoff snapshot in the same query
+    games = list(
+        Game.objects.filter(game_time__lte=now, closing_line__isnull=True)
+        .annotate(
+            closing_pk=Subquery(before_kickoff.order_by('-captured_at').values('pk')[:1]),
+            opening_pk=Subquery(before_kickoff.order_by('captured_at').values('pk')[:1]),
+        )
+        .filter(closing_pk__isnull=False)
+        .values('pk', 'closing_pk', 'opening_pk')
+    )
+    if not games:
+        return 0
+    snapshots = LineSnapshot.objects.in_bulk(
+        [game['closing_pk'] for game in games] + [game['opening_pk'] for game in games]
+    )
+
+    closing_lines = []
+    for game in games:
+        closing, opening = snapshots[game['closing_pk']], snapshots[game['opening_pk']]
+        closing_lines.append(ClosingLine(
+            game_id=game['pk'],
+            captured_at=closing.captured_at,
+            home_team_moneyline=closing.home_team_moneyline,
+            away_team_moneyline=closing.away_team_moneyline,
+            home_team_spread=closing.home_team_spread,
+            total=closing.total_over,
+            opening_home_team_spread=opening.home_team_spread,
+            opening_total=opening.total_over,
+        ))
+    return len(ClosingLine.objects.bulk_create(closing_lines))
+
+
+def _find_schedule_game(odds_game):
+    """The completed schedule.Game for this odds game, if we have its score"""
+    candidates = ScheduleGame.objects.filter(
+        completed=True,
+        home_score__isnull=False,
+        away_score__isnull=False,
+        game_date__date__range=(
+            (odds_game.game_time - timedelta(days=1)).date(),
+            (odds_game.game_time + timedelta(days=1)).date(),
+        ),
+    )
+    for candidate in candidates:
+        if candidate.matches_odds_game(odds_game):
+            return candidate
+    return None
+
+
+def _grade(closing_line, schedule_game):
+    """Fill in scores, ATS/total results and CLV on an (unsaved) ClosingLine"""
+    game = closing_line.game
+    # The schedule may list the teams the other way round at neutral sites
+    if is_same_team(game.home_team, schedule_game.home_team):
+        home_score, away_score = schedule_game.home_score, schedule_game.away_score
+    else:
+        home_score, away_score = schedule_game.away_score, schedule_game.home_score
+
+    closing_line.schedule_game = schedule_game
+    closing_line.home_score = home_score
+    closing_line.away_score = away_score
+
+    if closing_line.home_team_spread is not None:
+        cover_margin = home_score - away_score + closing_line.home_team_spread
+        closing_line.ats_result = 'home' if cover_margin > 0 else 'away' if cover_margin < 0 else 'push'
+        if closing_line.opening_home_team_spread is not None:
+            closing_line.spread_clv = closing_line.opening_home_team_spread - closing_line.home_team_spread
+
+    if closing_line.total is not None:
+        points = home_score + away_score
+        closing_line.total_result = (
+            'over' if points > closing_line.total else 'under' if points < closing_line.total else 'push'
+        )
+        if closing_line.opening_total is not None:
+            closing_line.total_clv = closing_line.total - closing_line.opening_total
+
+    closing_line.graded_at = timezone.now()
+
+
+def _apply_to_summaries(closing_line, season):
+    """Add one graded game to both teams' season summaries"""
+    game = closing_line.game
+    for team, side in ((game.home_team, 'home'), (game.away_team, 'away')):
+        summary, _ = TeamSeasonSummary.objects.get_or_create(team=team, season=season)
+        updates = {'games': F('games') + 1}
+
+        if closing_line.ats_result == 'push':
+            updates['ats_pushes'] = F('ats_pushes') + 1
+        elif closing_line.ats_result == side:
+            updates['ats_wins'] = F('ats_wins') + 1
+        elif closing_line.ats_result:
+            updates['ats_losses'] = F('ats_losses') + 1
+
+        if closing_line.total_result == 'over':
+            updates['overs'] = F('overs') + 1
+        elif closing_line.total_result == 'under':
+            updates['unders'] = F('unders') + 1
+        elif closing_line.total_result == 'push':
+            updates['total_pushes'] = F('total_pushes') + 1
+
+        if closing_line.spread_clv is not None:
+            # spread_clv is from the home side; the away side gains the opposite
+            clv = closing_line.spread_clv if side == 'home' else -closing_line.spread_clv
+            updates['spread_clv_total'] = F('spread_clv_total') + clv
+
+        TeamSeasonSummary.objects.filter(pk=summary.pk).update(**updates)
+
+
+def grade_closing_lines():
+    """Grade every closing line whose final score is now available"""
+    pending = ClosingLine.objects.filter(graded_at__isnull=True).select_related('game')
+
+    graded = 0
+    for closing_line in pending:
+        schedule_game = _find_schedule_game(closing_line.game)
+        if schedule_game is None:
+            continue
+        with transaction.atomic():
+            _grade(closing_line, schedule_game)
+            closing_line.save()
+            _apply_to_summaries(closing_line, schedule_game.season)
+        graded += 1
+    return graded
+
+
+def run_pipeline(now=None):
+    """Close lines for games that have kicked off, then grade whatever has a score"""
+    return close_lines(now), grade_closing_lines()
@@ -0,0 +1,212 @@
+"""
+The current odds board: every odds.Game as one numpy structured array on disk.
+
+The board only changes when an ingest runs, so instead of every page querying
+odds.Game, the ingest writes the board with publish_board() (to a temp file,
+then an atomic rename) and each worker process memory-maps it. Reads check the
+file's identity with one stat() and remap when a newer board has been
+published, so new lines are picked up without restarting.
+
+Single edits (the admin) republish through publish_on_commit(), once per
+transaction however many games it touched. Bulk deletes wrap themselves in
+publishing_suspended() and publish once when they're done.
+
+Rows are sorted by game_time, so "upcoming" is a binary search; lookups by
+id/api_game_id, and each team's games, go through indexes built once per
+version.
+"""
+
+import contextlib
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Game
+
+# Nullable integer/float line fields are stored as float64 with NaN for None
+_LINE_COLUMNS = [
+    'home_team_moneyline', 'away_team_moneyline',
+    'home_team_spread', 'away_team_spread',
+    'home_team_spread_price', 'away_team_spread_price',
+    'total_over', 'total_over_price',
+    'total_under', 'total_under_price',
+]
+_TEXT_COLUMNS = ['api_game_id', 'home_team', 'away_team', 'bookmaker_name']
+_INT_FIELDS = {field.name for field in Game._meta.concrete_fields if field.get_internal_type() == 'IntegerField'}
+# Model.from_db() takes values in concrete field order
+_FIELD_NAMES = [field.attname for field in Game._meta.concrete_fields]
+
+_lock = threading.Lock()
+_current = None  # (file identity, Board) for this process
+# Per thread: how many publishing_suspended() blocks it's in
+_suspended = threading.local()
+
+
+def _path():
+    return Path(getattr(settings, 'ODDS_BOARD_PATH', settings.BASE_DIR / '.board' / 'odds.npy'))
+
+
+def _timestamp(value):
+    return value.timestamp() if value else np.nan
+
+
+def _datetime(value):
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+def publish_board():
+    """Write the board from odds.Game and atomically replace the published one"""
+    rows = list(Game.objects.order_by('game_time', 'id').values('id', 'game_time', 'last_updated', *_TEXT_COLUMNS, *_LINE_COLUMNS))
+    text_width = {
+        column: max([len(row[column]) for row in rows] + [1]) for column in _TEXT_COLUMNS
+    }
+    dtype = (
+        [('id', 'i8'), ('game_time', 'f8'), ('last_updated', 'f8')]
+        + [(column, f'U{text_width[column]}') for column in _TEXT_COLUMNS]
+        + [(column, 'f8') for column in _LINE_COLUMNS]
+    )
+    board = np.array(
+        [
+            (
+                row['id'], _timestamp(row['game_time']), _timestamp(row['last_updated']),
+                *(row[column] for column in _TEXT_COLUMNS),
+                *(np.nan if row[column] is None else row[column] for column in _LINE_COLUMNS),
+            )
+            for row in rows
+        ],
+        dtype=dtype,
+    )
+
+    path = _path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Same directory as the target so the rename is atomic; readers see the old
+    # board or the new one, never a partial file
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.npy.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            np.save(temp_file, board)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return len(board)
+
+
+def _publish_after_commit():
+    publish_board()
+
+
+def publish_on_commit():
+    """
+    Republish the board once the current transaction commits (right away
+    outside one). However many games a transaction saves, it's published once.
+    """
+    if getattr(_suspended, 'depth', 0):
+        return
+    # Already queued for this transaction; a rollback drops it along with the writes
+    if any(func is _publish_after_commit for _, func, _ in connection.run_on_commit):
+        return
+    transaction.on_commit(_publish_after_commit)
+
+
+@contextlib.contextmanager
+def publishing_suspended():
+    """Skip publish_on_commit() inside this block (bulk deletes publish once afterwards)"""
+    _suspended.depth = getattr(_suspended, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _suspended.depth -= 1
+
+
+class Board:
+    def __init__(self, rows):
+        self.rows = rows
+        self._games = None
+        self._by_id = {int(game_id): index for index, game_id in enumerate(rows['id'])}
+        self._by_api_id = {str(api_id): index for index, api_id in enumerate(rows['api_game_id'])}
+        self._by_team = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def games(self):
+        """
+        Every game on the board as odds.Game instances (as if loaded from the
+        database, without a query), built once per board version. Callers
+        share them, so treat them as read-only.
+        """
+        if self._games is None:
+            columns = self.rows.dtype.names
+            games = []
+            # tolist() converts the whole array to Python values in one go, far
+            # faster than indexing numpy records field by field
+            for record in self.rows.tolist():
+                values = dict(zip(columns, record))
+                values['game_time'] = _datetime(values['game_time'])
+                values['last_updated'] = _datetime(values['last_updated'])
+                for column in _LINE_COLUMNS:
+                    value = values[column]
+                    if value != value:  # NaN
+                        values[column] = None
+                    elif column in _INT_FIELDS:
+                        values[column] = int(value)
+                games.append(Game.from_db('default', _FIELD_NAMES, [values[name] for name in _FIELD_NAMES]))
+            self._games = games
+        return self._games
+
+    def _team_index(self):
+        """{team name: row indexes of its games}, in game_time order like the rows"""
+        if self._by_team is None:
+            by_team = {}
+            for index, teams in enumerate(zip(self.rows['home_team'].tolist(), self.rows['away_team'].tolist())):
+                for team in teams:
+                    by_team.setdefault(team, []).append(index)
+            self._by_team = {team: np.asarray(indexes, dtype=np.intp) for team, indexes in by_team.items()}
+        return self._by_team
+
+    def upcoming(self, now, team=None):
+        """Games kicking off at or after `now`, soonest first; only `team`'s (its odds name) if given"""
+        if team is None:
+            start = int(np.searchsorted(self.rows['game_time'], now.timestamp(), side='left'))
+            return self.games()[start:]
+        indexes = self._team_index().get(team)
+        if indexes is None:
+            return []
+        start = int(np.searchsorted(self.rows['game_time'][indexes], now.timestamp(), side='left'))
+        games = self.games()
+        return [games[index] for index in indexes[start:].tolist()]
+
+    def get(self, id=None, api_game_id=None):
+        """The game with this id or api_game_id, or None"""
+        index = self._by_id.get(id) if id is not None else self._by_api_id.get(api_game_id)
+        return None if index is None else self.games()[index]
+
+
+def current_board():
+    """
+    This process's mapping of the published board, remapped if a newer one
+    has been published since. Publishes one first if there's none yet.
+    """
+    global _current
+    path = _path()
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        publish_board()
+        stat = os.stat(path)
+    identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    current = _current
+    if current is not None and current[0] == identity:
+        return current[1]
+    with _lock:
+        if _current is None or _current[0] != identity:
+            _current = (identity, Board(np.load(path, mmap_mode='r')))
+        return _current[1]
@@ -0,0 +1,64 @@
+from core.export import Export, register
+
+from .models import LINE_FIELDS, BetComment, ClosingLine, Game, LineSnapshot
+
+odds = register(Export(
+    name='odds',
+    queryset=lambda: Game.objects.all(),
+    columns=[
+        ('id', 'id'),
+        ('api_game_id', 'api_game_id'),
+        ('home_team', 'home_team'),
+        ('away_team', 'away_team'),
+        ('game_time', 'game_time'),
+        ('bookmaker', 'bookmaker_name'),
+        ('last_updated', 'last_updated'),
+        *((field, field) for field in LINE_FIELDS),
+    ],
+    date_field='game_time',
+))
+
+line_history = register(Export(
+    name='line_history',
+    queryset=lambda: LineSnapshot.objects.all(),
+    columns=[
+        ('game_id', 'game_id'),
+        ('home_team', 'game__home_team'),
+        ('away_team', 'game__away_team'),
+        ('game_time', 'game__game_time'),
+        ('captured_at', 'captured_at'),
+        *((field, field) for field in LINE_FIELDS),
+    ],
+    date_field='captured_at',
+))
+
+closing_lines = register(Export(
+    name='closing_lines',
+    queryset=lambda: ClosingLine.objects.all(),
+    columns=[
+        ('game_id', 'game_id'),
+        ('schedule_game_id', 'schedule_game_id'),
+        ('home_team', 'game__home_team'),
+        ('away_team', 'game__away_team'),
+        ('game_time', 'game__game_time'),
+        *((field, field) for field in (
+            'captured_at', 'home_team_moneyline', 'away_team_moneyline', 'home_team_spread', 'total',
+            'opening_home_team_spread', 'opening_total', 'home_score', 'away_score', 'ats_result',
+            'total_result', 'spread_clv', 'total_clv', 'graded_at',
+        )),
+    ],
+    date_field='game__game_time',
+))
+
+bet_comments = register(Export(
+    name='bet_comments',
+    queryset=lambda: BetComment.objects.all(),
+    columns=[
+        ('id', 'id'),
+        ('game_id', 'game_id'),
+        ('author', 'author__username'),
+        ('created_at', 'created_at'),
+        ('content', 'content'),
+    ],
+    date_field='created_at',
+))
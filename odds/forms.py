@@ -1,7 +1,10 @@
 from django import forms
-from .models import BetComment
 
-class BetCommentForm(forms.ModelForm):
+from core.content_filter import ContentFilterMixin
+
+from .models import AlertRule, BetComment
+
+class BetCommentForm(ContentFilterMixin, forms.ModelForm):
     class Meta:
         model = BetComment
         fields = ['content']
@@ -17,3 +20,29 @@ class BetCommentForm(forms.ModelForm):
             'content': ''
         }
 
+
+
+class AlertRuleForm(forms.ModelForm):
+    class Meta:
+        model = AlertRule
+        fields = ['kind', 'side', 'threshold']
+        widgets = {
+            'kind': forms.Select(attrs={'class': 'form-select form-select-sm'}),
+            'side': forms.Select(attrs={'class': 'form-select form-select-sm'}),
+            'threshold': forms.NumberInput(attrs={
+                'class': 'form-control form-control-sm',
+                'step': '0.5',
+                'placeholder': 'e.g. 1 or -150',
+            }),
+        }
+        labels = {
+            'kind': '',
+            'side': '',
+            'threshold': '',
+        }
+
+    def clean_threshold(self):
+        threshold = self.cleaned_data['threshold']
+        if self.cleaned_data.get('kind') == AlertRule.SPREAD_MOVE and threshold <= 0:
+            raise forms.ValidationError('A spread move has to be more than 0 points.')
+        return threshold
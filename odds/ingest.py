@@ -0,0 +1,139 @@
+"""
+Writing odds into odds.Game, for both ways they arrive.
+
+upsert_games() creates/updates a batch of games in one transaction; fetch_odds
+(polling) calls it per batch.
+
+OddsWriteBuffer is for pushed updates (the odds webhook). Bursts of line moves
+are queued in memory and coalesced per game and market: if a spread moves five
+times within the flush window only the newest spread is kept. A timer then
+flushes everything pending with a single upsert_games() call (then queues
+line-alert evaluation and republishes the odds board), so each game is
+written once per window however many messages mention it.
+"""
+
+import threading
+
+import msgspec
+from django.db import connections, transaction
+
+from core.page_cache import bump_pages
+from core.payloads import aware, odds_event_fields
+from core.query_cache import bump
+
+from .analytics import record_line_snapshots
+from .board import publish_board
+from .models import Game
+from .tasks import evaluate_alerts
+
+# Shared by both ways in: the sport we follow, and the one bookmaker whose lines we store.
+# Other popular keys: 'fanduel', 'betmgm', 'caesars'
+SPORT_KEY = 'americanfootball_ncaaf'
+BOOKMAKER_KEY = 'draftkings'
+# Name of the odds ingest in the run registry (core.ingest)
+INGEST_SOURCE = f'odds:{SPORT_KEY}'
+
+
+def upsert_games(batch):
+    """
+    Create or update a batch of games ({api_game_id: fields}) and snapshot
+    their lines, in one transaction and a fixed number of queries however
+    big the batch is. Returns (created, updated, changed): the games created
+    and updated, and the ids of games whose line actually moved.
+    """
+    with transaction.atomic():
+        existing = Game.objects.in_bulk(list(batch), field_name='api_game_id')
+        created, updated = [], []
+        for api_id, fields in batch.items():
+            game = existing.get(api_id)
+            if game is None:
+                created.append(Game(api_game_id=api_id, **fields))
+                continue
+            for field, value in fields.items():
+                setattr(game, field, value)
+            updated.append(game)
+
+        Game.objects.bulk_create(created)
+        if updated:
+            update_fields = set().union(*(batch[game.api_game_id] for game in updated))
+            Game.objects.bulk_update(updated, list(update_fields))
+        # Keep the line history that closing lines are taken from
+        snapshots = record_line_snapshots(created + updated)
+        # Bulk writes send no signals; invalidate cached games here, new ones
+        # too, or a get_cached() miss from before they existed would stick
+        bump(Game, *created, *updated)
+    return created, updated, {snapshot.game_id for snapshot in snapshots}
+
+
+class OddsWriteBuffer:
+    def __init__(self, bookmaker_key, teams, window_seconds):
+        self.bookmaker_key = bookmaker_key
+        # Odds API names of the teams whose games are kept
+        self.teams = set(teams)
+        self.window_seconds = window_seconds
+        # api_game_id -> (fields, {market key: bookmaker last_update})
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.stats = {'events': 0, 'ignored': 0, 'stale': 0, 'flushes': 0, 'rows_written': 0, 'errors': 0}
+
+    def add(self, events):
+        """Queue OddsEvents, keeping only the newest update per game and market"""
+        with self._lock:
+            for event in events:
+                self.stats['events'] += 1
+                bookmaker = next((b for b in event.bookmakers if b.key == self.bookmaker_key), None)
+                if bookmaker is None or self.teams.isdisjoint((event.home_team, event.away_team)):
+                    self.stats['ignored'] += 1
+                    continue
+
+                fields, market_times = self._pending.setdefault(event.id, ({}, {}))
+                for market in bookmaker.markets:
+                    previous = market_times.get(market.key)
+                    if previous is not None and bookmaker.last_update < previous:
+                        # Arrived out of order; a newer line is already queued
+                        self.stats['stale'] += 1
+                        continue
+                    market_times[market.key] = bookmaker.last_update
+                    fields.update(odds_event_fields(event, msgspec.structs.replace(bookmaker, markets=[market])))
+                if fields:
+                    fields['last_updated'] = aware(max(market_times.values()))
+                else:
+                    del self._pending[event.id]
+
+            if self._pending and self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write everything pending in one transaction; returns the number of games written"""
+        # One flush at a time, so a slow write can't be overtaken by the next window's
+        with self._flush_lock:
+            with self._lock:
+                batch = {api_id: fields for api_id, (fields, _) in self._pending.items()}
+                self._pending = {}
+                self._timer = None
+            if not batch:
+                return 0
+            try:
+                with transaction.atomic():
+                    _, _, changed = upsert_games(batch)
+                    if changed:
+                        evaluate_alerts.enqueue(game_ids=sorted(changed))
+            except Exception:
+                self.stats['errors'] += 1
+                raise
+            self.stats['flushes'] += 1
+            self.stats['rows_written'] += len(batch)
+            publish_board()
+        bump_pages('odds', 'schedule')
+        return len(batch)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread's database connection would otherwise stay open
+            connections.close_all()
@@ -0,0 +1,127 @@
+# In odds/management/commands/benchmark_odds_ingest.py
+
+import argparse
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+
+from core.management.commands.benchmark_decoding import _odds_payload
+from core.teams import default_team
+from odds.management.commands import fetch_odds
+
+MODES = {
+    'json': "response.json() + dict filter (previous path, parse only)",
+    'buffered': "fetch_odds",
+    'stream': "fetch_odds --stream",
+}
+
+
+def _peak_rss_mb():
+    # VmHWM rather than ru_maxrss: ru_maxrss survives exec, so the child would
+    # report the peak of this (payload-generating) parent process
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _stub_server(path):
+    """Serves the payload file at any URL, read from disk a block at a time"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(os.path.getsize(path)))
+            self.end_headers()
+            with open(path, 'rb') as body:
+                shutil.copyfileobj(body, self.wfile)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Command(BaseCommand):
+    help = "Compares peak memory and wall time of buffered vs streaming odds ingest on a large synthetic payload"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--megabytes', type=int, default=50, help='Payload size (default: 50)')
+        parser.add_argument('--child', choices=list(MODES), help=argparse.SUPPRESS)
+        parser.add_argument('--url', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['child']:
+            return self.run_child(options['child'], options['url'])
+
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as payload_file:
+            team = default_team().odds_name
+            sample = _odds_payload(100, team=team)
+            events = int(options['megabytes'] * 1024 * 1024 / (len(sample) / 100))
+            payload_file.write(_odds_payload(events, team=team))
+            size = payload_file.tell()
+        server = _stub_server(payload_file.name)
+        url = f"http://127.0.0.1:{server.server_port}/odds"
+
+        self.stdout.write(f"{size / 1024 / 1024:.1f} MB payload, {events} events:")
+        try:
+            for mode, label in MODES.items():
+                # A fresh process per mode, since peak RSS only ever goes up
+                output = subprocess.run(
+                    [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark_odds_ingest',
+                     '--child', mode, '--url', url],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                self.stdout.write(
+                    f"  {label:<55} {result['seconds']:6.2f}s  "
+                    f"peak RSS {result['peak_mb']:7.1f} MB (+{result['peak_mb'] - result['baseline_mb']:.1f} MB)"
+                )
+        finally:
+            server.shutdown()
+            os.unlink(payload_file.name)
+
+    def run_child(self, mode, url):
+        # A throwaway in-memory database (and odds board), so the benchmark never touches real games
+        connection.creation.create_test_db(verbosity=0)
+        fetch_odds.ODDS_API_URL = url
+        baseline = _peak_rss_mb()
+
+        started = time.perf_counter()
+        if mode == 'json':
+            data = requests.get(url, timeout=60).json()
+            matches = [
+                event for event in data
+                if default_team().odds_name in (event['home_team'], event['away_team'])
+            ]
+            assert matches
+        else:
+            board_dir = tempfile.mkdtemp()
+            with override_settings(ODDS_API_KEY='benchmark', ODDS_BOARD_PATH=os.path.join(board_dir, 'odds.npy')):
+                call_command('fetch_odds', stream=mode == 'stream', stdout=io.StringIO())
+        seconds = time.perf_counter() - started
+
+        self.stdout.write(json.dumps({'seconds': seconds, 'baseline_mb': baseline, 'peak_mb': _peak_rss_mb()}))
@@ -0,0 +1,80 @@
+# In odds/management/commands/compact_odds.py
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.maintenance import compact, storage_size
+from core.page_cache import bump_pages
+from odds.board import publish_board
+from odds.models import BetComment, ClosingLine, Game, LineSnapshot, Notification, SavedBet
+from odds.retention import compact_odds
+
+# Tables the deletes touch, for VACUUM/ANALYZE and the size report
+TABLES = [Game, LineSnapshot, ClosingLine, BetComment, SavedBet, Notification]
+
+
+def _megabytes(size):
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+class Command(BaseCommand):
+    help = "Archives and prunes old games, downsamples old line history, then VACUUMs and ANALYZEs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days', type=int, default=settings.ODDS_RETENTION_DAYS,
+            help=f'Delete games that kicked off more than this many days ago; 0 keeps them '
+                 f'(default: {settings.ODDS_RETENTION_DAYS})',
+        )
+        parser.add_argument(
+            '--hourly-after-days', type=int, default=settings.LINE_HOURLY_AFTER_DAYS,
+            help=f'Keep one snapshot per hour once older than this (default: {settings.LINE_HOURLY_AFTER_DAYS})',
+        )
+        parser.add_argument(
+            '--daily-after-days', type=int, default=settings.LINE_DAILY_AFTER_DAYS,
+            help=f'Keep one snapshot per day once older than this (default: {settings.LINE_DAILY_AFTER_DAYS})',
+        )
+        parser.add_argument(
+            '--archive-dir', default=settings.ODDS_ARCHIVE_DIR,
+            help='Write pruned rows here as gzipped CSV first; "" to skip (default: ODDS_ARCHIVE_DIR)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+        parser.add_argument('--no-vacuum', action='store_true', help='Skip VACUUM/ANALYZE afterwards')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        size_before = storage_size(TABLES)
+        started = time.perf_counter()
+
+        result = compact_odds(
+            retention=timedelta(days=options['retention_days']) if options['retention_days'] else None,
+            hourly_after=timedelta(days=options['hourly_after_days']),
+            daily_after=timedelta(days=options['daily_after_days']),
+            archive_dir=options['archive_dir'],
+            dry_run=dry_run,
+        )
+        verb = "Would delete" if dry_run else "Deleted"
+        for path in result['archives']:
+            self.stdout.write(f"Archived to {path}")
+        self.stdout.write(f"{verb} {result['games']} game(s) older than {options['retention_days']} days")
+        self.stdout.write(f"{verb} {result['snapshots']} line snapshot(s) by downsampling")
+        if dry_run:
+            return
+
+        if result['games']:
+            # Pruning doesn't publish per batch; the pruned games come off the board here
+            publish_board()
+            bump_pages('odds')
+        if not options['no_vacuum'] and (result['games'] or result['snapshots']):
+            compact(TABLES)
+        self.stdout.write(f"Took {time.perf_counter() - started:.1f}s")
+
+        size_after = storage_size(TABLES)
+        if size_before is not None:
+            self.stdout.write(self.style.SUCCESS(
+                f"Storage: {_megabytes(size_before)} -> {_megabytes(size_after)} "
+                f"(reclaimed {_megabytes(size_before - size_after)})"
+            ))
@@ -1,163 +1,182 @@
 # In odds/management/commands/fetch_odds.py
 
 import requests
-import datetime
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-from odds.models import Game
+from core.ingest import IngestLocked, ingest_run
+from core.page_cache import bump_pages
+from core.payloads import PayloadError, decode_odds_events, iter_odds_events, odds_event_fields
+from core.teams import followed_teams
+from core.upstream import UpstreamUnavailable, call
+from odds.analytics import run_pipeline
+from odds.board import publish_board
+from odds.ingest import BOOKMAKER_KEY, INGEST_SOURCE, SPORT_KEY, upsert_games
+from odds.tasks import evaluate_alerts
 
 # --- CONFIGURATION ---
-# We'll target NCAAF (College Football)
-SPORT_KEY = 'americanfootball_ncaaf'
-# We'll only get odds from DraftKings. You can change this to another.
-# Other popular keys: 'fanduel', 'betmgm', 'caesars'
-BOOKMAKER_KEY = 'draftkings'
+# NCAAF (College Football) from one bookmaker; SPORT_KEY and BOOKMAKER_KEY live in odds/ingest.py
+ODDS_API_URL = f'https://api.the-odds-api.com/v4/sports/{SPORT_KEY}/odds'
 # We'll get US odds for moneyline (h2h), spreads, and totals (over/under)
 REGIONS = 'us'
 MARKETS = 'h2h,spreads,totals'
 ODDS_FORMAT = 'american'
-OUR_TEAM = 'Georgia Tech Yellow Jackets'
+# Per-attempt timeout, and the total time we'll spend on retries
+ODDS_API_TIMEOUT_SECONDS = 15
+ODDS_API_BUDGET_SECONDS = 60
+# Games upserted per transaction, and how much of the body --stream reads at a time
+BATCH_SIZE = 200
+STREAM_CHUNK_BYTES = 64 * 1024
 
 
 class Command(BaseCommand):
-    help = f"Fetches NCAAF odds for {OUR_TEAM} from The Odds API"
+    help = "Fetches the NCAAF slate from The Odds API once and stores every followed team's games"
 
-    def handle(self, *args, **kwargs):
-        self.stdout.write(f"Starting to fetch odds for {OUR_TEAM}...")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help='Parse events as the response arrives instead of loading the whole body first',
+        )
 
-        # 1. --- Make the API Request ---
+    def handle(self, *args, **options):
+        self.stdout.write("Starting to fetch odds...")
+
+        # Cron can start a run while the previous one is still going; only one may proceed
         try:
-            api_response = requests.get(
-                f'https://api.the-odds-api.com/v4/sports/{SPORT_KEY}/odds',
+            with ingest_run(INGEST_SOURCE, redact=[settings.ODDS_API_KEY]) as run:
+                self.ingest(run, options['stream'])
+        except IngestLocked as e:
+            self.stdout.write(self.style.WARNING(f"Skipping: {e}."))
+
+    def ingest(self, run, stream):
+        # 1. --- Make the API Request ---
+        def request_odds(timeout):
+            response = requests.get(
+                ODDS_API_URL,
                 params={
                     'api_key': settings.ODDS_API_KEY,
                     'regions': REGIONS,
                     'markets': MARKETS,
                     'oddsFormat': ODDS_FORMAT,
                     'bookmakers': BOOKMAKER_KEY,
-                }
+                },
+                timeout=timeout,
+                stream=stream,
             )
-            api_response.raise_for_status()  # Raises an error for bad responses (4xx or 5xx)
-            data = api_response.json()
-        
+            response.raise_for_status()  # Raises an error for bad responses (4xx or 5xx)
+            return response
+
+        try:
+            # Retries timeouts/5xx with backoff, but gives up after ODDS_API_BUDGET_SECONDS
+            api_response = call(
+                'odds',
+                request_odds,
+                timeout=ODDS_API_TIMEOUT_SECONDS,
+                budget=ODDS_API_BUDGET_SECONDS,
+                retry_on=requests.exceptions.RequestException,
+            )
+        except (requests.exceptions.RequestException, UpstreamUnavailable) as e:
+            raise CommandError(f"API request failed: {e}")
+
+        remaining = api_response.headers.get('x-requests-remaining')
+        if remaining is not None:
+            run.quota_remaining = int(float(remaining))
+
+        # 2. --- Process the API Data ---
+        # Matching games are upserted BATCH_SIZE at a time, so with --stream
+        # memory is bounded by one event and one batch however big the body is
+        # One request returns the whole slate; keep the games of the teams we follow
+        teams = {team.odds_name for team in followed_teams()}
+        batch = {}
+        changed = set()  # Games whose line moved, for alerts
+        rejected = []
+        try:
+            if stream:
+                events = iter_odds_events(api_response.iter_content(STREAM_CHUNK_BYTES), rejected)
+            else:
+                # Typed decode straight from bytes; malformed events are rejected individually
+                decoded = decode_odds_events(api_response.content)
+                events, rejected = decoded.records, decoded.rejected
+
+            for event in events:
+                run.events_seen += 1
+                # Check if one of our teams is in this game
+                if teams.isdisjoint((event.home_team, event.away_team)):
+                    continue  # Skip this game if no followed team plays in it
+
+                # Find our chosen bookmaker's odds
+                bookmaker = next((b for b in event.bookmakers if b.key == BOOKMAKER_KEY), None)
+
+                if not bookmaker:
+                    self.stdout.write(self.style.WARNING(
+                        f"Could not find odds from '{BOOKMAKER_KEY}' for game: {event.id}"
+                    ))
+                    continue
+
+                # 3. --- Extract and Organize the Odds Data ---
+                # Teams, kickoff, bookmaker and every market, read in one pass
+                batch[event.id] = odds_event_fields(event, bookmaker)
+                if len(batch) >= BATCH_SIZE:
+                    run.rows_written += self.save_batch(batch, run, changed)
+                    batch = {}
         except requests.exceptions.RequestException as e:
+            # With --stream the connection can still fail while the body is being read
             raise CommandError(f"API request failed: {e}")
+        except PayloadError as e:
+            raise CommandError(f"Unexpected response from The Odds API: {e}")
+        finally:
+            api_response.close()
+
+        if batch:
+            run.rows_written += self.save_batch(batch, run, changed)
+
+        for rejected_event in rejected:
+            self.stdout.write(self.style.WARNING(f"Skipped malformed event, {rejected_event}"))
+        if rejected:
+            run.errors.append(f"Skipped {len(rejected)} malformed event(s), first: {rejected[0]}")
 
-        if not data:
+        if not run.events_seen:
             self.stdout.write(self.style.WARNING(
                 "No game data returned from API. Check your API key and quota."
             ))
             return
 
-        # 2. --- Process the API Data ---
-        games_processed = 0
-        for game_data in data:
-            # Check if our team is in this game
-            if OUR_TEAM not in (game_data['home_team'], game_data['away_team']):
-                continue  # Skip this game if it's not GT
-
-            api_id = game_data['id']
-            home_team = game_data['home_team']
-            away_team = game_data['away_team']
-            
-            # Convert the ISO 8601 timestamp string into a Python datetime object
-            # We replace 'Z' with '+00:00' to make it compatible with fromisoformat
-            commence_time_str = game_data['commence_time'].replace('Z', '+00:00')
-            commence_time_obj = datetime.datetime.fromisoformat(commence_time_str)
-
-            # Find our chosen bookmaker's odds
-            bookmaker = self.find_bookmaker(game_data.get('bookmakers', []))
-            
-            if not bookmaker:
-                self.stdout.write(self.style.WARNING(
-                    f"Could not find odds from '{BOOKMAKER_KEY}' for game: {api_id}"
-                ))
-                continue
-
-            # 3. --- Extract and Organize the Odds Data ---
-            odds_defaults = {
-                'bookmaker_name': bookmaker.get('title', BOOKMAKER_KEY),
-                'last_updated': datetime.datetime.fromisoformat(
-                    bookmaker['last_update'].replace('Z', '+00:00')
-                ),
-                'home_team': home_team,
-                'away_team': away_team,
-            }
-            
-            # This is complex, but just extracts data from the 'markets' list
-            self.parse_market(bookmaker.get('markets', []), 'h2h', odds_defaults)
-            self.parse_market(bookmaker.get('markets', []), 'spreads', odds_defaults)
-            self.parse_market(bookmaker.get('markets', []), 'totals', odds_defaults)
-            
-            # 4. --- Save to Database ---
-            try:
-                game, created = Game.objects.update_or_create(
-                    api_game_id=api_id,  # This is the unique key we look for
-                    defaults={         # These are the fields to update or create
-                        'home_team': home_team,
-                        'away_team': away_team,
-                        'game_time': commence_time_obj,
-                        **odds_defaults  # Unpacks all the odds fields we just parsed
-                    }
-                )
-                
-                if created:
-                    self.stdout.write(self.style.SUCCESS(
-                        f"CREATED new game: {game}"
-                    ))
-                else:
-                    self.stdout.write(self.style.NOTICE(
-                        f"UPDATED existing game: {game}"
-                    ))
-                games_processed += 1
-                
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(
-                    f"Error saving game {api_id}: {e}"
-                ))
-
         self.stdout.write(self.style.SUCCESS(
-            f"\nDone. Processed {games_processed} game(s) for {OUR_TEAM}."
+            f"\nDone. Processed {run.rows_written} game(s) for {len(teams)} followed team(s)."
         ))
 
-    def find_bookmaker(self, bookmakers_list):
-        """Helper function to find our bookmaker in the list."""
-        for bookmaker in bookmakers_list:
-            if bookmaker['key'] == BOOKMAKER_KEY:
-                return bookmaker
-        return None
-    
-    def parse_market(self, markets_list, market_key, defaults):
+        # 5. --- Alert savers of games whose line moved (one task for the whole run) ---
+        if changed:
+            evaluate_alerts.enqueue(game_ids=sorted(changed))
+        self.stdout.write(f"Queued alert checks for {len(changed)} game(s) whose line moved.")
+
+        # 6. --- Close and grade lines for games that have kicked off ---
+        closed, graded = run_pipeline()
+        self.stdout.write(f"Closed {closed} line(s), graded {graded} game(s).")
+
+        # 7. --- Publish the new board and invalidate cached pages that show lines ---
+        publish_board()
+        # The schedule page's season outlook is priced off these lines too
+        bump_pages('odds', 'schedule')
+
+    def save_batch(self, batch, run, changed):
         """
-        Helper function to find a market (h2h, spreads, totals) and
-        put its data into the 'defaults' dictionary for saving.
+        4. --- Save to Database ---
+        Upsert a batch of games ({api_game_id: fields}) in one transaction
+        and report what changed.
         """
-        for market in markets_list:
-            if market['key'] == market_key:
-                outcomes = market.get('outcomes', [])
-                
-                if market_key == 'h2h':
-                    for outcome in outcomes:
-                        if outcome['name'] == defaults.get('home_team'):
-                            defaults['home_team_moneyline'] = outcome['price']
-                        elif outcome['name'] == defaults.get('away_team'):
-                            defaults['away_team_moneyline'] = outcome['price']
-                
-                elif market_key == 'spreads':
-                    for outcome in outcomes:
-                        if outcome['name'] == defaults.get('home_team'):
-                            defaults['home_team_spread'] = outcome['point']
-                            defaults['home_team_spread_price'] = outcome['price']
-                        elif outcome['name'] == defaults.get('away_team'):
-                            defaults['away_team_spread'] = outcome['point']
-                            defaults['away_team_spread_price'] = outcome['price']
-                
-                elif market_key == 'totals':
-                    for outcome in outcomes:
-                        if outcome['name'] == 'Over':
-                            defaults['total_over'] = outcome['point']
-                            defaults['total_over_price'] = outcome['price']
-                        elif outcome['name'] == 'Under':
-                            defaults['total_under'] = outcome['point']
-                            defaults['total_under_price'] = outcome['price']
-                return # Stop after finding the first matching market
\ No newline at end of file
+        try:
+            created, updated, moved = upsert_games(batch)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(
+                f"Error saving {len(batch)} game(s): {e}"
+            ))
+            run.errors.append(f"Error saving {len(batch)} game(s): {e}")
+            return 0
+
+        changed |= moved
+        for game in created:
+            self.stdout.write(self.style.SUCCESS(f"CREATED new game: {game}"))
+        for game in updated:
+            self.stdout.write(self.style.NOTICE(f"UPDATED existing game: {game}"))
+        return len(batch)
@@ -0,0 +1,15 @@
+# In odds/management/commands/grade_lines.py
+
+from django.core.management.base import BaseCommand
+
+from odds.analytics import run_pipeline
+
+
+class Command(BaseCommand):
+    help = "Records closing lines for games that have kicked off and grades them against final scores"
+
+    def handle(self, *args, **kwargs):
+        closed, graded = run_pipeline()
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. Closed {closed} line(s), graded {graded} game(s)."
+        ))
@@ -0,0 +1,147 @@
+# In odds/management/commands/loadtest_odds_webhook.py
+
+import hashlib
+import hmac
+import json
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+
+from core.teams import default_team
+from odds.ingest import BOOKMAKER_KEY
+from odds.models import Game
+
+LOADTEST_SECRET = 'loadtest'
+
+
+class Command(BaseCommand):
+    help = "Sends bursts of line-move batches to the odds webhook and reports how many writes they coalesced into"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=2000, help='Batches to send (default: 2000)')
+        parser.add_argument('--games', type=int, default=20, help='Distinct games the moves are spread over (default: 20)')
+        parser.add_argument('--events', type=int, default=3, help='Events per batch (default: 3)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent senders (default: 16)')
+        parser.add_argument('--window', type=float, default=0.5, help='Flush window in seconds, in-process only (default: 0.5)')
+        parser.add_argument(
+            '--url',
+            help='POST to a running server instead (signed with ODDS_WEBHOOK_SECRET); '
+                 'by default the view runs in-process against a throwaway database',
+        )
+
+    def batches(self, count, games, per_batch):
+        """Line-move batches in The Odds API's event shape, with ever-newer last_update times"""
+        rng = random.Random(0)
+        kickoff = datetime.now(timezone.utc) + timedelta(days=3)
+        clock = datetime.now(timezone.utc)
+        team = default_team().odds_name
+        for _ in range(count):
+            events = []
+            for game in rng.sample(range(games), min(per_batch, games)):
+                clock += timedelta(milliseconds=10)
+                spread = rng.choice([-7.5, -7, -6.5, -6])
+                events.append({
+                    'id': f'loadtest-{game}',
+                    'commence_time': kickoff.isoformat(),
+                    'home_team': team,
+                    'away_team': f'Opponent {game}',
+                    'bookmakers': [{
+                        'key': BOOKMAKER_KEY,
+                        'title': 'DraftKings',
+                        'last_update': clock.isoformat(),
+                        'markets': [{'key': 'spreads', 'outcomes': [
+                            {'name': team, 'price': -110, 'point': spread},
+                            {'name': f'Opponent {game}', 'price': -110, 'point': -spread},
+                        ]}],
+                    }],
+                })
+            yield json.dumps(events).encode()
+
+    def handle(self, *args, **options):
+        bodies = list(self.batches(options['messages'], options['games'], options['events']))
+        if options['url']:
+            if not settings.ODDS_WEBHOOK_SECRET:
+                raise CommandError("ODDS_WEBHOOK_SECRET must be set to sign requests to a running server")
+            self.run_remote(options, bodies)
+        else:
+            self.run_in_process(options, bodies)
+
+    def send_all(self, bodies, concurrency, post):
+        def send(body):
+            started = time.perf_counter()
+            status = post(body)
+            return status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(send, bodies))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in results)
+        accepted = sum(1 for status, _ in results if status == 202)
+        self.stdout.write(f"{len(bodies)} batches from {concurrency} senders")
+        self.stdout.write(f"  accepted:          {accepted}/{len(results)}")
+        self.stdout.write(f"  throughput:        {len(results) / elapsed:.0f} batches/s")
+        self.stdout.write(
+            f"  latency p50/p99:   {statistics.median(latencies) * 1000:.1f} ms / "
+            f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms"
+        )
+
+    def sign(self, body, secret):
+        return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+    def run_remote(self, options, bodies):
+        session = requests.Session()
+
+        def post(body):
+            return session.post(
+                options['url'], data=body, timeout=10,
+                headers={'X-Odds-Signature': self.sign(body, settings.ODDS_WEBHOOK_SECRET)},
+            ).status_code
+
+        self.send_all(bodies, options['concurrency'], post)
+
+    def run_in_process(self, options, bodies):
+        from odds import views
+
+        # A throwaway database and odds board, so the load test never touches real games
+        connection.creation.create_test_db(verbosity=0)
+        board_path = f"{tempfile.mkdtemp()}/odds.npy"
+        buffer = views.write_buffer
+        buffer.window_seconds = options['window']
+        local = threading.local()
+
+        def post(body):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            response = local.client.post(
+                '/odds/webhook/', data=body, content_type='application/json',
+                headers={'X-Odds-Signature': self.sign(body, LOADTEST_SECRET)},
+            )
+            connections.close_all()
+            return response.status_code
+
+        with override_settings(
+            ALLOWED_HOSTS=['*'], ODDS_WEBHOOK_SECRET=LOADTEST_SECRET, ODDS_BOARD_PATH=board_path,
+        ):
+            self.send_all(bodies, options['concurrency'], post)
+            buffer.flush()  # Whatever is still inside the last window
+
+        stats = buffer.stats
+        self.stdout.write(f"  events received:   {stats['events']} ({stats['stale']} stale market updates dropped)")
+        self.stdout.write(f"  flushes:           {stats['flushes']} (window {options['window']}s)")
+        self.stdout.write(f"  games in database: {Game.objects.count()}")
+        self.stdout.write(self.style.SUCCESS(
+            f"  game writes:       {stats['rows_written']} "
+            f"({stats['events'] / max(stats['rows_written'], 1):.0f} events per write)"
+        ))
@@ -0,0 +1,15 @@
+# In odds/management/commands/send_alert_digests.py
+
+from django.core.management.base import BaseCommand
+
+from odds.alerts import send_alert_digests
+
+
+class Command(BaseCommand):
+    help = "Emails each user one digest of their queued line alerts"
+
+    def handle(self, *args, **options):
+        digests, notifications = send_alert_digests()
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {digests} digest(s) covering {notifications} alert(s)."
+        ))
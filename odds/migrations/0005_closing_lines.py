@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('odds', '0004_savedbet'),
+        ('schedule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClosingLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('captured_at', models.DateTimeField()),
+                ('home_team_moneyline', models.IntegerField(blank=True, null=True)),
+                ('away_team_moneyline', models.IntegerField(blank=True, null=True)),
+                ('home_team_spread', models.FloatField(blank=True, null=True)),
+                ('total', models.FloatField(blank=True, null=True)),
+                ('opening_home_team_spread', models.FloatField(blank=True, null=True)),
+                ('opening_total', models.FloatField(blank=True, null=True)),
+                ('home_score', models.IntegerField(blank=True, null=True)),
+                ('away_score', models.IntegerField(blank=True, null=True)),
+                ('ats_result', models.CharField(blank=True, choices=[('home', 'Home covered'), ('away', 'Away covered'), ('push', 'Push')], max_length=4, null=True)),
+                ('total_result', models.CharField(blank=True, choices=[('over', 'Over'), ('under', 'Under'), ('push', 'Push')], max_length=5, null=True)),
+                ('spread_clv', models.FloatField(blank=True, null=True)),
+                ('total_clv', models.FloatField(blank=True, null=True)),
+                ('graded_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('game', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='closing_line', to='odds.game')),
+                ('schedule_game', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='closing_lines', to='schedule.game')),
+            ],
+            options={
+                'ordering': ['-captured_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamSeasonSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team', models.CharField(max_length=100)),
+                ('season', models.IntegerField()),
+                ('games', models.IntegerField(default=0)),
+                ('ats_wins', models.IntegerField(default=0)),
+                ('ats_losses', models.IntegerField(default=0)),
+                ('ats_pushes', models.IntegerField(default=0)),
+                ('overs', models.IntegerField(default=0)),
+                ('unders', models.IntegerField(default=0)),
+                ('total_pushes', models.IntegerField(default=0)),
+                ('spread_clv_total', models.FloatField(default=0)),
+            ],
+            options={
+                'ordering': ['-season', 'team'],
+                'unique_together': {('team', 'season')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LineSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('captured_at', models.DateTimeField()),
+                ('home_team_moneyline', models.IntegerField(blank=True, null=True)),
+                ('away_team_moneyline', models.IntegerField(blank=True, null=True)),
+                ('home_team_spread', models.FloatField(blank=True, null=True)),
+                ('away_team_spread', models.FloatField(blank=True, null=True)),
+                ('home_team_spread_price', models.IntegerField(blank=True, null=True)),
+                ('away_team_spread_price', models.IntegerField(blank=True, null=True)),
+                ('total_over', models.FloatField(blank=True, null=True)),
+                ('total_over_price', models.IntegerField(blank=True, null=True)),
+                ('total_under', models.FloatField(blank=True, null=True)),
+                ('total_under_price', models.IntegerField(blank=True, null=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='odds.game')),
+            ],
+            options={
+                'ordering': ['game', 'captured_at'],
+                'indexes': [models.Index(fields=['game', 'captured_at'], name='odds_linesn_game_id_e1e201_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from core.query_cache import CachingManager
+
 class Game(models.Model):
     """
     Represents a single football game and its odds
@@ -42,6 +44,8 @@ class Game(models.Model):
     #home_score = models.IntegerField(null=True, blank=True)
     #away_score = models.IntegerField(null=True, blank=True)
 
+    objects = CachingManager()
+
     class Meta:
         ordering = ['game_time'] # Default sort: show earliest games first
 
@@ -67,9 +71,163 @@ class SavedBet(models.Model):
     game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='saved_by')
     saved_at = models.DateTimeField(auto_now_add=True)
     
+    # Saves and unsaves bump the user's version, which their saved ids are cached under
+    objects = CachingManager(parents=('user',))
+    
     class Meta:
         unique_together = ['user', 'game']  # Prevent duplicate saves
         ordering = ['-saved_at']  # Most recently saved first
     
     def __str__(self):
         return f"{self.user.username} saved {self.game}"
+
+
+class AlertRule(models.Model):
+    """
+    A line-movement alert on a saved bet. `reference_value` is the line the
+    next move is measured from: the line when the rule was made, then the
+    line at each alert.
+    """
+    SPREAD_MOVE = 'spread_move'
+    MONEYLINE_CROSS = 'moneyline_cross'
+    KIND_CHOICES = [
+        (SPREAD_MOVE, 'Spread moves by at least'),
+        (MONEYLINE_CROSS, 'Moneyline crosses'),
+    ]
+    SIDE_CHOICES = [('home', 'Home team'), ('away', 'Away team')]
+
+    saved_bet = models.ForeignKey(SavedBet, on_delete=models.CASCADE, related_name='alert_rules')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    side = models.CharField(max_length=4, choices=SIDE_CHOICES)
+    threshold = models.FloatField()
+    reference_value = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    @property
+    def line_field(self):
+        market = 'spread' if self.kind == self.SPREAD_MOVE else 'moneyline'
+        return f'{self.side}_team_{market}'
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.threshold:g} ({self.side}) on {self.saved_bet}"
+
+class Notification(models.Model):
+    """An alert for a user: shown in their inbox and sent in their next email digest"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    rule = models.ForeignKey(AlertRule, on_delete=models.SET_NULL, null=True, blank=True, related_name='notifications')
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='notifications')
+    message = models.CharField(max_length=255)
+    # One notification per rule per line value, however many times a run is retried
+    dedupe_key = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+    emailed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', '-created_at'])]
+
+    def __str__(self):
+        return f"To {self.user.username}: {self.message}"
+
+
+# The odds columns shared by Game and LineSnapshot
+LINE_FIELDS = [
+    'home_team_moneyline', 'away_team_moneyline',
+    'home_team_spread', 'away_team_spread',
+    'home_team_spread_price', 'away_team_spread_price',
+    'total_over', 'total_over_price',
+    'total_under', 'total_under_price',
+]
+
+class LineSnapshot(models.Model):
+    """A game's line as seen by one fetch_odds run (only stored when it changed)"""
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='snapshots')
+    captured_at = models.DateTimeField()
+    
+    home_team_moneyline = models.IntegerField(null=True, blank=True)
+    away_team_moneyline = models.IntegerField(null=True, blank=True)
+    home_team_spread = models.FloatField(null=True, blank=True)
+    away_team_spread = models.FloatField(null=True, blank=True)
+    home_team_spread_price = models.IntegerField(null=True, blank=True)
+    away_team_spread_price = models.IntegerField(null=True, blank=True)
+    total_over = models.FloatField(null=True, blank=True)
+    total_over_price = models.IntegerField(null=True, blank=True)
+    total_under = models.FloatField(null=True, blank=True)
+    total_under_price = models.IntegerField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['game', 'captured_at']
+        indexes = [models.Index(fields=['game', 'captured_at'])]
+    
+    def __str__(self):
+        return f"{self.game} @ {self.captured_at}"
+
+class ClosingLine(models.Model):
+    """
+    The last line before kickoff for a game, joined to its final score
+    from schedule.Game and graded against the spread and total.
+    """
+    ATS_CHOICES = [('home', 'Home covered'), ('away', 'Away covered'), ('push', 'Push')]
+    TOTAL_CHOICES = [('over', 'Over'), ('under', 'Under'), ('push', 'Push')]
+    
+    game = models.OneToOneField(Game, on_delete=models.CASCADE, related_name='closing_line')
+    schedule_game = models.ForeignKey(
+        'schedule.Game', on_delete=models.SET_NULL, null=True, blank=True, related_name='closing_lines'
+    )
+    captured_at = models.DateTimeField()
+    
+    # Closing line
+    home_team_moneyline = models.IntegerField(null=True, blank=True)
+    away_team_moneyline = models.IntegerField(null=True, blank=True)
+    home_team_spread = models.FloatField(null=True, blank=True)
+    total = models.FloatField(null=True, blank=True)
+    
+    # Opening line, for closing-line value
+    opening_home_team_spread = models.FloatField(null=True, blank=True)
+    opening_total = models.FloatField(null=True, blank=True)
+    
+    # Results (filled in once the schedule has a final score)
+    home_score = models.IntegerField(null=True, blank=True)
+    away_score = models.IntegerField(null=True, blank=True)
+    ats_result = models.CharField(max_length=4, choices=ATS_CHOICES, null=True, blank=True)
+    total_result = models.CharField(max_length=5, choices=TOTAL_CHOICES, null=True, blank=True)
+    # Points gained by taking the home spread / the over at the open instead of the close
+    spread_clv = models.FloatField(null=True, blank=True)
+    total_clv = models.FloatField(null=True, blank=True)
+    graded_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-captured_at']
+    
+    def __str__(self):
+        return f"Closing line for {self.game}"
+
+class TeamSeasonSummary(models.Model):
+    """Running ATS/over-under/CLV totals per team and season, updated as games are graded"""
+    team = models.CharField(max_length=100)
+    season = models.IntegerField()
+    
+    games = models.IntegerField(default=0)
+    ats_wins = models.IntegerField(default=0)
+    ats_losses = models.IntegerField(default=0)
+    ats_pushes = models.IntegerField(default=0)
+    overs = models.IntegerField(default=0)
+    unders = models.IntegerField(default=0)
+    total_pushes = models.IntegerField(default=0)
+    # Sum of the spread CLV from this team's side; divide by games for the average
+    spread_clv_total = models.FloatField(default=0)
+    
+    class Meta:
+        unique_together = ['team', 'season']
+        ordering = ['-season', 'team']
+    
+    def __str__(self):
+        return f"{self.team} {self.season}"
+    
+    @property
+    def average_spread_clv(self):
+        return self.spread_clv_total / self.games if self.games else None
@@ -0,0 +1,161 @@
+"""
+Retention for odds data (the compact_odds command).
+
+- Games that kicked off more than ODDS_RETENTION_DAYS ago are deleted, along
+  with everything that cascades from them (line history, closing lines,
+  comments, saved bets). If ODDS_ARCHIVE_DIR is set, those rows are first
+  written there as gzipped CSV through the same exports analysts use
+  (odds/exports.py). Season summaries (TeamSeasonSummary) are kept, so
+  the trends page keeps its history.
+- Line history is downsampled as it ages: snapshots older than
+  LINE_HOURLY_AFTER_DAYS keep only the last line of each hour, and ones older
+  than LINE_DAILY_AFTER_DAYS only the last of each day. A game's first
+  snapshot (its opening line, for closing-line value) is always kept, and so
+  is its latest one, which new snapshots are compared against.
+
+Deletes run in keyset-paginated batches of BATCH_SIZE rows, each in its own
+short transaction, so writers are never locked out for long.
+"""
+
+import gzip
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.export import csv_chunks
+
+from . import exports
+from .board import publishing_suspended
+from .models import Game, LineSnapshot
+
+BATCH_SIZE = 1000
+# Games cascade to their comments, snapshots etc., so fewer per batch
+GAME_BATCH_SIZE = 200
+
+# What's archived before old games are deleted, and the lookup to each row's game time
+ARCHIVED = [
+    (exports.odds, 'game_time'),
+    (exports.line_history, 'game__game_time'),
+    (exports.closing_lines, 'game__game_time'),
+    (exports.bet_comments, 'game__game_time'),
+]
+
+
+def archive_games(cutoff, archive_dir):
+    """Write every archived export's rows for games before `cutoff` to gzipped CSV; returns the paths"""
+    archive_dir = Path(archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for export, game_time in ARCHIVED:
+        path = archive_dir / f"{export.name}-before-{cutoff:%Y-%m-%d}.csv.gz"
+        with gzip.open(path, 'wt', newline='', encoding='utf-8') as archive:
+            for chunk in csv_chunks(export, **{f"{game_time}__lt": cutoff}):
+                archive.write(chunk)
+        paths.append(path)
+    return paths
+
+
+def prune_games(cutoff, dry_run=False):
+    """
+    Delete games that kicked off before `cutoff` (and what cascades from
+    them); returns how many. Doesn't republish the odds board.
+    """
+    ids = Game.objects.filter(game_time__lt=cutoff).order_by('pk').values_list('pk', flat=True)
+    if dry_run:
+        return ids.count()
+
+    deleted = 0
+    last = None
+    while True:
+        chunk = list((ids if last is None else ids.filter(pk__gt=last))[:GAME_BATCH_SIZE])
+        if not chunk:
+            break
+        # The caller publishes the board once afterwards, not once per batch
+        with publishing_suspended(), transaction.atomic():
+            _, per_model = Game.objects.filter(pk__in=chunk).delete()
+        deleted += per_model.get(Game._meta.label, 0)
+        last = chunk[-1]
+    return deleted
+
+
+def _bucket(captured_at, daily_cutoff):
+    if captured_at < daily_cutoff:
+        return captured_at.date()
+    return captured_at.replace(minute=0, second=0, microsecond=0)
+
+
+def _redundant_snapshots(game_id, hourly_cutoff, daily_cutoff):
+    """Ids of a game's snapshots that downsampling drops"""
+    snapshots = list(
+        LineSnapshot.objects.filter(game_id=game_id).order_by('captured_at', 'pk').values_list('pk', 'captured_at')
+    )
+    # Walking newest first, the first snapshot seen in each bucket is that bucket's last line
+    seen = set()
+    redundant = []
+    for pk, captured_at in reversed(snapshots[1:]):
+        if captured_at >= hourly_cutoff:
+            continue
+        bucket = _bucket(captured_at, daily_cutoff)
+        if bucket in seen:
+            redundant.append(pk)
+        seen.add(bucket)
+    return redundant
+
+
+def _delete_snapshots(pks):
+    # Nothing cascades from snapshots, so this is a single DELETE
+    with transaction.atomic():
+        _, per_model = LineSnapshot.objects.filter(pk__in=pks).delete()
+    return per_model.get(LineSnapshot._meta.label, 0)
+
+
+def downsample_line_history(hourly_after, daily_after, now=None, dry_run=False, pruned_before=None):
+    """
+    Thin out snapshots older than `hourly_after` to one per hour, and older
+    than `daily_after` to one per day (timedeltas). Returns how many were
+    (or, for a dry run, would be) deleted. Games before `pruned_before` are
+    left out, so a dry run doesn't count snapshots pruning removes anyway.
+    """
+    now = now or timezone.now()
+    hourly_cutoff = now - hourly_after
+    daily_cutoff = now - max(daily_after, hourly_after)
+
+    # Read up front rather than iterated, since the loop deletes from the same table
+    snapshots = LineSnapshot.objects.filter(captured_at__lt=hourly_cutoff)
+    if pruned_before is not None:
+        snapshots = snapshots.exclude(game__game_time__lt=pruned_before)
+    game_ids = list(
+        snapshots
+        .order_by('game_id').values_list('game_id', flat=True).distinct()
+    )
+    deleted = 0
+    pending = []
+    for game_id in game_ids:
+        pending += _redundant_snapshots(game_id, hourly_cutoff, daily_cutoff)
+        while len(pending) >= BATCH_SIZE:
+            batch, pending = pending[:BATCH_SIZE], pending[BATCH_SIZE:]
+            deleted += len(batch) if dry_run else _delete_snapshots(batch)
+    if pending:
+        deleted += len(pending) if dry_run else _delete_snapshots(pending)
+    return deleted
+
+
+def compact_odds(retention, hourly_after, daily_after, archive_dir=None, now=None, dry_run=False):
+    """
+    Archive and prune games older than `retention` (a timedelta, or None to
+    keep every game), then downsample line history. Returns
+    {'games': ..., 'snapshots': ..., 'archives': [paths]}.
+    """
+    now = now or timezone.now()
+    result = {'games': 0, 'snapshots': 0, 'archives': []}
+    cutoff = None
+    if retention is not None:
+        cutoff = now - retention
+        if archive_dir and not dry_run and Game.objects.filter(game_time__lt=cutoff).exists():
+            result['archives'] = archive_games(cutoff, archive_dir)
+        result['games'] = prune_games(cutoff, dry_run=dry_run)
+    result['snapshots'] = downsample_line_history(
+        hourly_after, daily_after, now=now, dry_run=dry_run, pruned_before=cutoff,
+    )
+    return result
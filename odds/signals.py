@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .board import publish_on_commit
+from .models import Game
+
+
+@receiver(post_save, sender=Game)
+def republish_board(sender, instance, **kwargs):
+    """
+    Single saves (admin edits) republish the board as soon as they commit;
+    several in one transaction are published once. Ingests write in bulk,
+    which sends no signals, and publish the board themselves.
+    """
+    publish_on_commit()
+
+
+@receiver(post_delete, sender=Game)
+def unpublish_deleted_game(sender, instance, **kwargs):
+    """Deleted games (admin deletes) come off the board the same way"""
+    publish_on_commit()
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management import call_command
+
+from core.queue import task
+
+from . import alerts, board
+
+
+@task(max_attempts=2, retry_delay=300)
+def refresh_odds():
+    call_command('fetch_odds')
+
+
+@task(max_attempts=1)
+def compact_odds():
+    call_command('compact_odds')
+
+
+@task()
+def publish_board():
+    board.publish_board()
+
+
+@task()
+def evaluate_alerts(game_ids):
+    if alerts.evaluate_alerts(game_ids):
+        # Alerts from a burst of line moves go out together in one digest per user
+        send_alert_digests.enqueue(delay=settings.ALERT_DIGEST_DELAY_SECONDS, key='odds:send_alert_digests')
+
+
+@task(retry_delay=120)
+def send_alert_digests():
+    alerts.send_alert_digests()
@@ -1,3 +1,537 @@
-from django.test import TestCase
+import csv
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import admin_tools, page_cache
+from core.ingest import last_successful_run
+from core.teams import TEAM_COOKIE
+from core.models import IngestRun, Task
+from core.payloads import decode_odds_events
+from core.tests import odds_event
+from schedule.models import Game as ScheduleGame
+
+from . import alerts, retention, tasks
+from .analytics import close_lines, grade_closing_lines, record_line_snapshots
+from .board import current_board
+from .ingest import BOOKMAKER_KEY, INGEST_SOURCE, OddsWriteBuffer, upsert_games
+from .models import AlertRule, BetComment, ClosingLine, Game, LineSnapshot, Notification, SavedBet, TeamSeasonSummary
+from .retention import prune_games
+
+
+def make_game(api_game_id='g1', home='Georgia Tech Yellow Jackets', away='Clemson Tigers', days=3, **fields):
+    now = timezone.now()
+    return Game.objects.create(
+        api_game_id=api_game_id, home_team=home, away_team=away,
+        game_time=now + timedelta(days=days), bookmaker_name='DraftKings', last_updated=now,
+        **fields,
+    )
+
+
+class ClosingLineTests(TestCase):
+    def setUp(self):
+        self.kickoff = timezone.now() - timedelta(hours=4)
+
+    def _game(self, api_game_id='g1', home='Georgia Tech Yellow Jackets', away='Georgia Bulldogs'):
+        return Game.objects.create(
+            api_game_id=api_game_id, home_team=home, away_team=away, game_time=self.kickoff,
+            bookmaker_name='DraftKings', last_updated=self.kickoff,
+        )
+
+    def _snapshot(self, game, hours_before, spread, total=55.5):
+        LineSnapshot.objects.create(
+            game=game, captured_at=self.kickoff - timedelta(hours=hours_before),
+            home_team_spread=spread, total_over=total,
+        )
+
+    def test_snapshots_only_store_changes_before_kickoff(self):
+        game = make_game(home_team_spread=-3)
+        self.assertEqual(len(record_line_snapshots([game])), 1)
+        self.assertEqual(record_line_snapshots([game]), [])
+        game.home_team_spread = -4
+        self.assertEqual(len(record_line_snapshots([game])), 1)
+        self.assertEqual(record_line_snapshots([game], captured_at=game.game_time), [])
+
+    def test_closing_and_opening_lines_come_from_pre_kickoff_snapshots(self):
+        game = self._game()
+        self._snapshot(game, 48, -1.5, 52)
+        self._snapshot(game, 2, -3, 55.5)
+        # Live line after kickoff
+        LineSnapshot.objects.create(game=game, captured_at=self.kickoff + timedelta(hours=1), home_team_spread=7)
+        self.assertEqual(close_lines(), 1)
+        line = ClosingLine.objects.get(game=game)
+        self.assertEqual((line.home_team_spread, line.total), (-3, 55.5))
+        self.assertEqual((line.opening_home_team_spread, line.opening_total), (-1.5, 52))
+        self.assertEqual(close_lines(), 0)
+
+    def test_games_without_lines_are_skipped_in_constant_queries(self):
+        self._game('no-lines')
+        for number in range(5):
+            self._snapshot(self._game(f'g{number}'), 2, -number)
+        with self.assertNumQueries(3):
+            self.assertEqual(close_lines(), 5)
+        with self.assertNumQueries(1):
+            self.assertEqual(close_lines(), 0)
+
+    def test_grading_matches_teams_by_full_name(self):
+        # Georgia listed as home in the schedule, Georgia Tech in the odds feed
+        game = self._game()
+        self._snapshot(game, 2, -3, 50.5)
+        ScheduleGame.objects.create(
+            api_game_id=1, season=2025, season_type='regular', home_team='Georgia', away_team='Georgia Tech',
+            game_date=self.kickoff, home_score=30, away_score=20, completed=True, neutral_site=True,
+        )
+        close_lines()
+        self.assertEqual(grade_closing_lines(), 1)
+        line = ClosingLine.objects.get(game=game)
+        self.assertEqual((line.home_score, line.away_score), (20, 30))
+        self.assertEqual((line.ats_result, line.total_result, line.spread_clv), ('away', 'under', 0))
+        tech = TeamSeasonSummary.objects.get(team='Georgia Tech Yellow Jackets', season=2025)
+        self.assertEqual((tech.games, tech.ats_losses, tech.unders), (1, 1, 1))
+        georgia = TeamSeasonSummary.objects.get(team='Georgia Bulldogs', season=2025)
+        self.assertEqual(georgia.ats_wins, 1)
+
+    def test_ungraded_until_the_score_is_in(self):
+        game = self._game()
+        self._snapshot(game, 2, -3)
+        close_lines()
+        self.assertEqual(grade_closing_lines(), 0)
+        self.assertIsNone(ClosingLine.objects.get(game=game).graded_at)
+
+
+class FakeOddsResponse:
+    """Stands in for requests' response to the /odds call"""
+
+    def __init__(self, body):
+        self.content = body
+        self.headers = {'x-requests-remaining': '480'}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        # Smaller chunks than fetch_odds asks for, so events straddle them
+        for start in range(0, len(self.content), 97):
+            yield self.content[start:start + 97]
+
+    def close(self):
+        pass
+
+
+class FetchOddsTests(TestCase):
+    EVENTS = [
+        odds_event('e1'),
+        odds_event('e2', home='Duke Blue Devils', away='Clemson Tigers'),
+        {'id': 'e3'},
+        odds_event('e4', home='Virginia Cavaliers', away='Georgia Tech Yellow Jackets'),
+    ]
+
+    def _fetch(self, *args, body=None):
+        body = json.dumps(self.EVENTS).encode() if body is None else body
+        stdout = io.StringIO()
+        with mock.patch('odds.management.commands.fetch_odds.requests.get', return_value=FakeOddsResponse(body)):
+            call_command('fetch_odds', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_buffered_and_streamed_store_the_same_games(self):
+        for args in ((), ('--stream',)):
+            with self.subTest(args=args):
+                Game.objects.all().delete()
+                self._fetch(*args)
+                self.assertEqual(
+                    sorted(Game.objects.values_list('api_game_id', 'home_team_spread')), [('e1', -3.5), ('e4', -3.5)],
+                )
+
+    def test_run_is_recorded_with_the_rejected_events(self):
+        self._fetch('--stream')
+        run = last_successful_run(INGEST_SOURCE)
+        self.assertEqual((run.events_seen, run.rows_written, run.quota_remaining), (3, 2, 480))
+        self.assertIn('Skipped 1 malformed event(s), first: record 2', run.errors[0])
+
+    @mock.patch('odds.management.commands.fetch_odds.BATCH_SIZE', 1)
+    def test_games_are_upserted_in_batches(self):
+        with mock.patch('odds.management.commands.fetch_odds.upsert_games', wraps=upsert_games) as upsert:
+            self._fetch('--stream')
+        self.assertEqual([list(call.args[0]) for call in upsert.call_args_list], [['e1'], ['e4']])
+
+    def test_truncated_stream_fails_the_run(self):
+        body = json.dumps(self.EVENTS).encode()[:-40]
+        with self.assertRaisesMessage(CommandError, 'truncated JSON array'):
+            self._fetch('--stream', body=body)
+        self.assertEqual(IngestRun.objects.get().status, IngestRun.FAILED)
+
+
+@override_settings(ODDS_WEBHOOK_SECRET='secret')
+class OddsWebhookTests(TestCase):
+    def setUp(self):
+        self.buffer = OddsWriteBuffer(BOOKMAKER_KEY, ['Georgia Tech Yellow Jackets'], 3600)
+        self.addCleanup(lambda: self.buffer._timer and self.buffer._timer.cancel())
+        patcher = mock.patch('odds.views.write_buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, events, secret='secret'):
+        body = json.dumps(events).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return self.client.post(
+            reverse('odds:webhook'), body, content_type='application/json', headers={'X-Odds-Signature': signature},
+        )
+
+    def _decode(self, events):
+        return decode_odds_events(json.dumps(events).encode()).records
+
+    def test_bad_signature_is_refused(self):
+        self.assertEqual(self._post([odds_event()], secret='wrong').status_code, 403)
+        self.assertEqual(self.buffer.stats['events'], 0)
+
+    def test_malformed_body_is_a_400(self):
+        self.assertEqual(self._post({'not': 'a list'}).status_code, 400)
+
+    def test_accepted_events_are_queued_not_written(self):
+        response = self._post([odds_event()])
+        self.assertEqual((response.status_code, response.json()['accepted']), (202, 1))
+        self.assertFalse(Game.objects.exists())
+        self.assertEqual(len(self.buffer._pending), 1)
+
+    def test_line_moves_in_one_window_are_written_once(self):
+        self.buffer.add(self._decode([odds_event(spread=-3.5, minutes_ago=2), odds_event(spread=-4.5, minutes_ago=1)]))
+        # Arrived late: older than the line already queued
+        self.buffer.add(self._decode([odds_event(spread=-1.5, minutes_ago=5)]))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(Game.objects.get(api_game_id='e1').home_team_spread, -4.5)
+        self.assertEqual(LineSnapshot.objects.count(), 1)
+        # Each of the late event's three markets was stale
+        self.assertEqual((self.buffer.stats['stale'], self.buffer.stats['rows_written']), (3, 1))
+
+    def test_other_teams_and_bookmakers_are_ignored(self):
+        other_book = odds_event('e2')
+        other_book['bookmakers'][0]['key'] = 'fanduel'
+        self.buffer.add(self._decode([odds_event('e1', home='Duke Blue Devils'), other_book]))
+        self.assertEqual(self.buffer.stats['ignored'], 2)
+        self.assertEqual(self.buffer.flush(), 0)
+
+
+class BoardPublishingTests(TestCase):
+    def test_saved_game_is_on_the_board_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            game = make_game(home_team_spread=-3.5)
+        row = current_board().get(id=game.id)
+        self.assertIsNotNone(row)
+        self.assertEqual(row.home_team_spread, -3.5)
+
+    def test_nothing_is_published_before_commit(self):
+        with mock.patch('odds.board.publish_board') as publish:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                make_game()
+            publish.assert_not_called()
+            for callback in callbacks:
+                callback()
+            publish.assert_called_once()
+
+    def test_several_saves_in_one_transaction_publish_once(self):
+        with mock.patch('odds.board.publish_board') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    game = make_game()
+                    game.home_team_spread = -7
+                    game.save()
+                    make_game(api_game_id='g2')
+            publish.assert_called_once()
+
+    def test_deleted_game_comes_off_the_board(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            game = make_game()
+        with self.captureOnCommitCallbacks(execute=True):
+            game.delete()
+        self.assertIsNone(current_board().get(id=game.id))
+
+    def test_prune_doesnt_publish(self):
+        old = make_game(days=-400)
+        make_game(api_game_id='g2')
+        with mock.patch('odds.board.publish_board') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                deleted = prune_games(timezone.now() - timedelta(days=365))
+            publish.assert_not_called()
+        self.assertEqual(deleted, 1)
+        self.assertFalse(Game.objects.filter(pk=old.pk).exists())
+
+
+class AlertTests(TestCase):
+    def setUp(self):
+        self.game = make_game(home_team_spread=-3.5, away_team_spread=3.5, home_team_moneyline=-150, away_team_moneyline=130)
+
+    def _rule(self, kind=AlertRule.SPREAD_MOVE, side='home', threshold=1, username='fan', email='fan@example.com'):
+        user, _ = User.objects.get_or_create(username=username, defaults={'email': email})
+        saved_bet, _ = SavedBet.objects.get_or_create(user=user, game=self.game)
+        return AlertRule.objects.create(
+            saved_bet=saved_bet, kind=kind, side=side, threshold=threshold,
+            reference_value=getattr(self.game, f'{side}_team_{"spread" if kind == AlertRule.SPREAD_MOVE else "moneyline"}'),
+        )
+
+    def _move(self, **lines):
+        Game.objects.filter(pk=self.game.pk).update(last_updated=timezone.now(), **lines)
+        return alerts.evaluate_alerts([self.game.pk])
+
+    def test_spread_move_past_the_threshold_alerts(self):
+        rule = self._rule(threshold=1)
+        self.assertEqual(self._move(home_team_spread=-4), 0)
+        self.assertEqual(self._move(home_team_spread=-4.5), 1)
+        notification = Notification.objects.get()
+        self.assertIn('spread moved from -3.5 to -4.5', notification.message)
+        # The next move is measured from the line that alerted
+        rule.refresh_from_db()
+        self.assertEqual(rule.reference_value, -4.5)
+
+    def test_moneyline_crossing_alerts(self):
+        self._rule(kind=AlertRule.MONEYLINE_CROSS, side='home', threshold=-120)
+        self.assertEqual(self._move(home_team_moneyline=-130), 0)
+        self.assertEqual(self._move(home_team_moneyline=-110), 1)
+
+    def test_rule_made_before_there_was_a_line_starts_from_the_first_one(self):
+        Game.objects.filter(pk=self.game.pk).update(home_team_spread=None)
+        self.game.refresh_from_db()
+        rule = self._rule()
+        self.assertIsNone(rule.reference_value)
+        self.assertEqual(self._move(home_team_spread=-3), 0)
+        rule.refresh_from_db()
+        self.assertEqual(rule.reference_value, -3)
+
+    def test_retried_evaluation_doesnt_alert_twice(self):
+        rule = self._rule()
+        self.assertEqual(self._move(home_team_spread=-6), 1)
+        AlertRule.objects.filter(pk=rule.pk).update(reference_value=-3.5)
+        alerts.evaluate_alerts([self.game.pk])
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_queries_dont_grow_with_the_number_of_rules(self):
+        def queries(move):
+            with CaptureQueriesContext(connection) as captured:
+                self._move(home_team_spread=move)
+            return len(captured)
+
+        self._rule(username='fan0')
+        one = queries(-6)
+        for index in range(1, 20):
+            self._rule(username=f'fan{index}')
+        self.assertEqual(queries(-9), one)
+        self.assertEqual(Notification.objects.count(), 1 + 20)
+
+    @override_settings(ALERT_DIGEST_DELAY_SECONDS=300)
+    def test_task_queues_one_digest(self):
+        self._rule()
+        Game.objects.filter(pk=self.game.pk).update(home_team_spread=-6)
+        tasks.evaluate_alerts(game_ids=[self.game.pk])
+        tasks.evaluate_alerts(game_ids=[self.game.pk])
+        self.assertEqual(list(Task.objects.values_list('name', flat=True)), ['odds.tasks.send_alert_digests'])
+
+    def test_digest_is_one_email_per_user(self):
+        self._rule(username='fan', threshold=1)
+        self._rule(kind=AlertRule.MONEYLINE_CROSS, threshold=-120, username='fan')
+        self._rule(username='inbox_only', email='')
+        self._move(home_team_spread=-6, home_team_moneyline=-110)
+        self.assertEqual(alerts.send_alert_digests(), (1, 3))
+        [email] = mail.outbox
+        self.assertEqual((email.to, email.subject), (['fan@example.com'], 'GTSportsOdds: 2 line alerts'))
+        # Everything is marked, so nothing goes out twice
+        self.assertEqual(alerts.send_alert_digests(), (0, 0))
+
+    def test_inbox_marks_alerts_read(self):
+        self._rule()
+        self._move(home_team_spread=-6)
+        self.client.force_login(User.objects.get(username='fan'))
+        response = self.client.get(reverse('odds:alerts'))
+        self.assertContains(response, 'spread moved')
+        self.assertIsNotNone(Notification.objects.get().read_at)
+
+    def test_rules_can_only_be_added_to_your_own_saved_bets(self):
+        self.client.force_login(User.objects.create_user('other'))
+        response = self.client.post(reverse('odds:add_alert_rule', args=[self.game.pk]), {
+            'kind': AlertRule.SPREAD_MOVE, 'side': 'home', 'threshold': 1,
+        })
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(AlertRule.objects.exists())
+
+
+class CommentModerationTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        author = User.objects.create_user('fan')
+        self.games = [make_game('g1'), make_game('g2', away='Duke Blue Devils')]
+        for game in self.games:
+            BetComment.objects.create(game=game, author=author, content='Great pick for the touchdown')
+            BetComment.objects.create(game=game, author=author, content='Terrible spread')
+        self.url = reverse('admin:odds_betcomment_changelist')
+
+    def _listed(self, response):
+        return sorted(comment.pk for comment in response.context['cl'].result_list)
+
+    def test_search_goes_through_the_full_text_index(self):
+        response = self.client.get(self.url, {'q': 'touchdown'})
+        self.assertEqual(self._listed(response), sorted(BetComment.objects.filter(content__contains='touchdown').values_list('pk', flat=True)))
+
+    def test_search_by_exact_author_username(self):
+        other = User.objects.create_user('rival')
+        comment = BetComment.objects.create(game=self.games[0], author=other, content='Take the points')
+        response = self.client.get(self.url, {'q': 'Rival'})
+        self.assertEqual(self._listed(response), [comment.pk])
+
+    def test_search_by_exact_team_name(self):
+        response = self.client.get(self.url, {'q': 'Duke Blue Devils'})
+        self.assertEqual(self._listed(response), sorted(self.games[1].comments.values_list('pk', flat=True)))
+
+    def test_autocomplete_filter_by_author(self):
+        other = User.objects.create_user('rival')
+        comment = BetComment.objects.create(game=self.games[0], author=other, content='Take the points')
+        response = self.client.get(self.url, {'author__id__exact': other.pk})
+        self.assertEqual(self._listed(response), [comment.pk])
+
+    def test_autocomplete_filter_by_game(self):
+        game = self.games[1]
+        response = self.client.get(self.url, {'game__id__exact': game.pk})
+        self.assertEqual(self._listed(response), sorted(game.comments.values_list('pk', flat=True)))
+        self.assertContains(response, 'admin-autocomplete-filter')
+
+    def _delete(self, **post):
+        # "Select all" still posts a checked row, which the changelist requires
+        return self.client.post(self.url, {
+            'action': 'delete_in_chunks', 'index': 0, 'select_across': '1',
+            '_selected_action': list(BetComment.objects.values_list('pk', flat=True)[:1]), **post,
+        })
+
+    def test_delete_asks_for_confirmation_first(self):
+        response = self._delete()
+        self.assertTemplateUsed(response, 'admin/chunked_delete_confirmation.html')
+        self.assertEqual(BetComment.objects.count(), 4)
+
+    @mock.patch.object(admin_tools, 'DELETE_CHUNK_SIZE', 3)
+    def test_delete_in_chunks_bumps_the_games_pages(self):
+        before = {game.pk: page_cache._group_version(f'odds.game.{game.pk}') for game in self.games}
+        with CaptureQueriesContext(connection) as captured:
+            response = self._delete(post='yes')
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(BetComment.objects.exists())
+        deletes = [query for query in captured if query['sql'].startswith('DELETE FROM "odds_betcomment"')]
+        self.assertEqual(len(deletes), 2)
+        for game in self.games:
+            self.assertNotEqual(page_cache._group_version(f'odds.game.{game.pk}'), before[game.pk])
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now().replace(minute=30, second=0, microsecond=0)
+        self.old = make_game('old', days=-400)
+        self.recent = make_game('recent', days=-10)
+        author = User.objects.create_user('fan')
+        for game in (self.old, self.recent):
+            BetComment.objects.create(game=game, author=author, content='Take the points')
+            LineSnapshot.objects.create(game=game, captured_at=game.game_time - timedelta(days=1), home_team_spread=-3)
+        TeamSeasonSummary.objects.create(team='Georgia Tech', season=2024, games=12)
+        self.cutoff = self.now - timedelta(days=365)
+
+    def _snapshot(self, game, ago, spread):
+        return LineSnapshot.objects.create(game=game, captured_at=self.now - ago, home_team_spread=spread)
+
+    @mock.patch.object(retention, 'GAME_BATCH_SIZE', 1)
+    def test_prune_deletes_old_games_and_what_hangs_off_them(self):
+        make_game('older', days=-500)
+        self.assertEqual(retention.prune_games(self.cutoff), 2)
+        self.assertEqual(list(Game.objects.values_list('api_game_id', flat=True)), ['recent'])
+        self.assertEqual(BetComment.objects.get().game, self.recent)
+        self.assertEqual(LineSnapshot.objects.get().game, self.recent)
+        # The trends page's history stays
+        self.assertTrue(TeamSeasonSummary.objects.exists())
+
+    def test_archive_has_only_the_old_games_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = retention.archive_games(self.cutoff, directory)
+            self.assertEqual(len(paths), len(retention.ARCHIVED))
+            with gzip.open(paths[0], 'rt', encoding='utf-8') as archive:
+                rows = list(csv.DictReader(archive))
+        self.assertEqual([row['api_game_id'] for row in rows], ['old'])
+
+    def test_downsampling_keeps_the_opening_last_of_each_bucket_and_latest(self):
+        game = self.recent
+        LineSnapshot.objects.filter(game=game).delete()
+        opening = self._snapshot(game, timedelta(days=30, minutes=20), -1)
+        # Past the daily cutoff: two on one day, the later kept
+        self._snapshot(game, timedelta(days=30, minutes=10), -1.5)
+        day_last = self._snapshot(game, timedelta(days=30), -2)
+        # Past the hourly cutoff: two in one hour, the later kept
+        self._snapshot(game, timedelta(days=3, minutes=20), -2.5)
+        hour_last = self._snapshot(game, timedelta(days=3, minutes=10), -3)
+        # Recent: all kept
+        recent = [self._snapshot(game, timedelta(minutes=minutes), -3.5 - minutes) for minutes in (20, 10)]
+
+        deleted = retention.downsample_line_history(timedelta(days=2), timedelta(days=14), now=self.now)
+        self.assertEqual(deleted, 2)
+        self.assertEqual(
+            list(LineSnapshot.objects.filter(game=game).order_by('captured_at').values_list('pk', flat=True)),
+            [opening.pk, day_last.pk, hour_last.pk, *(snapshot.pk for snapshot in recent)],
+        )
+
+    def test_dry_run_changes_nothing(self):
+        self._snapshot(self.recent, timedelta(days=3, minutes=20), -2.5)
+        self._snapshot(self.recent, timedelta(days=3, minutes=10), -3)
+        counts = LineSnapshot.objects.count(), Game.objects.count()
+        result = retention.compact_odds(timedelta(days=365), timedelta(days=2), timedelta(days=14), now=self.now, dry_run=True)
+        self.assertEqual((result['games'], result['snapshots'], result['archives']), (1, 1, []))
+        self.assertEqual((LineSnapshot.objects.count(), Game.objects.count()), counts)
+
+    def test_command_archives_prunes_and_publishes(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                self.captureOnCommitCallbacks(execute=True), \
+                mock.patch('odds.management.commands.compact_odds.publish_board') as publish:
+            out = io.StringIO()
+            call_command('compact_odds', '--retention-days=365', f'--archive-dir={directory}', '--no-vacuum', stdout=out)
+            self.assertEqual(len(list(Path(directory).glob('*.csv.gz'))), len(retention.ARCHIVED))
+        self.assertIn('Deleted 1 game(s)', out.getvalue())
+        publish.assert_called_once_with()
+        self.assertFalse(Game.objects.filter(api_game_id='old').exists())
+
+    def test_command_dry_run(self):
+        with mock.patch('odds.management.commands.compact_odds.publish_board') as publish:
+            out = io.StringIO()
+            call_command('compact_odds', '--retention-days=365', '--archive-dir=', '--dry-run', stdout=out)
+        self.assertIn('Would delete 1 game(s)', out.getvalue())
+        publish.assert_not_called()
+        self.assertTrue(Game.objects.filter(api_game_id='old').exists())
+
+
+@override_settings(FOLLOWED_TEAMS=['Georgia Tech:Yellow Jackets', 'Georgia:Bulldogs'])
+class TeamOddsTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tech = make_game('g1', days=2)
+            self.georgia = make_game('g2', home='Georgia Bulldogs', away='Auburn Tigers', days=3)
+            make_game('g3', home='Georgia Bulldogs', away='Alabama Crimson Tide', days=-1)
+
+    def test_board_upcoming_for_a_team(self):
+        board = current_board()
+        now = timezone.now()
+        self.assertEqual([game.id for game in board.upcoming(now, team='Georgia Bulldogs')], [self.georgia.id])
+        self.assertEqual([game.id for game in board.upcoming(now)], [self.tech.id, self.georgia.id])
+        self.assertEqual(board.upcoming(now, team='Duke Blue Devils'), [])
+
+    def test_odds_page_shows_the_chosen_teams_games(self):
+        response = self.client.get(reverse('odds:odds_list'), {'team': 'georgia'})
+        self.assertEqual([game.id for game in response.context['games']], [self.georgia.id])
+        self.client.cookies[TEAM_COOKIE] = 'georgia-tech'
+        response = self.client.get(reverse('odds:odds_list'))
+        self.assertEqual([game.id for game in response.context['games']], [self.tech.id])
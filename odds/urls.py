@@ -9,6 +9,14 @@ urlpatterns = [
     # This makes it the root of the 'odds' app
     path('', views.odds_list_view, name='odds_list'),
     path('saved/', views.saved_bets_view, name='saved_bets'),
+    path('alerts/', views.alerts_view, name='alerts'),
+    path('alerts/<int:rule_id>/delete/', views.delete_alert_rule_view, name='delete_alert_rule'),
+    path('trends/', views.trends_view, name='trends'),
+    path('webhook/', views.odds_webhook_view, name='webhook'),
+    path('export.csv', views.export_odds_view, name='export'),
+    path('history/export.csv', views.export_line_history_view, name='export_line_history'),
+    path('comments/export.csv', views.export_comments_view, name='export_comments'),
     path('<int:game_id>/', views.game_detail_view, name='game_detail'),
     path('<int:game_id>/save/', views.save_bet_view, name='save_bet'),
+    path('<int:game_id>/alerts/', views.add_alert_rule_view, name='add_alert_rule'),
 ]
\ No newline at end of file
@@ -1,59 +1,92 @@
 # In odds/views.py
 
+import hashlib
+import hmac
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
-from .models import Game, BetComment, SavedBet
-from .forms import BetCommentForm
+from django.http import Http404, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from .models import Game, BetComment, SavedBet, ClosingLine, TeamSeasonSummary, AlertRule, Notification
+from .forms import AlertRuleForm, BetCommentForm
+from core.export import csv_response
+from core.ingest import last_successful_run
+from core.page_cache import bump_pages, cache_page_for_anonymous
+from core.query_cache import get_cached_or_404
+from core.ratelimit import rate_limit
+from core.replicas import read_from_replica
+from core.teams import current_team, followed_teams
+from core.payloads import PayloadError, decode_odds_events
+from home import dashboard
+from . import exports
+from .board import current_board
+from .ingest import BOOKMAKER_KEY, INGEST_SOURCE, OddsWriteBuffer
+
+# Pushed updates queue here and are written once per flush window (per process)
+write_buffer = OddsWriteBuffer(
+    BOOKMAKER_KEY, [team.odds_name for team in followed_teams()], settings.ODDS_WEBHOOK_FLUSH_SECONDS,
+)
+
+def _saved_game_ids(user):
+    """Ids of the games `user` has saved, cached until they save or unsave one"""
+    if not user.is_authenticated:
+        return set()
+    return SavedBet.objects.cached_query(
+        f"game_ids:{user.pk}",
+        lambda: set(SavedBet.objects.filter(user=user).values_list('game_id', flat=True)),
+        depends=[user],
+    )
 
+@cache_page_for_anonymous('odds')
+@read_from_replica
 def odds_list_view(request):
     """
-    Fetches all games that haven't happened yet
+    Fetches the current team's games that haven't happened yet
     and displays them on the page.
     """
-    # Get all games where the game_time is in the future
-    upcoming_games = Game.objects.filter(
-        game_time__gte=timezone.now()
-    ).order_by('game_time') # Show the soonest game first
-    
-    # Get saved game IDs for the current user
-    saved_game_ids = set()
-    if request.user.is_authenticated:
-        saved_game_ids = set(
-            SavedBet.objects.filter(user=request.user)
-            .values_list('game_id', flat=True)
-        )
+    # Get the team's games where the game_time is in the future, soonest first,
+    # from the memory-mapped board instead of the database
+    upcoming_games = current_board().upcoming(timezone.now(), team=current_team(request).odds_name)
     
     context = {
         'games': upcoming_games,
-        'saved_game_ids': saved_game_ids,
+        # Saved game IDs for the current user
+        'saved_game_ids': _saved_game_ids(request.user),
+        # When fetch_odds last succeeded, so visitors can tell how fresh the lines are
+        'last_update': last_successful_run(INGEST_SOURCE),
     }
     
     return render(request, 'odds/odds_list.html', context)
 
+@cache_page_for_anonymous('odds', 'odds.game.{game_id}')
+@rate_limit('comment')
 def game_detail_view(request, game_id):
     """
     Shows a single game with its odds and allows users to comment on it.
     """
-    game = get_object_or_404(Game, id=game_id)
+    game = current_board().get(id=game_id)
+    if game is None:
+        raise Http404("No game matches the given query.")
     
     # Get all comments for this game
     comments = game.comments.all()
     
     # Check if game is saved by current user
-    is_saved = False
-    if request.user.is_authenticated:
-        is_saved = SavedBet.objects.filter(user=request.user, game=game).exists()
+    is_saved = game.id in _saved_game_ids(request.user)
     
     # Handle comment submission
     if request.method == 'POST' and request.user.is_authenticated:
-        form = BetCommentForm(request.POST)
+        form = BetCommentForm(request.POST, author=request.user)
         if form.is_valid():
             comment = form.save(commit=False)
             comment.game = game
             comment.author = request.user
             comment.save()
+            bump_pages(f'odds.game.{game_id}')
             return redirect('odds:game_detail', game_id=game_id)
     else:
         form = BetCommentForm()
@@ -68,6 +101,7 @@ def game_detail_view(request, game_id):
     return render(request, 'odds/game_detail.html', context)
 
 @login_required
+@rate_limit('save_bet', json=True)
 def save_bet_view(request, game_id):
     """
     Toggle save/unsave a bet for the current user.
@@ -75,9 +109,12 @@ def save_bet_view(request, game_id):
     if request.method != 'POST':
         return JsonResponse({'error': 'Method not allowed'}, status=405)
     
-    game = get_object_or_404(Game, id=game_id)
+    game = get_cached_or_404(Game, game_id)
     saved_bet, created = SavedBet.objects.get_or_create(user=request.user, game=game)
     
+    # The home page's saved bets widget
+    dashboard.invalidate('saved_bets', request.user)
+
     if not created:
         # If it already exists, delete it (unsave)
         saved_bet.delete()
@@ -90,12 +127,140 @@ def saved_bets_view(request):
     """
     Display all saved bets for the current user.
     """
-    saved_bets = SavedBet.objects.filter(user=request.user).select_related('game')
-    games = [saved_bet.game for saved_bet in saved_bets]
+    saved_bets = (
+        SavedBet.objects.filter(user=request.user)
+        .select_related('game')
+        .prefetch_related('alert_rules')
+    )
+    games = []
+    for saved_bet in saved_bets:
+        saved_bet.game.alert_rules = saved_bet.alert_rules.all()
+        games.append(saved_bet.game)
     
     context = {
         'games': games,
         'saved_game_ids': set(g.id for g in games),  # For consistency with odds_list
+        'alert_form': AlertRuleForm(),
+    }
+    
+    return render(request, 'odds/saved_bets.html', context)
+
+@login_required
+@require_POST
+def add_alert_rule_view(request, game_id):
+    """
+    Add a line-movement alert to one of the user's saved bets. Moves are
+    measured from the line as it is now.
+    """
+    saved_bet = get_object_or_404(SavedBet.objects.select_related('game'), user=request.user, game_id=game_id)
+    form = AlertRuleForm(request.POST)
+    if form.is_valid():
+        rule = form.save(commit=False)
+        rule.saved_bet = saved_bet
+        rule.reference_value = getattr(saved_bet.game, rule.line_field)
+        rule.save()
+    return redirect('odds:saved_bets')
+
+@login_required
+@require_POST
+def delete_alert_rule_view(request, rule_id):
+    rule = get_object_or_404(AlertRule, id=rule_id, saved_bet__user=request.user)
+    rule.delete()
+    return redirect('odds:saved_bets')
+
+@login_required
+def alerts_view(request):
+    """
+    The user's alert inbox. Alerts are marked read once they've been shown.
+    """
+    notifications = list(Notification.objects.filter(user=request.user)[:50])
+    unread_ids = [notification.id for notification in notifications if notification.read_at is None]
+    if unread_ids:
+        Notification.objects.filter(id__in=unread_ids).update(read_at=timezone.now())
+    
+    context = {
+        'notifications': notifications,
+    }
+    
+    return render(request, 'odds/alerts.html', context)
+
+@cache_page_for_anonymous('odds')
+@read_from_replica
+def trends_view(request):
+    """
+    Historical ATS / over-under / CLV trends, read from the precomputed
+    season summaries instead of aggregating closing lines per request.
+    """
+    seasons = list(
+        TeamSeasonSummary.objects.values_list('season', flat=True).distinct().order_by('-season')
+    )
+    season = request.GET.get('season')
+    try:
+        season = int(season) if season else (seasons[0] if seasons else None)
+    except ValueError:
+        season = seasons[0] if seasons else None
+    
+    summaries = TeamSeasonSummary.objects.filter(season=season).order_by('-games', 'team')
+    recent_lines = (
+        ClosingLine.objects.filter(graded_at__isnull=False)
+        .select_related('game')
+        .order_by('-captured_at')[:20]
+    )
+    
+    context = {
+        'season': season,
+        'seasons': seasons,
+        'summaries': summaries,
+        'recent_lines': recent_lines,
     }
     
-    return render(request, 'odds/saved_bets.html', context)
\ No newline at end of file
+    return render(request, 'odds/trends.html', context)
+
+def _valid_signature(request):
+    """X-Odds-Signature must be the hex HMAC-SHA256 of the body under ODDS_WEBHOOK_SECRET"""
+    expected = hmac.new(settings.ODDS_WEBHOOK_SECRET.encode(), request.body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, request.headers.get('X-Odds-Signature', ''))
+
+@csrf_exempt
+@require_POST
+def odds_webhook_view(request):
+    """
+    Accepts a batch of events in The Odds API's /odds shape and queues them
+    for the next coalesced write. Responds 202 as soon as they're queued.
+    """
+    if not settings.ODDS_WEBHOOK_SECRET:
+        raise Http404("Odds webhook is not configured")
+    if not _valid_signature(request):
+        return JsonResponse({'error': 'Invalid signature'}, status=403)
+
+    try:
+        decoded = decode_odds_events(request.body)
+    except PayloadError as e:
+        return JsonResponse({'error': f'Expected a JSON array of events: {e}'}, status=400)
+
+    write_buffer.add(decoded.records)
+    return JsonResponse(
+        {
+            'accepted': len(decoded.records),
+            'rejected': [str(rejected) for rejected in decoded.rejected],
+        },
+        status=202,
+    )
+
+@rate_limit('export', methods=('GET',))
+@read_from_replica
+def export_odds_view(request):
+    """Every game's current line as CSV (?start=, ?end=, ?season=)"""
+    return csv_response(request, exports.odds)
+
+@rate_limit('export', methods=('GET',))
+@read_from_replica
+def export_line_history_view(request):
+    """Every stored line change as CSV (?start=, ?end=, ?season=)"""
+    return csv_response(request, exports.line_history)
+
+@staff_member_required
+@read_from_replica
+def export_comments_view(request):
+    """Game comments as CSV (?start=, ?end=, ?season=)"""
+    return csv_response(request, exports.bet_comments)
@@ -0,0 +1,180 @@
+"""
+iCalendar (RFC 5545) feed of a followed team's stored schedule, for calendar
+subscriptions (/schedule/calendar.ics?team=<slug>).
+
+Calendar apps poll subscriptions often, and the schedule rarely changes, so
+the feed is versioned by calendar_state(): two aggregate queries over the
+schedule and the odds it shows. That gives the ETag and Last-Modified for
+conditional GETs (most polls get a 304 without anything being generated) and
+the cache key for the generated body, which is only rebuilt once the
+schedule or a line has changed.
+"""
+
+import hashlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from odds.models import Game as OddsGame
+
+from .models import Game
+
+CALENDAR_KEY = "schedule:calendar:{}:{}"
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24  # Keyed on the inputs, so it can live long
+CALENDAR_NAME = "{} Football"
+# Calendar apps that honor it poll this often
+REFRESH_INTERVAL = "PT6H"
+# Kickoff times the schedule doesn't know yet; these games are all-day events
+UNKNOWN_START_TIMES = {'TBD', 'TBA'}
+GAME_LENGTH = timedelta(hours=3, minutes=30)
+
+
+def calendar_state(team):
+    """
+    (etag, last_modified) for the team's feed as it stands. Counts are part
+    of the ETag so deleted rows change it too.
+    """
+    schedule_state = Game.objects.involving(team).aggregate(count=Count('id'), updated=Max('updated_at'))
+    odds_state = OddsGame.objects.aggregate(count=Count('id'), updated=Max('last_updated'))
+    raw = f"{team.slug}:{schedule_state['count']}:{schedule_state['updated']}:{odds_state['count']}:{odds_state['updated']}"
+    updated = [value for value in (schedule_state['updated'], odds_state['updated']) if value]
+    return hashlib.md5(raw.encode()).hexdigest(), max(updated, default=None)
+
+
+def _escape(text):
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Split a content line into 75-octet pieces, as RFC 5545 requires"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    pieces = []
+    while encoded:
+        limit = 75 if not pieces else 74  # continuation lines start with a space
+        cut = min(limit, len(encoded))
+        # Don't split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        pieces.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    return '\r\n '.join(pieces)
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _signed(value):
+    return f"{value:+g}"
+
+
+def _line(odds_game):
+    """The line for an odds.Game as description text, or None if nothing is posted"""
+    parts = []
+    if odds_game.home_team_spread is not None:
+        parts.append(f"Spread: {odds_game.home_team} {_signed(odds_game.home_team_spread)}")
+    if odds_game.total_over is not None:
+        parts.append(f"Total: {odds_game.total_over:g}")
+    if odds_game.home_team_moneyline is not None and odds_game.away_team_moneyline is not None:
+        parts.append(
+            f"Moneyline: {odds_game.home_team} {_signed(odds_game.home_team_moneyline)}, "
+            f"{odds_game.away_team} {_signed(odds_game.away_team_moneyline)}"
+        )
+    if not parts:
+        return None
+    updated = timezone.localtime(odds_game.last_updated).strftime('%b %d, %I:%M %p')
+    parts.append(f"({odds_game.bookmaker_name}, updated {updated})")
+    return '\n'.join(parts)
+
+
+def _event(game, team, odds_games, stamp):
+    opponent = game.opponent_of(team)
+    if game.neutral_site:
+        summary = f"{team.school} vs {opponent} (neutral site)"
+    elif game.is_home_for(team):
+        summary = f"{team.school} vs {opponent}"
+    else:
+        summary = f"{team.school} @ {opponent}"
+
+    description = []
+    if game.completed and game.home_score is not None and game.away_score is not None:
+        description.append(f"Final: {game.away_team} {game.away_score}, {game.home_team} {game.home_score}")
+    if (game.start_time or '').upper() in UNKNOWN_START_TIMES:
+        description.append("Kickoff time to be announced.")
+    odds_game = next((odds_game for odds_game in odds_games if game.matches_odds_game(odds_game)), None)
+    if odds_game is not None and not game.completed:
+        line = _line(odds_game)
+        if line:
+            description.append(line)
+
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:schedule-game-{game.api_game_id or f'pk{game.pk}'}@gtsportsline",
+        f"DTSTAMP:{_utc(stamp)}",
+        f"LAST-MODIFIED:{_utc(game.updated_at)}",
+    ]
+    if (game.start_time or '').upper() in UNKNOWN_START_TIMES:
+        day = timezone.localtime(game.game_date).date()
+        lines += [
+            f"DTSTART;VALUE=DATE:{day:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}",
+            'TRANSP:TRANSPARENT',
+        ]
+    else:
+        lines += [
+            f"DTSTART:{_utc(game.game_date)}",
+            f"DTEND:{_utc(game.game_date + GAME_LENGTH)}",
+        ]
+    lines.append(f"SUMMARY:{_escape(summary)}")
+    if game.venue:
+        lines.append(f"LOCATION:{_escape(game.venue)}")
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(chr(10).join(description))}")
+    lines.append('END:VEVENT')
+    return lines
+
+
+def build_calendar(team, stamp=None):
+    """The team's whole feed as text, from every stored game of theirs with a date"""
+    stamp = stamp or timezone.now()
+    games = list(Game.objects.involving(team).filter(game_date__isnull=False).order_by('game_date'))
+    odds_games = []
+    if games:
+        # Only lines near a scheduled game can match one
+        odds_games = list(OddsGame.objects.filter(
+            game_time__gte=games[0].game_date - timedelta(days=1),
+            game_time__lte=games[-1].game_date + timedelta(days=1),
+        ))
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//GTSportsLine//Schedule//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{_escape(CALENDAR_NAME.format(team.school))}",
+        f"X-WR-TIMEZONE:{timezone.get_current_timezone_name()}",
+        f"REFRESH-INTERVAL;VALUE=DURATION:{REFRESH_INTERVAL}",
+        f"X-PUBLISHED-TTL:{REFRESH_INTERVAL}",
+    ]
+    for game in games:
+        lines += _event(game, team, odds_games, stamp)
+    lines.append('END:VCALENDAR')
+    return ''.join(f"{_fold(line)}\r\n" for line in lines)
+
+
+def get_calendar(team, etag, last_modified):
+    """The team's feed for this calendar_state(), generated only if it isn't cached yet"""
+    cache_key = CALENDAR_KEY.format(team.slug, etag)
+    body = cache.get(cache_key)
+    if body is None:
+        body = build_calendar(team, stamp=last_modified)
+        cache.set(cache_key, body, CALENDAR_CACHE_TIMEOUT)
+    return body
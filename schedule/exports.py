@@ -0,0 +1,17 @@
+from core.export import Export, register
+
+from .models import Game
+
+schedule = register(Export(
+    name='schedule',
+    queryset=lambda: Game.objects.all(),
+    columns=[
+        (field, field) for field in (
+            'id', 'api_game_id', 'season', 'week', 'season_type', 'home_team', 'away_team', 'game_date',
+            'start_time', 'venue', 'home_score', 'away_score', 'completed', 'neutral_site', 'conference_game',
+            'updated_at',
+        )
+    ],
+    date_field='game_date',
+    season_field='season',
+))
@@ -0,0 +1,62 @@
+# In schedule/management/commands/fetch_schedule.py
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.page_cache import bump_pages
+from core.upstream import scoped_client
+from odds.analytics import grade_closing_lines
+from schedule.tasks import schedule_kickoff_warm
+from schedule.views import fetch_season_schedule, store_season
+
+
+async def _fetch(year):
+    # async_to_sync's loop is gone after this call, so don't leave a client behind on it
+    async with scoped_client():
+        return await fetch_season_schedule(year)
+
+
+class Command(BaseCommand):
+    help = "Fetches the season's schedule once and stores every followed team's games in schedule.Game"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year',
+            type=int,
+            default=None,
+            help='Season to fetch (defaults to the current year)',
+        )
+
+    def handle(self, *args, **options):
+        year = options['year'] or timezone.now().year
+        self.stdout.write(f"Starting to fetch the {year} schedule...")
+
+        games, error_message = async_to_sync(_fetch)(year)
+        if error_message and not games:
+            raise CommandError(error_message)
+        if error_message:
+            # Upstream is down and we got the last good copy instead
+            self.stdout.write(self.style.WARNING(error_message))
+
+        # One call returns the whole season; keep the games of the teams we follow
+        stored = store_season(games)
+        for game, created in stored:
+            if created:
+                self.stdout.write(self.style.SUCCESS(f"CREATED new game: {game}"))
+            else:
+                self.stdout.write(self.style.NOTICE(f"UPDATED existing game: {game}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\nDone. Processed {len(stored)} game(s) for {year}."
+        ))
+
+        # New final scores may let us grade closing lines
+        graded = grade_closing_lines()
+        self.stdout.write(f"Graded {graded} closing line(s).")
+
+        # Trends pages read the summaries grading just updated
+        bump_pages('schedule', 'odds')
+
+        # Kickoff times may have moved; keep the pre-kickoff cache warm lined up
+        schedule_kickoff_warm.enqueue()
@@ -1,8 +1,20 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
+from core.teams import is_same_team
+
+
+class GameQuerySet(models.QuerySet):
+    def involving(self, team):
+        """Games `team` (a core.teams.Team) plays in"""
+        return self.filter(Q(home_team=team.school) | Q(away_team=team.school))
+
+
 class Game(models.Model):
-    """Represents a Georgia Tech football game from the schedule"""
+    """A football game from the schedule, involving at least one followed team"""
     api_game_id = models.IntegerField(unique=True, null=True, blank=True)
     
     season = models.IntegerField()
@@ -32,20 +44,48 @@ class Game(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = GameQuerySet.as_manager()
+    
     class Meta:
         ordering = ['game_date', 'start_time']
+        # One team's games (Game.objects.involving()), by date
+        indexes = [
+            models.Index(fields=['home_team', 'game_date']),
+            models.Index(fields=['away_team', 'game_date']),
+        ]
     
     def __str__(self):
         return f"{self.away_team} @ {self.home_team} - {self.game_date}"
     
-    @property
-    def is_georgia_tech_home(self):
-        """Check if Georgia Tech is the home team"""
-        return "Georgia Tech" in self.home_team or "Yellow Jackets" in self.home_team
+    def is_home_for(self, team):
+        """Check if `team` is the home team"""
+        return self.home_team == team.school
     
-    @property
-    def opponent(self):
-        """Get the opponent team name"""
-        if self.is_georgia_tech_home:
+    def opponent_of(self, team):
+        """Get `team`'s opponent"""
+        if self.is_home_for(team):
             return self.away_team
         return self.home_team
+    
+    def won_by(self, team):
+        """True/False for completed games with a final score, otherwise None"""
+        if not self.completed or self.home_score is None or self.away_score is None:
+            return None
+        if self.is_home_for(team):
+            return self.home_score > self.away_score
+        return self.away_score > self.home_score
+    
+    def matches_odds_game(self, odds_game):
+        """Check whether an odds.Game row is this same matchup"""
+        if not self.game_date:
+            return False
+        # The odds feed and the schedule feed can disagree on kickoff by a few hours
+        if abs(self.game_date - odds_game.game_time) > timedelta(days=1):
+            return False
+        # The odds feed uses full names ("Georgia Tech Yellow Jackets"), the schedule doesn't,
+        # and either may list the teams the other way round at a neutral site
+        home, away = odds_game.home_team, odds_game.away_team
+        return (
+            (is_same_team(home, self.home_team) and is_same_team(away, self.away_team))
+            or (is_same_team(home, self.away_team) and is_same_team(away, self.home_team))
+        )
@@ -0,0 +1,207 @@
+"""
+Monte Carlo season simulator for a followed team (core.teams.Team).
+
+Every remaining regular-season game gets a win probability (market-implied
+from odds.Game when we have a line, otherwise from team ratings), and all
+simulated seasons are drawn at once as a single (simulations x games) NumPy
+array.
+
+Ratings come from the season's completed games: each team's average margin,
+taken from the closing spread where the game had one (the market's view of
+the matchup) and from the final score otherwise, adjusted for home field and
+shrunk toward 0 while a team has only played a few games. Teams with no
+completed games rate 0.
+"""
+
+import hashlib
+import math
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from core.teams import is_same_team
+from odds.models import ClosingLine, Game as OddsGame
+
+from .models import Game
+
+SIMULATION_COUNT = 100_000
+SIMULATION_CACHE_TIMEOUT = 60 * 60 * 24  # Results are keyed on the inputs, so they can live long
+BOWL_ELIGIBLE_WINS = 6
+
+# Rating model used when a game has no line yet.
+# Ratings are in points; the difference plus home field is treated like a spread.
+HOME_FIELD_ADVANTAGE = 2.5
+SPREAD_STDDEV = 14.0
+# Final-score margins count at most this much, so one blowout doesn't dominate
+MAX_RATING_MARGIN = 28.0
+# Ratings are averaged as if every team had also played this many games at margin 0
+RATING_PRIOR_GAMES = 2
+
+
+def _moneyline_to_probability(moneyline):
+    """Convert an American moneyline into an implied probability (vig included)"""
+    if moneyline < 0:
+        return -moneyline / (-moneyline + 100)
+    return 100 / (moneyline + 100)
+
+
+def _spread_to_probability(spread):
+    """Win probability for a team laying `spread` points (negative = favorite)"""
+    return 0.5 * (1 + math.erf(-spread / (SPREAD_STDDEV * math.sqrt(2))))
+
+
+def _market_probability(odds_game, team):
+    """`team`'s no-vig win probability from an odds.Game row, or None"""
+    is_home = odds_game.home_team == team.odds_name
+    if odds_game.home_team_moneyline is not None and odds_game.away_team_moneyline is not None:
+        home = _moneyline_to_probability(odds_game.home_team_moneyline)
+        away = _moneyline_to_probability(odds_game.away_team_moneyline)
+        home_probability = home / (home + away)
+        return home_probability if is_home else 1 - home_probability
+    if odds_game.home_team_spread is not None:
+        home_probability = _spread_to_probability(odds_game.home_team_spread)
+        return home_probability if is_home else 1 - home_probability
+    return None
+
+
+def _rating_probability(game, ratings, team):
+    """`team`'s win probability from team ratings (missing teams rate 0)"""
+    margin = ratings.get(team.school, 0.0) - ratings.get(game.opponent_of(team), 0.0)
+    if not game.neutral_site:
+        margin += HOME_FIELD_ADVANTAGE if game.is_home_for(team) else -HOME_FIELD_ADVANTAGE
+    return _spread_to_probability(-margin)
+
+
+def _home_margin(game):
+    """
+    A completed schedule.Game's margin for the home team, before home field:
+    minus the closing spread if the game had one, otherwise the capped final margin
+    """
+    closing_line = next((line for line in game.closing_lines.all() if line.home_team_spread is not None), None)
+    if closing_line is not None:
+        # The spread is the odds feed's home team's, which may be the schedule's away team
+        same_home = is_same_team(closing_line.game.home_team, game.home_team)
+        return -closing_line.home_team_spread if same_home else closing_line.home_team_spread
+    margin = game.home_score - game.away_score
+    return max(-MAX_RATING_MARGIN, min(MAX_RATING_MARGIN, margin))
+
+
+def season_ratings(season):
+    """{school: rating in points} from the season's completed games (see the module docstring)"""
+    completed = (
+        Game.objects.filter(season=season, completed=True, home_score__isnull=False, away_score__isnull=False)
+        .prefetch_related('closing_lines__game')
+    )
+    totals = {}
+    for game in completed:
+        margin = _home_margin(game)
+        if not game.neutral_site:
+            margin -= HOME_FIELD_ADVANTAGE
+        for school, side_margin in ((game.home_team, margin), (game.away_team, -margin)):
+            total, count = totals.get(school, (0.0, 0))
+            totals[school] = (total + side_margin, count + 1)
+    return {school: total / (count + RATING_PRIOR_GAMES) for school, (total, count) in totals.items()}
+
+
+def _inputs_version(season, team):
+    """Fingerprint of everything the simulation depends on for a team's season"""
+    # The whole season, not just the team's games: every result feeds the ratings
+    schedule_state = Game.objects.filter(season=season).aggregate(
+        count=Count('id'), updated=Max('updated_at'),
+    )
+    odds_state = OddsGame.objects.aggregate(
+        count=Count('id'), updated=Max('last_updated'),
+    )
+    graded = ClosingLine.objects.aggregate(graded=Max('graded_at'))['graded']
+    raw = (
+        f"{schedule_state['count']}:{schedule_state['updated']}:"
+        f"{odds_state['count']}:{odds_state['updated']}:{graded}"
+    )
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _distribution(wins, losses_base):
+    """Turn an array of simulated win totals into [{wins, losses, probability}]"""
+    counts = np.bincount(wins, minlength=losses_base + 1)
+    total = counts.sum()
+    return [
+        {'wins': w, 'losses': losses_base - w, 'probability': float(c / total)}
+        for w, c in enumerate(counts)
+        if c
+    ]
+
+
+def simulate_season(season, team, simulations=SIMULATION_COUNT, ratings=None, seed=None):
+    """
+    Simulate the rest of `team`'s regular season. `ratings` ({school:
+    points}) defaults to season_ratings(season).
+
+    Returns None when the season has no stored games, otherwise a dict with the
+    final record distribution, conference record distribution, expected wins and
+    bowl-eligibility probability.
+    """
+    games = list(Game.objects.involving(team).filter(season=season, season_type='regular'))
+    if not games:
+        return None
+
+    if ratings is None:
+        ratings = season_ratings(season)
+    odds_games = list(OddsGame.objects.all())
+
+    wins_so_far = 0
+    conference_wins_so_far = 0
+    conference_games = sum(1 for game in games if game.conference_game)
+    probabilities = []
+    conference_mask = []
+    market_priced = 0
+
+    for game in games:
+        result = game.won_by(team)
+        if result is not None:
+            wins_so_far += result
+            conference_wins_so_far += result and game.conference_game
+            continue
+
+        probability = None
+        for odds_game in odds_games:
+            if game.matches_odds_game(odds_game):
+                probability = _market_probability(odds_game, team)
+                break
+        if probability is None:
+            probability = _rating_probability(game, ratings, team)
+        else:
+            market_priced += 1
+
+        probabilities.append(probability)
+        conference_mask.append(game.conference_game)
+
+    rng = np.random.default_rng(seed)
+    probabilities = np.asarray(probabilities, dtype=np.float32)
+    conference_mask = np.asarray(conference_mask, dtype=bool)
+
+    # One draw for every game of every simulated season
+    outcomes = rng.random((simulations, probabilities.size), dtype=np.float32) < probabilities
+    wins = outcomes.sum(axis=1) + wins_so_far
+    conference_wins = outcomes[:, conference_mask].sum(axis=1) + conference_wins_so_far
+
+    return {
+        'season': season,
+        'simulations': simulations,
+        'games_remaining': int(probabilities.size),
+        'games_market_priced': market_priced,
+        'expected_wins': float(wins.mean()),
+        'bowl_eligible_probability': float((wins >= BOWL_ELIGIBLE_WINS).mean()),
+        'record_distribution': _distribution(wins, len(games)),
+        'conference_record_distribution': _distribution(conference_wins, conference_games),
+    }
+
+
+def get_season_outlook(season, team):
+    """Cached simulate_season(); recomputed only when the team's schedule or lines change"""
+    cache_key = f"schedule:outlook:{team.slug}:{season}:{_inputs_version(season, team)}"
+    outlook = cache.get(cache_key)
+    if outlook is None:
+        outlook = simulate_season(season, team)
+        cache.set(cache_key, outlook, SIMULATION_CACHE_TIMEOUT)
+    return outlook
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import Task
+from core.queue import task
+from core.warming import warm_caches
+
+from .models import Game
+
+KICKOFF_WARM_KEY = 'schedule:kickoff_warm'
+
+
+@task(max_attempts=2, retry_delay=300)
+def refresh_schedule(year=None):
+    call_command('fetch_schedule', year=year)
+
+
+def _warm_window():
+    return (
+        timedelta(minutes=settings.KICKOFF_WARM_LEAD_MINUTES),
+        timedelta(minutes=settings.KICKOFF_WARM_UNTIL_MINUTES),
+    )
+
+
+@task()
+def schedule_kickoff_warm():
+    """
+    Queue keep_warm_for_kickoff for the next game (or the one being played),
+    to start KICKOFF_WARM_LEAD_MINUTES before kickoff. Moves the queued run if
+    the game's date has changed since.
+    """
+    now = timezone.now()
+    lead, until = _warm_window()
+    game = (
+        Game.objects.filter(game_date__gt=now - until)
+        .order_by('game_date')
+        .values('id', 'game_date')
+        .first()
+    )
+    if game is None:
+        return
+    run_at = max(now, game['game_date'] - lead)
+    moved = Task.objects.filter(key=KICKOFF_WARM_KEY, status=Task.QUEUED).update(
+        run_at=run_at, kwargs={'game_id': game['id']},
+    )
+    if not moved:
+        keep_warm_for_kickoff.enqueue(
+            delay=(run_at - now).total_seconds(), key=KICKOFF_WARM_KEY, game_id=game['id'],
+        )
+
+
+@task()
+def keep_warm_for_kickoff(game_id):
+    """
+    Re-warm the pages just before they'd expire from the page cache, from
+    before kickoff until the game's over, then move on to the next game.
+    """
+    lead, until = _warm_window()
+    game_date = Game.objects.filter(id=game_id).values_list('game_date', flat=True).first()
+    if game_date is None or timezone.now() > game_date + until:
+        schedule_kickoff_warm()
+        return
+
+    warm_caches()
+    keep_warm_for_kickoff.enqueue(
+        delay=settings.PAGE_CACHE_TIMEOUT * 0.8, key=KICKOFF_WARM_KEY, game_id=game_id,
+    )
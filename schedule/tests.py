@@ -1,3 +1,299 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Task
+from core.teams import default_team
+from odds.models import ClosingLine, Game as OddsGame
+
+from .models import Game
+from . import calendar, tasks
+from .simulation import HOME_FIELD_ADVANTAGE, RATING_PRIOR_GAMES, season_ratings, simulate_season
+from .views import store_season
+
+YEAR = 2025
+
+
+def season_game(api_game_id, home, away, **fields):
+    return {
+        'api_game_id': api_game_id, 'season': YEAR, 'week': 1, 'season_type': 'regular',
+        'home_team': home, 'away_team': away,
+        'game_date': datetime(YEAR, 9, 6, 19, tzinfo=dt_timezone.utc), 'start_time': '7:00 PM',
+        'venue': 'Bobby Dodd Stadium', 'home_score': None, 'away_score': None, 'completed': False,
+        'neutral_site': False, 'conference_game': True,
+        **fields,
+    }
+
+
+class StoreSeasonTests(TestCase):
+    def test_keeps_only_followed_teams(self):
+        stored = store_season([
+            season_game(1, 'Georgia Tech', 'Clemson'),
+            season_game(2, 'Georgia', 'Alabama'),
+            season_game(None, 'Georgia Tech', 'Duke'),
+        ])
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(list(Game.objects.values_list('api_game_id', flat=True)), [1])
+
+    def test_updates_existing_games(self):
+        store_season([season_game(1, 'Georgia Tech', 'Clemson')])
+        [(game, created)] = store_season([season_game(1, 'Georgia Tech', 'Clemson', home_score=24, away_score=21)])
+        self.assertFalse(created)
+        self.assertEqual(Game.objects.get().home_score, 24)
+
+
+class ScheduleListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _get(self):
+        return self.client.get(reverse('schedule.list'), {'year': YEAR})
+
+    def test_reads_the_stored_season_without_fetching(self):
+        store_season([season_game(1, 'Georgia Tech', 'Clemson')])
+        with mock.patch('schedule.views.fetch_season_schedule', new_callable=mock.AsyncMock) as fetch:
+            response = self._get()
+        fetch.assert_not_called()
+        self.assertContains(response, 'Clemson')
+
+    def test_fetches_and_stores_a_missing_season(self):
+        fetched = ([season_game(1, 'Georgia Tech', 'Clemson'), season_game(2, 'Georgia', 'Alabama')], None)
+        with mock.patch('schedule.views.fetch_season_schedule', new_callable=mock.AsyncMock, return_value=fetched) as fetch:
+            response = self._get()
+        fetch.assert_awaited_once_with(YEAR)
+        self.assertContains(response, 'Clemson')
+        # Stored, so the next page load (or another team's) reads it
+        self.assertEqual(list(Game.objects.values_list('api_game_id', flat=True)), [1])
+
+    def test_shows_the_error_when_the_fetch_fails(self):
+        fetched = ([], "Unable to reach the schedule service: circuit open")
+        with mock.patch('schedule.views.fetch_season_schedule', new_callable=mock.AsyncMock, return_value=fetched):
+            response = self._get()
+        self.assertContains(response, 'Unable to reach the schedule service')
+        self.assertFalse(Game.objects.exists())
+
+
+def odds_game(home, away, game_time, **fields):
+    return OddsGame.objects.create(
+        api_game_id=f'{home}-{away}', home_team=home, away_team=away, game_time=game_time,
+        bookmaker_name='DraftKings', last_updated=game_time, **fields,
+    )
+
+
+def stored_game(api_game_id, home, away, week=1, **fields):
+    return Game.objects.create(**season_game(api_game_id, home, away, **{
+        'week': week, 'game_date': datetime(YEAR, 9, 6, 19, tzinfo=dt_timezone.utc) + timedelta(weeks=week - 1),
+        **fields,
+    }))
+
+
+class MatchesOddsGameTests(TestCase):
+    def test_same_matchup_either_way_round(self):
+        game = stored_game(1, 'Georgia', 'Georgia Tech', neutral_site=True)
+        self.assertTrue(game.matches_odds_game(
+            odds_game('Georgia Tech Yellow Jackets', 'Georgia Bulldogs', game.game_date),
+        ))
+
+    def test_a_school_isnt_matched_by_a_longer_name(self):
+        game = stored_game(1, 'Georgia', 'Clemson')
+        self.assertFalse(game.matches_odds_game(
+            odds_game('Georgia Tech Yellow Jackets', 'Clemson Tigers', game.game_date),
+        ))
+
+    def test_kickoffs_more_than_a_day_apart_dont_match(self):
+        game = stored_game(1, 'Georgia Tech', 'Clemson')
+        self.assertFalse(game.matches_odds_game(
+            odds_game('Georgia Tech Yellow Jackets', 'Clemson Tigers', game.game_date + timedelta(days=2)),
+        ))
+
+
+class SeasonRatingsTests(TestCase):
+    def test_from_final_scores(self):
+        stored_game(1, 'Georgia Tech', 'Clemson', home_score=31, away_score=21, completed=True)
+        ratings = season_ratings(YEAR)
+        expected = (10 - HOME_FIELD_ADVANTAGE) / (1 + RATING_PRIOR_GAMES)
+        self.assertAlmostEqual(ratings['Georgia Tech'], expected)
+        self.assertAlmostEqual(ratings['Clemson'], -expected)
+
+    def test_blowouts_are_capped(self):
+        stored_game(1, 'Georgia Tech', 'Duke', home_score=70, away_score=0, completed=True, neutral_site=True)
+        self.assertAlmostEqual(season_ratings(YEAR)['Georgia Tech'], 28 / (1 + RATING_PRIOR_GAMES))
+
+    def test_closing_spread_wins_over_the_score(self):
+        game = stored_game(1, 'Georgia', 'Georgia Tech', home_score=30, away_score=20, completed=True, neutral_site=True)
+        # The odds feed lists Georgia Tech at home, as a 3-point underdog
+        line_game = odds_game('Georgia Tech Yellow Jackets', 'Georgia Bulldogs', game.game_date)
+        ClosingLine.objects.create(game=line_game, schedule_game=game, captured_at=game.game_date, home_team_spread=3)
+        ratings = season_ratings(YEAR)
+        self.assertAlmostEqual(ratings['Georgia'], 3 / (1 + RATING_PRIOR_GAMES))
+        self.assertAlmostEqual(ratings['Georgia Tech'], -3 / (1 + RATING_PRIOR_GAMES))
+
+
+class SimulateSeasonTests(TestCase):
+    def setUp(self):
+        self.team = default_team()
+
+    def test_no_stored_games(self):
+        self.assertIsNone(simulate_season(YEAR, self.team))
+
+    def test_counts_results_and_prices_remaining_games(self):
+        stored_game(1, 'Georgia Tech', 'Duke', home_score=28, away_score=14, completed=True)
+        priced = stored_game(2, 'Clemson', 'Georgia Tech', week=2)
+        stored_game(3, 'Georgia Tech', 'Virginia', week=3)
+        odds_game('Clemson Tigers', 'Georgia Tech Yellow Jackets', priced.game_date,
+                  home_team_moneyline=-400, away_team_moneyline=300)
+        outlook = simulate_season(YEAR, self.team, simulations=2000, seed=1)
+        self.assertEqual((outlook['games_remaining'], outlook['games_market_priced']), (2, 1))
+        self.assertGreaterEqual(min(row['wins'] for row in outlook['record_distribution']), 1)
+        self.assertAlmostEqual(sum(row['probability'] for row in outlook['record_distribution']), 1)
+
+    def test_derived_ratings_move_the_odds(self):
+        stored_game(1, 'Georgia Tech', 'Clemson', week=3)
+        even = simulate_season(YEAR, self.team, simulations=5000, seed=1, ratings={})
+        # Clemson beat someone badly earlier in the season
+        stored_game(2, 'Clemson', 'Wofford', home_score=56, away_score=3, completed=True)
+        rated = simulate_season(YEAR, self.team, simulations=5000, seed=1)
+        self.assertLess(rated['expected_wins'], even['expected_wins'])
+
+
+@override_settings(KICKOFF_WARM_LEAD_MINUTES=90, KICKOFF_WARM_UNTIL_MINUTES=240, PAGE_CACHE_TIMEOUT=300)
+class KickoffWarmTests(TestCase):
+    def _game(self, api_game_id, kickoff):
+        return stored_game(api_game_id, 'Georgia Tech', 'Clemson', game_date=kickoff)
+
+    def _queued(self):
+        return Task.objects.get(key=tasks.KICKOFF_WARM_KEY, status=Task.QUEUED)
+
+    def test_warming_is_queued_ahead_of_the_next_kickoff(self):
+        kickoff = timezone.now() + timedelta(days=1)
+        game = self._game(1, kickoff)
+        self._game(2, kickoff + timedelta(days=7))
+        tasks.schedule_kickoff_warm()
+        queued = self._queued()
+        self.assertEqual(queued.kwargs, {'game_id': game.id})
+        self.assertAlmostEqual(queued.run_at, kickoff - timedelta(minutes=90), delta=timedelta(seconds=5))
+
+    def test_a_moved_kickoff_moves_the_queued_run(self):
+        game = self._game(1, timezone.now() + timedelta(days=1))
+        tasks.schedule_kickoff_warm()
+        Game.objects.filter(pk=game.pk).update(game_date=timezone.now() + timedelta(days=2))
+        tasks.schedule_kickoff_warm()
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertGreater(self._queued().run_at, timezone.now() + timedelta(days=1))
+
+    def test_nothing_queued_without_an_upcoming_game(self):
+        self._game(1, timezone.now() - timedelta(days=1))
+        tasks.schedule_kickoff_warm()
+        self.assertFalse(Task.objects.exists())
+
+    def test_warms_and_requeues_itself_during_the_game(self):
+        game = self._game(1, timezone.now() - timedelta(minutes=30))
+        with mock.patch('schedule.tasks.warm_caches') as warm:
+            tasks.keep_warm_for_kickoff(game_id=game.id)
+        warm.assert_called_once_with()
+        # Before the cached pages expire
+        self.assertLess(self._queued().run_at, timezone.now() + timedelta(seconds=300))
+
+    def test_moves_on_to_the_next_game_when_it_is_over(self):
+        finished = self._game(1, timezone.now() - timedelta(hours=5))
+        upcoming = self._game(2, timezone.now() + timedelta(days=7))
+        with mock.patch('schedule.tasks.warm_caches') as warm:
+            tasks.keep_warm_for_kickoff(game_id=finished.id)
+        warm.assert_not_called()
+        self.assertEqual(self._queued().kwargs, {'game_id': upcoming.id})
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.game = stored_game(1, 'Georgia Tech', 'Clemson', venue='Bobby Dodd Stadium, Atlanta')
+        self.url = reverse('schedule.calendar')
+
+    def test_feed_has_an_event_per_game(self):
+        stored_game(2, 'Duke', 'Georgia Tech', week=2, start_time='TBA')
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = response.content.decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertIn('SUMMARY:Georgia Tech vs Clemson', body)
+        self.assertIn('SUMMARY:Georgia Tech @ Duke', body)
+        self.assertIn('LOCATION:Bobby Dodd Stadium\\, Atlanta', body)
+        # Kickoff not announced yet: an all-day event
+        self.assertIn(f'DTSTART;VALUE=DATE:{YEAR}0913', body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split('\r\n')))
+
+    def test_upcoming_games_show_the_line(self):
+        odds_game('Georgia Tech Yellow Jackets', 'Clemson Tigers', self.game.game_date, home_team_spread=3.5)
+        body = self.client.get(self.url).content.decode().replace('\r\n ', '')
+        self.assertIn('Spread: Georgia Tech Yellow Jackets +3.5', body)
+
+    def test_unchanged_feed_is_a_304_without_building_it(self):
+        response = self.client.get(self.url)
+        with mock.patch.object(calendar, 'build_calendar') as build:
+            not_modified = self.client.get(self.url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        build.assert_not_called()
+
+    def test_changes_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.game.home_score, self.game.away_score, self.game.completed = 31, 28, True
+        self.game.save()
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Final: Clemson 28\\, Georgia Tech 31', response.content.decode())
+
+    def test_deleting_an_older_game_changes_the_etag(self):
+        stored_game(2, 'Georgia Tech', 'Duke', week=2)
+        etag = self.client.get(self.url)['ETag']
+        # The newest updated_at stays the same; the count doesn't
+        self.game.delete()
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+
+    def test_body_is_generated_once_per_state(self):
+        self.client.get(self.url)
+        with mock.patch.object(calendar, 'build_calendar') as build:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        build.assert_not_called()
+
+    def test_long_lines_are_folded_without_splitting_characters(self):
+        line = 'DESCRIPTION:' + 'é' * 60
+        folded = calendar._fold(line)
+        self.assertEqual(folded.replace('\r\n ', ''), line)
+        self.assertTrue(all(len(piece.encode()) <= 75 for piece in folded.split('\r\n')))
+
+
+class ScheduleExportTests(TestCase):
+    def test_season_filter(self):
+        stored_game(1, 'Georgia Tech', 'Clemson')
+        stored_game(2, 'Georgia Tech', 'Duke', season=YEAR - 1)
+        response = self.client.get(reverse('schedule.export'), {'season': YEAR})
+        rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertIn(',Clemson,', rows[1])
+
+    def test_bad_season_is_a_400(self):
+        self.assertEqual(self.client.get(reverse('schedule.export'), {'season': 'next'}).status_code, 400)
+
+
+@override_settings(FOLLOWED_TEAMS=['Georgia Tech:Yellow Jackets', 'Georgia:Bulldogs'])
+class TeamScheduleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_season_is_stored_once_for_every_followed_team(self):
+        stored = store_season([
+            season_game(1, 'Georgia Tech', 'Clemson'),
+            season_game(2, 'Georgia', 'Alabama'),
+            season_game(3, 'Duke', 'Wake Forest'),
+        ])
+        self.assertEqual(sorted(game.api_game_id for game, _ in stored), [1, 2])
+
+    def test_schedule_page_shows_the_chosen_teams_games(self):
+        store_season([season_game(1, 'Georgia Tech', 'Clemson'), season_game(2, 'Georgia', 'Alabama')])
+        response = self.client.get(reverse('schedule.list'), {'year': YEAR, 'team': 'georgia'})
+        self.assertEqual([row['opponent'] for row in response.context['template_data']['games']], ['Alabama'])
+        self.assertContains(response, 'Georgia Football Schedule')
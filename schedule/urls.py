@@ -3,5 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.schedule_list, name='schedule.list'),
+    path('calendar.ics', views.calendar_feed, name='schedule.calendar'),
+    path('export.csv', views.export_schedule_view, name='schedule.export'),
 ]
 
@@ -1,42 +1,39 @@
-import requests
+import logging
+
+import httpx
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
 from django.shortcuts import render
-from django.utils.dateparse import parse_datetime
 from django.utils import timezone
-from datetime import datetime
+from django.views.decorators.http import condition
+
+from core.export import csv_response
+from core.page_cache import bump_pages, cache_page_for_anonymous
+from core.payloads import PayloadError, aware, decode_schedule
+from core.ratelimit import rate_limit
+from core.replicas import read_from_replica
+from core.teams import current_team, followed_teams
+from core.upstream import UpstreamUnavailable, get_json, upstream_client
 
+from . import exports
+from .calendar import calendar_state, get_calendar
 from .models import Game
+from .simulation import get_season_outlook
 
 SCHEDULE_API_URL = "https://api.collegefootballdata.com"
 SCHEDULE_API_TIMEOUT_SECONDS = 10
-GEORGIA_TECH_TEAM = "Georgia Tech"
 
+logger = logging.getLogger(__name__)
 
-def _normalize_game_date(raw_value: str | None) -> datetime | None:
-    """Normalize game date from API response"""
-    if not raw_value:
-        return None
-    
-    # Try parsing as datetime
-    parsed = parse_datetime(raw_value)
-    if parsed:
-        if timezone.is_naive(parsed):
-            return timezone.make_aware(parsed, timezone.utc)
-        return parsed
-    
-    # Try ISO format
-    try:
-        raw_value = raw_value.replace("Z", "+00:00")
-        parsed = datetime.fromisoformat(raw_value)
-        if timezone.is_naive(parsed):
-            return timezone.make_aware(parsed, timezone.utc)
-        return parsed
-    except (ValueError, TypeError):
-        return None
 
 
-def _fetch_georgia_tech_schedule(year=None):
-    """Fetch Georgia Tech football schedule from College Football Data API"""
+async def fetch_season_schedule(year=None):
+    """
+    Fetch a whole season's schedule, every team, from College Football Data
+    API in one request (fetch_schedule keeps the followed teams' games)
+    """
     api_key = getattr(settings, "SCHEDULE_API_KEY", None)
     if not api_key:
         return [], "Schedule service is not configured yet."
@@ -51,26 +48,34 @@ def _fetch_georgia_tech_schedule(year=None):
         "Accept": "application/json"
     }
     
-    # Endpoint to get games for a specific team
-    # We'll use the games endpoint with team filter
+    # The games endpoint without a team filter: one call covers every team
     url = f"{SCHEDULE_API_URL}/games"
     
     params = {
         "year": year,
-        "team": GEORGIA_TECH_TEAM,
         "seasonType": "both",  # Get both regular and postseason
     }
     
+    notice = None
     try:
-        response = requests.get(
+        # Concurrent page loads share one in-flight request, and the circuit
+        # breaker fails fast while CFBD is down (see core/upstream.py)
+        decoded = await get_json(
+            'schedule',
             url,
             headers=headers,
             params=params,
             timeout=SCHEDULE_API_TIMEOUT_SECONDS,
+            decode=decode_schedule,
         )
-        response.raise_for_status()
-        games_data = response.json()
-    except requests.exceptions.HTTPError as e:
+    except UpstreamUnavailable as error:
+        if error.fallback is None:
+            return [], f"Unable to reach the schedule service: {error.reason}"
+        decoded = error.fallback
+        notice = "The schedule service is unavailable right now, so this schedule may be out of date."
+    except PayloadError:
+        return [], "Unexpected response from the schedule service."
+    except httpx.HTTPStatusError as e:
         # Handle specific HTTP errors
         if e.response.status_code == 401:
             return [], "Authentication failed. Please check your SCHEDULE_API_KEY."
@@ -80,56 +85,81 @@ def _fetch_georgia_tech_schedule(year=None):
             return [], "Schedule endpoint not found. Please check the API documentation."
         else:
             return [], f"API error ({e.response.status_code}): {str(e)}"
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         return [], f"Unable to reach the schedule service: {str(e)}"
     
-    if not isinstance(games_data, list):
-        return [], f"Unexpected response from the schedule service. Received: {type(games_data).__name__}"
-    
+    for rejected in decoded.rejected:
+        logger.warning("Skipped malformed CFBD game, %s", rejected)
+
     # Normalize and process games
     normalized_games = []
-    for game in games_data:
-        # Handle both snake_case and camelCase field names
-        # College Football Data API typically uses camelCase
-        home_team = game.get("homeTeam") or game.get("home_team") or ""
-        away_team = game.get("awayTeam") or game.get("away_team") or ""
-        start_date = game.get("startDate") or game.get("start_date")
-        start_time = game.get("startTime") or game.get("start_time")
-        start_time_tbd = game.get("startTimeTbd") or game.get("start_time_tbd", False)
-        venue = game.get("venue") or ""
-        home_points = game.get("homePoints") or game.get("home_points")
-        away_points = game.get("awayPoints") or game.get("away_points")
-        completed = game.get("completed", False)
-        neutral_site = game.get("neutralSite") or game.get("neutral_site", False)
-        conference_game = game.get("conferenceGame") or game.get("conference_game", False)
-        
-        # Determine if GT is home or away
-        is_home = "Georgia Tech" in home_team or "Yellow Jackets" in home_team
-        
+    for game in decoded.records:
         normalized_games.append({
-            "api_game_id": game.get("id"),
-            "season": game.get("season", year),
-            "week": game.get("week"),
-            "season_type": game.get("season_type") or game.get("seasonType", "regular"),
-            "home_team": home_team,
-            "away_team": away_team,
-            "game_date": _normalize_game_date(start_date),
-            "start_time": "TBD" if start_time_tbd else (start_time or None),
-            "venue": venue,
-            "home_score": home_points,
-            "away_score": away_points,
-            "completed": completed,
-            "neutral_site": neutral_site,
-            "conference_game": conference_game,
+            "api_game_id": game.id,
+            "season": game.season or year,
+            "week": game.week,
+            "season_type": game.season_type or "regular",
+            "home_team": game.home_team,
+            "away_team": game.away_team,
+            "game_date": aware(game.start_date),
+            "start_time": "TBD" if game.start_time_tbd else (game.start_time or None),
+            "venue": game.venue or "",
+            "home_score": game.home_points,
+            "away_score": game.away_points,
+            "completed": game.completed,
+            "neutral_site": game.neutral_site,
+            "conference_game": game.conference_game,
         })
     
-    return normalized_games, None
+    return normalized_games, notice
+
 
+def store_season(games):
+    """
+    Store the followed teams' games from fetch_season_schedule()'s list;
+    returns (game, created) for each one stored
+    """
+    schools = {team.school for team in followed_teams()}
+    stored = []
+    with transaction.atomic():
+        for game_data in games:
+            if not schools & {game_data['home_team'], game_data['away_team']}:
+                continue
+            game_data = dict(game_data)
+            api_id = game_data.pop('api_game_id')
+            if api_id is None:
+                # Without the API id we have no way to update the row later
+                continue
+            stored.append(Game.objects.update_or_create(api_game_id=api_id, defaults=game_data))
+    return stored
 
-def schedule_list(request):
-    """Display Georgia Tech football schedule"""
+
+def _schedule_row(game, team):
+    """A stored game as the schedule table shows it, from `team`'s side"""
+    is_home = game.is_home_for(team)
+    return {
+        'game_date': game.game_date,
+        'start_time': game.start_time,
+        'venue': game.venue,
+        'is_home': is_home,
+        'opponent': game.opponent_of(team),
+        'conference_game': game.conference_game,
+        'neutral_site': game.neutral_site,
+        'completed': game.completed,
+        'won': game.won_by(team),
+        'team_score': game.home_score if is_home else game.away_score,
+        'opponent_score': game.away_score if is_home else game.home_score,
+    }
+
+
+@cache_page_for_anonymous('schedule')
+@read_from_replica
+@upstream_client
+async def schedule_list(request):
+    """Display the current team's football schedule, from the stored season"""
+    team = current_team(request)
     template_data = {
-        'title': 'Georgia Tech Football Schedule'
+        'title': f'{team.school} Football Schedule'
     }
     
     # Get year from request, default to current year
@@ -139,16 +169,57 @@ def schedule_list(request):
             year = int(year)
         except ValueError:
             year = None
+    year = year or timezone.now().year
     
-    # Fetch schedule from API
-    games, error_message = _fetch_georgia_tech_schedule(year)
+    # fetch_schedule stores each season once for every followed team; this reads the team's games by index
+    games = [game async for game in Game.objects.involving(team).filter(season=year)]
+    error_message = None
+    if not games:
+        # Nothing stored for this season yet: fetch it now (concurrent page loads
+        # share the one request) and store it, so the next page load reads it
+        fetched, error_message = await fetch_season_schedule(year)
+        if fetched and await sync_to_async(store_season)(fetched):
+            # Other teams' pages may be cached from before the season was stored
+            await sync_to_async(bump_pages)('schedule')
+            games = [game async for game in Game.objects.involving(team).filter(season=year)]
     
-    template_data['games'] = games
+    template_data['games'] = [_schedule_row(game, team) for game in games]
     template_data['error_message'] = error_message
-    template_data['selected_year'] = year or timezone.now().year
+    template_data['selected_year'] = year
+    
+    # Simulated record/bowl odds from the stored schedule (cached until lines change)
+    template_data['outlook'] = await sync_to_async(get_season_outlook)(year, team)
     
     # Get available years (current year and next year for future schedules)
     current_year = timezone.now().year
     template_data['available_years'] = list(range(current_year - 1, current_year + 2))
     
     return render(request, 'schedule/schedule.html', {'template_data': template_data})
+
+
+def _calendar_state(request):
+    # condition() asks for the ETag and Last-Modified separately; query once per request
+    if not hasattr(request, '_calendar_state'):
+        request._calendar_state = calendar_state(current_team(request))
+    return request._calendar_state
+
+
+@read_from_replica
+@condition(
+    etag_func=lambda request: _calendar_state(request)[0],
+    last_modified_func=lambda request: _calendar_state(request)[1],
+)
+def calendar_feed(request):
+    """The current team's stored schedule as an iCalendar subscription (304 while nothing has changed)"""
+    team = current_team(request)
+    etag, last_modified = _calendar_state(request)
+    response = HttpResponse(get_calendar(team, etag, last_modified), content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = f'inline; filename="{team.slug}-football.ics"'
+    return response
+
+
+@rate_limit('export', methods=('GET',))
+@read_from_replica
+def export_schedule_view(request):
+    """The stored schedule as CSV (?start=, ?end=, ?season=)"""
+    return csv_response(request, exports.schedule)